@@ -0,0 +1,133 @@
+import os
+from app.core.http_cache import cache_control
+
+
+def normalize_database_url(url):
+    # Postgres fix: SQLAlchemy only accepts the postgresql:// scheme
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def database_url():
+    # Database Config (SQLite fallback / Postgres fix)
+    return normalize_database_url(os.getenv("DATABASE_URL", "sqlite:///qrmenu.db"))
+
+
+def replica_urls():
+    return [normalize_database_url(u.strip()) for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+
+
+def load_config():
+    """
+    Settings from the environment. Called by create_app(), never at import
+    time, so tests and scripts can set env vars or pass overrides first.
+    """
+    return {
+        "SQLALCHEMY_DATABASE_URI": database_url(),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+
+        # Engine tuning, applied per gunicorn worker (see app.database.engine_options).
+        # Postgres connections per worker = DB_POOL_SIZE + DB_MAX_OVERFLOW.
+        "DB_POOL_SIZE": int(os.getenv("DB_POOL_SIZE", "5")),
+        "DB_MAX_OVERFLOW": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "DB_POOL_TIMEOUT": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "DB_POOL_RECYCLE": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "DB_POOL_PRE_PING": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        "SQLITE_WAL": os.getenv("SQLITE_WAL", "1") == "1",
+        "SQLITE_BUSY_TIMEOUT_MS": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        # Read replicas for GET traffic (app.core.replicas); empty = everything on the primary
+        "DATABASE_REPLICA_URLS": replica_urls(),
+        "REPLICA_MAX_LAG_SECONDS": float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5")),
+        "REPLICA_CHECK_INTERVAL": float(os.getenv("REPLICA_CHECK_INTERVAL", "5")),
+        "REPLICA_STICKY_SECONDS": int(os.getenv("REPLICA_STICKY_SECONDS", "5")),
+        "REPLICA_LAG_QUERY": os.getenv("REPLICA_LAG_QUERY", ""),
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY", "dev-secret-key"),
+        "FRONTEND_URL": os.getenv("FRONTEND_URL", "http://localhost:5173"),
+
+        # orjson-backed JSON when installed (app.core.json_provider); 0 forces the stdlib encoder
+        "JSON_FAST": os.getenv("JSON_FAST", "1") == "1",
+
+        "MAX_CONTENT_LENGTH": int(os.getenv("MAX_UPLOAD_MB", "16")) * 1024 * 1024,
+        "IMAGE_WORKERS": int(os.getenv("IMAGE_WORKERS", "2")),
+
+        # gzip / brotli for /api/* responses at least this large (menu snapshots stay precompressed)
+        "COMPRESS_ENABLED": os.getenv("COMPRESS_ENABLED", "1") == "1",
+        "COMPRESS_MIN_SIZE": int(os.getenv("COMPRESS_MIN_SIZE", "1024")),
+
+        # Write-behind order intake (app.core.intake): 202 after an fsync'd journal append,
+        # a background writer commits in batches. Enable on all workers or none.
+        "ORDER_INTAKE": os.getenv("ORDER_INTAKE", "0") == "1",
+        "ORDER_INTAKE_MAX_PENDING": int(os.getenv("ORDER_INTAKE_MAX_PENDING", "1000")),
+        "ORDER_INTAKE_BATCH": int(os.getenv("ORDER_INTAKE_BATCH", "100")),
+        "ORDER_INTAKE_LINGER_MS": int(os.getenv("ORDER_INTAKE_LINGER_MS", "20")),
+        "ORDER_INTAKE_FSYNC": os.getenv("ORDER_INTAKE_FSYNC", "1") == "1",
+
+        # Public menu snapshot cache (per worker, invalidated via Restaurant.menu_version)
+        "MENU_CACHE_SIZE": int(os.getenv("MENU_CACHE_SIZE", "256")),
+        "MENU_CACHE_WARM": int(os.getenv("MENU_CACHE_WARM", "20")),
+        # Public menu search indexes (per worker, same invalidation)
+        "SEARCH_INDEX_SIZE": int(os.getenv("SEARCH_INDEX_SIZE", "256")),
+        "SEARCH_MAX_RESULTS": int(os.getenv("SEARCH_MAX_RESULTS", "100")),
+        # Static menu files (app.core.publish, `flask menus publish`); MENU_PUBLISH=1 also
+        # republishes a restaurant in the background after each admin menu change
+        "MENU_PUBLISH": os.getenv("MENU_PUBLISH", "0") == "1",
+        "MENU_PUBLISH_DIR": os.getenv("MENU_PUBLISH_DIR", ""),
+        "MENU_PUBLISH_KEEP": int(os.getenv("MENU_PUBLISH_KEEP", "3")),
+        "MENU_PUBLISH_WORKERS": int(os.getenv("MENU_PUBLISH_WORKERS", "4")),
+
+        # HTTP caching for public reads (lets a CDN / reverse proxy absorb menu scans)
+        "MENU_CACHE_CONTROL": cache_control(
+            int(os.getenv("MENU_MAX_AGE", "30")),
+            int(os.getenv("MENU_STALE_WHILE_REVALIDATE", "300")),
+        ),
+        "ORDER_STATUS_CACHE_CONTROL": cache_control(
+            int(os.getenv("ORDER_STATUS_MAX_AGE", "0")),
+            public=False,
+        ),
+
+        # Kitchen order stream (SSE). "local" fans out within one worker process
+        # (clients also refetch periodically); a redis:// URL or a "module:Class"
+        # EventBroker shares events across workers and hosts.
+        "ORDER_EVENTS_BROKER": os.getenv("ORDER_EVENTS_BROKER", "local"),
+        "ORDER_STREAM_HEARTBEAT": int(os.getenv("ORDER_STREAM_HEARTBEAT", "15")),
+        "ORDER_STREAM_MAX_SECONDS": int(os.getenv("ORDER_STREAM_MAX_SECONDS", "300")),
+
+        # Table order tracking (GET /api/public/restaurants/<slug>/tables/<token>/orders).
+        # Long-polls park a worker thread, so they get their own per-worker cap.
+        "TABLE_ORDERS_MAX_AGE_HOURS": int(os.getenv("TABLE_ORDERS_MAX_AGE_HOURS", "12")),
+        "TABLE_POLL_MAX_WAIT": int(os.getenv("TABLE_POLL_MAX_WAIT", "25")),
+        "TABLE_POLL_RECHECK": float(os.getenv("TABLE_POLL_RECHECK", "2")),
+        "TABLE_POLL_CONCURRENCY": int(os.getenv("TABLE_POLL_CONCURRENCY", "8")),
+
+        # Prometheus /metrics; without a token only localhost may scrape
+        "METRICS_ENABLED": os.getenv("METRICS_ENABLED", "1") == "1",
+        "METRICS_TOKEN": os.getenv("METRICS_TOKEN", ""),
+
+        # SQL accounting: X-Query-Count / X-Query-Time-Ms headers, slow-query log with EXPLAIN
+        "QUERY_DEBUG_HEADERS": os.getenv("QUERY_DEBUG_HEADERS", "0") == "1",
+        "SLOW_QUERY_MS": int(os.getenv("SLOW_QUERY_MS", "200")),
+        "SLOW_QUERY_EXPLAIN": os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1",
+
+        # Reverse proxies in front of the app (Cloudflare tunnel, nginx, ...). Their
+        # X-Forwarded-For is trusted so rate limits key on the real client IP.
+        "PROXY_COUNT": int(os.getenv("PROXY_COUNT", "0")),
+
+        # Admission control for unauthenticated writes (app.core.ratelimit).
+        # Rules are "<count>/<second|minute|hour|day>"; "off" disables one.
+        # "local" buckets are per worker; a redis:// URL shares them.
+        "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "1") == "1",
+        "RATE_LIMIT_STORE": os.getenv("RATE_LIMIT_STORE", "local"),
+        "RATE_LIMIT_LOGIN_IP": os.getenv("RATE_LIMIT_LOGIN_IP", "10/minute"),
+        "RATE_LIMIT_LOGIN_ACCOUNT": os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "5/minute"),
+        "RATE_LIMIT_ORDER_IP": os.getenv("RATE_LIMIT_ORDER_IP", "30/minute"),
+        "RATE_LIMIT_ORDER_TABLE": os.getenv("RATE_LIMIT_ORDER_TABLE", "6/minute"),
+        "RATE_LIMIT_ORDER_RESTAURANT": os.getenv("RATE_LIMIT_ORDER_RESTAURANT", "600/minute"),
+        # Concurrent requests per worker before shedding with 503 (0 = no cap)
+        "LOGIN_CONCURRENCY": int(os.getenv("LOGIN_CONCURRENCY", "4")),
+        "ORDER_CONCURRENCY": int(os.getenv("ORDER_CONCURRENCY", "8")),
+
+        # Cached JWT identity (user -> restaurant/role/slug); TTL bounds cross-worker staleness
+        "IDENTITY_CACHE_TTL": int(os.getenv("IDENTITY_CACHE_TTL", "60")),
+        "IDENTITY_CACHE_SIZE": int(os.getenv("IDENTITY_CACHE_SIZE", "1024")),
+    }
@@ -0,0 +1,131 @@
+"""
+Content-Encoding negotiation for /api/* responses.
+
+Dynamic responses above COMPRESS_MIN_SIZE are gzip- (or brotli-, when the
+`brotli` package is installed) encoded in an after_request hook. Cached
+bodies such as menu snapshots are wrapped in EncodedBody, which encodes
+each variant once at high quality and keeps it next to the raw bytes.
+
+Every encoded representation gets its own strong ETag ("<etag>-gzip"),
+and responses that could have been encoded carry Vary: Accept-Encoding so
+shared caches never hand a gzip body to a client that did not ask for it.
+"""
+import gzip
+import threading
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: `pip install Brotli`
+    brotli = None
+
+# Preference order when the client accepts several with equal q
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv", "text/plain", "text/html", "application/javascript"}
+
+
+def negotiate():
+    """Best encoding the client accepts (honouring q-values), or None for identity."""
+    accept = request.accept_encodings
+    if not accept:
+        return None
+    best = accept.best_match(ENCODINGS)
+    return best if best and accept[best] > 0 else None
+
+
+def encode(data, encoding, cached=False):
+    """
+    Compress `data`. Cached bodies are encoded once and served many times,
+    so they get the slow, small settings; per-request bodies the fast ones.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if cached else 5)
+    return gzip.compress(data, compresslevel=9 if cached else 6, mtime=0)
+
+
+def encoded_etag(etag, encoding):
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def etag_variants(etag):
+    """The ETag of every representation of one resource."""
+    return [etag] + [encoded_etag(etag, e) for e in ENCODINGS]
+
+
+class EncodedBody:
+    """Raw bytes plus lazily built, memoized encoded variants."""
+
+    __slots__ = ("raw", "_variants", "_lock")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def get(self, encoding):
+        if encoding is None:
+            return self.raw
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    data = self._variants[encoding] = encode(self.raw, encoding, cached=True)
+        return data
+
+    def __len__(self):
+        return len(self.raw)
+
+
+class Compression:
+    def __init__(self):
+        self.min_size = 1024
+
+    def init_app(self, app):
+        self.min_size = app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+        app.extensions["compression"] = self
+        if app.config.setdefault("COMPRESS_ENABLED", True):
+            app.after_request(self._after_request)
+
+    def choose(self, size):
+        """Encoding for a body of `size` bytes, or None if it should go out as is."""
+        return negotiate() if size >= self.min_size else None
+
+    def respond(self, response, body, etag=None):
+        """Fill `response` from an EncodedBody, picking the variant for this request."""
+        encoding = self.choose(len(body))
+        response.set_data(body.get(encoding))
+        if len(body) >= self.min_size:
+            response.vary.add("Accept-Encoding")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding))
+        return response
+
+    def _after_request(self, response):
+        if (
+            not request.path.startswith("/api/")
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate()
+        if encoding is None:
+            return response
+        response.set_data(encode(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak)
+        return response
+
+
+compression = Compression()
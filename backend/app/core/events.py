@@ -0,0 +1,199 @@
+import os
+import re
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from flask import current_app
+from werkzeug.utils import import_string
+
+try:
+    import redis
+except ImportError:  # optional: `pip install redis`
+    redis = None
+
+Event = namedtuple("Event", ["id", "type", "data"])
+
+
+class EventGap(Exception):
+    """The requested Last-Event-ID is no longer (or never was) in the backlog."""
+
+
+class EventBroker(ABC):
+    """
+    Interface for order event fan-out. The local broker only reaches listeners
+    in the same process; RedisEventBroker (ORDER_EVENTS_BROKER=redis://...) or
+    another "module:Class" implementation shares events so every gunicorn
+    worker sees every event.
+
+    Event ids are opaque strings, unique across processes and restarts, so an
+    id a client got from another worker is never mistaken for a local one.
+    """
+
+    @abstractmethod
+    def publish(self, restaurant_id, event_type, data):
+        """Store and fan out an event. `data` is a JSON string. Returns the event id."""
+
+    @abstractmethod
+    def read(self, restaurant_id, after_id, timeout):
+        """
+        Block up to `timeout` seconds for events newer than `after_id`.
+        Returns a (possibly empty) list of Event; raises EventGap if events
+        after `after_id` can no longer be replayed or it is not one of ours.
+        """
+
+    @abstractmethod
+    def latest_id(self):
+        """Id to resume after to receive only events published from now on."""
+
+
+class LocalEventBroker(EventBroker):
+    """
+    In-process broker keeping the last `backlog` events per restaurant for
+    Last-Event-ID resume. Listeners wait on a Condition, so with gthread or
+    gevent workers an idle stream costs a parked thread/greenlet, not a worker.
+
+    Only listeners in the publishing process see an event: with several
+    workers, clients must also refetch periodically (AdminOrders does).
+    Ids are "<process token>-<sequence>"; a token from another worker or an
+    earlier run raises EventGap, so the client resyncs instead of replaying
+    the wrong history.
+    """
+
+    def __init__(self, backlog=500):
+        self.backlog = backlog
+        self._cond = threading.Condition()
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            # Built in the gunicorn master with preload: each worker needs its own token
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._token = uuid.uuid4().hex[:12]
+        self._last_seq = 0
+        self._events = {}  # restaurant_id -> deque[(seq, Event)]
+
+    def publish(self, restaurant_id, event_type, data):
+        with self._cond:
+            self._last_seq += 1
+            event = Event(f"{self._token}-{self._last_seq}", event_type, data)
+            buf = self._events.setdefault(restaurant_id, deque(maxlen=self.backlog))
+            buf.append((self._last_seq, event))
+            self._cond.notify_all()
+            return event.id
+
+    def read(self, restaurant_id, after_id, timeout):
+        with self._cond:
+            token, _, seq = str(after_id).rpartition("-")
+            if token != self._token or not seq.isdigit() or int(seq) > self._last_seq:
+                # Id from another process or a previous run
+                raise EventGap()
+            after = int(seq)
+            buf = self._events.get(restaurant_id)
+            if buf and len(buf) == buf.maxlen and buf[0][0] > after + 1:
+                raise EventGap()
+
+            self._cond.wait_for(lambda: self._newest(restaurant_id) > after, timeout)
+            buf = self._events.get(restaurant_id, ())
+            return [event for seq, event in buf if seq > after]
+
+    def latest_id(self):
+        with self._cond:
+            return f"{self._token}-{self._last_seq}"
+
+    def _newest(self, restaurant_id):
+        buf = self._events.get(restaurant_id)
+        return buf[-1][0] if buf else 0
+
+
+class RedisEventBroker(EventBroker):
+    """
+    One Redis stream per restaurant (XADD capped at about `backlog` entries),
+    shared by every worker and host. Stream ids ("<ms>-<seq>") are the event
+    ids, so Last-Event-ID resumes on any worker; listeners block in XREAD on
+    their own pooled connection.
+    """
+
+    STREAM_ID = re.compile(r"^\d+-\d+$")
+    MAX_SEQ = 2 ** 64 - 1
+
+    def __init__(self, app):
+        if redis is None:
+            raise RuntimeError("ORDER_EVENTS_BROKER is a redis:// URL but the redis package is not installed")
+        self.prefix = app.config.setdefault("ORDER_EVENTS_PREFIX", "qrmenu:events:")
+        self.backlog = app.config["ORDER_EVENTS_BACKLOG"]
+        self.client = redis.Redis.from_url(app.config["ORDER_EVENTS_BROKER"], decode_responses=True)
+
+    def publish(self, restaurant_id, event_type, data):
+        try:
+            return self.client.xadd(f"{self.prefix}{restaurant_id}", {"type": event_type, "data": data},
+                                    maxlen=self.backlog, approximate=True)
+        except redis.RedisError:
+            # The write already committed; screens catch up on their next refetch
+            current_app.logger.warning("order event broker unavailable; %s not delivered", event_type)
+            return None
+
+    def read(self, restaurant_id, after_id, timeout):
+        after_id = str(after_id)
+        if not self.STREAM_ID.match(after_id):
+            raise EventGap()
+        key = f"{self.prefix}{restaurant_id}"
+        oldest = self.client.xrange(key, count=1)
+        if oldest and self.client.xlen(key) >= self.backlog and self._key(oldest[0][0]) > self._key(after_id):
+            raise EventGap()  # trimmed past the client's position
+        streams = self.client.xread({key: after_id}, count=self.backlog, block=max(1, int(timeout * 1000)))
+        return [Event(event_id, fields["type"], fields["data"]) for _, entries in streams
+                for event_id, fields in entries]
+
+    def latest_id(self):
+        # Just before the Redis clock's current millisecond, so nothing
+        # published from now on compares below it
+        seconds, micros = self.client.time()
+        return f"{seconds * 1000 + micros // 1000 - 1}-{self.MAX_SEQ}"
+
+    @staticmethod
+    def _key(stream_id):
+        ms, _, seq = stream_id.partition("-")
+        return int(ms), int(seq)
+
+
+class OrderEvents:
+    def __init__(self):
+        self.broker = None
+
+    def init_app(self, app):
+        spec = app.config.setdefault("ORDER_EVENTS_BROKER", "local")
+        backlog = app.config.setdefault("ORDER_EVENTS_BACKLOG", 500)
+        if spec == "local":
+            self.broker = LocalEventBroker(backlog)
+        elif spec.startswith(("redis://", "rediss://", "unix://")):
+            self.broker = RedisEventBroker(app)
+        else:
+            # "package.module:ClassName", an EventBroker constructed with the app
+            broker_class = import_string(spec)
+            if not (isinstance(broker_class, type) and issubclass(broker_class, EventBroker)):
+                raise TypeError(f"ORDER_EVENTS_BROKER {spec!r} is not an EventBroker subclass")
+            self.broker = broker_class(app)
+        app.extensions["order_events"] = self
+
+    def publish(self, restaurant_id, event_type, payload):
+        # Serialize with the app's JSON provider so datetimes match the REST API
+        return self.broker.publish(restaurant_id, event_type, current_app.json.dumps(payload))
+
+    def read(self, restaurant_id, after_id, timeout):
+        return self.broker.read(restaurant_id, after_id, timeout)
+
+    def latest_id(self):
+        return self.broker.latest_id()
+
+
+order_events = OrderEvents()
+
+
+def format_sse(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
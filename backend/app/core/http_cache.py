@@ -0,0 +1,37 @@
+from flask import request, current_app
+from app.core.compression import etag_variants
+
+
+def cache_control(max_age, stale_while_revalidate=0, public=True):
+    """
+    Build a Cache-Control value. max_age=0 means "store but always revalidate",
+    which keeps 304s cheap without ever serving a stale order status.
+    """
+    if max_age <= 0:
+        return "no-cache"
+    parts = ["public" if public else "private", f"max-age={max_age}"]
+    if stale_while_revalidate:
+        parts.append(f"stale-while-revalidate={stale_while_revalidate}")
+    return ", ".join(parts)
+
+
+def not_modified(etag, cache_control_value):
+    """
+    Return a 304 response if the client already holds `etag` (in any
+    content encoding), else None. Checked before any payload is loaded or
+    serialized.
+    """
+    matched = next((tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)), None)
+    if matched is None:
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(matched)
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = cache_control_value
+    return response
+
+
+def with_cache_headers(response, etag, cache_control_value):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control_value
+    return response
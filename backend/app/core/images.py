@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Longest edge in pixels; images are never upscaled
+VARIANTS = {"thumb": 160, "card": 480, "full": 1280}
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+CHUNK_SIZE = 64 * 1024
+
+# Content-addressed upload URLs: <host>/media/<digest>.<ext>
+MEDIA_URL_RE = re.compile(r"^(?P<base>.*/media/)(?P<digest>[0-9a-f]{32})\.(?P<ext>[a-z]+)$")
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def save_upload(stream, upload_dir, ext):
+    """
+    Stream an upload to disk in chunks, naming it by content hash.
+    Re-uploading identical bytes reuses the existing file. Returns the digest.
+    """
+    from PIL import Image, UnidentifiedImageError  # deferred: keeps app import fast
+
+    os.makedirs(upload_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-")
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+
+        # Header-only check; full decode happens in the worker
+        try:
+            with Image.open(tmp_path) as img:
+                img.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError) as exc:
+            raise InvalidImage(str(exc))
+
+        name = digest.hexdigest()[:32]
+        final_path = os.path.join(upload_dir, f"{name}.{ext}")
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, final_path)
+        return name
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def variant_filename(digest, variant, fmt):
+    return f"{digest}_{variant}.{fmt}"
+
+
+def build_variants(upload_dir, digest, ext):
+    """Write every size/format variant that does not exist yet (atomic renames)."""
+    from PIL import Image, ImageOps
+    source = os.path.join(upload_dir, f"{digest}.{ext}")
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        for variant, edge in VARIANTS.items():
+            resized = img.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            for fmt, (pil_format, options) in FORMATS.items():
+                path = os.path.join(upload_dir, variant_filename(digest, variant, fmt))
+                if os.path.exists(path):
+                    continue
+                frame = resized.convert("RGB") if pil_format == "JPEG" else resized
+                tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+                frame.save(tmp_path, pil_format, **options)
+                os.replace(tmp_path, path)
+
+
+def variant_urls(image_url):
+    """
+    Variant URLs for an image we host, or None for external/legacy URLs.
+    Pure string work so it is safe on the menu hot path.
+    """
+    match = MEDIA_URL_RE.match(image_url or "")
+    if not match:
+        return None
+    base, digest = match.group("base"), match.group("digest")
+    return {
+        variant: {fmt: f"{base}{variant_filename(digest, variant, fmt)}" for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def srcset(variants, fmt="webp"):
+    return ", ".join(f"{urls[fmt]} {VARIANTS[name]}w" for name, urls in variants.items())
+
+
+class ImagePipeline:
+    """
+    Background pool that transcodes uploads so the request returns right after
+    the original is on disk. The executor is created lazily, i.e. after a
+    gunicorn fork, never in the master.
+    """
+
+    def __init__(self):
+        self.upload_dir = None
+        self.max_workers = 2
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.upload_dir = app.config["UPLOAD_FOLDER"]
+        self.max_workers = app.config.setdefault("IMAGE_WORKERS", 2)
+        app.extensions["image_pipeline"] = self
+
+    def submit(self, digest, ext):
+        with self._lock:
+            if digest in self._pending:
+                return None  # same bytes uploaded twice; one job is enough
+            self._pending.add(digest)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="images")
+        return self._executor.submit(self._run, digest, ext)
+
+    def _run(self, digest, ext):
+        try:
+            build_variants(self.upload_dir, digest, ext)
+        except Exception:
+            log.exception("Image processing failed for %s.%s", digest, ext)
+        finally:
+            with self._lock:
+                self._pending.discard(digest)
+
+
+image_pipeline = ImagePipeline()
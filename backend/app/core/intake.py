@@ -0,0 +1,448 @@
+"""
+Write-behind order ingestion (ORDER_INTAKE=1).
+
+create_order validates and prices the cart as usual (one read), then hands
+the finished order to OrderIntake.submit() instead of writing it: the order
+gets an id from a reserved block, is appended to this worker's journal
+(an fsync'd JSON-lines file in ORDER_INTAKE_DIR) and the customer gets 202
+right away. A background thread drains the queue into Order / OrderItem and
+the sales rollups in batched transactions (ORDER_INTAKE_BATCH orders per
+commit), then publishes order.created to kitchen screens.
+
+Crash recovery: each worker holds an exclusive flock on its own journal.
+When a worker starts, it adopts every journal nobody holds (a worker that
+died) and drains it. Replays are idempotent because ids that already exist
+are skipped, so a crash between commit and journal compaction loses
+nothing and duplicates nothing. Without fcntl (Windows dev server) any
+foreign journal is adopted, which is only safe with a single process.
+After a drained batch the journal is rewritten with just the orders still
+queued once it holds twice that many, so it stays bounded under load.
+
+Status lookups: GET /public/orders/<id> may land on a worker that did not
+accept the order. find() then reads the other journals in
+ORDER_INTAKE_DIR. When those are on another host, reserved() still tells
+an id that was handed out from one that never existed.
+
+Backpressure: at ORDER_INTAKE_MAX_PENDING queued orders per worker, submit()
+raises IntakeFull and the endpoint answers 503 with Retry-After.
+
+Ids: orders are written with explicit ids handed out before the INSERT.
+Postgres draws them from the order id sequence, so sync and queued inserts
+never collide. Other databases reserve blocks from the id_allocator table,
+so ORDER_INTAKE must be on for every worker or for none.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import select, insert, update, case, func, text
+from sqlalchemy.exc import OperationalError
+from app.database import db
+from app.models.models import Order, OrderItem, IdAllocator
+from app.core.events import order_events
+from app.core.reports import record_orders
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+JOURNAL_PREFIX = "orders-"
+DEAD_LETTERS = "failed.jsonl"
+
+
+class IntakeFull(Exception):
+    """The queue is at ORDER_INTAKE_MAX_PENDING; the client should retry later."""
+
+
+def _lock(handle):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _read_journal(path):
+    entries = []
+    with open(path, "rb") as handle:
+        for line in handle:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Torn final write from a crash: that order was never acknowledged
+                log.warning("Skipping unreadable journal line in %s", path)
+    return entries
+
+
+class OrderIntake:
+    def __init__(self):
+        self.enabled = False
+        self.app = None
+        self._cond = threading.Condition()
+        self._id_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pending = {}  # order id -> entry, in arrival order
+        self._journal = None
+        self._journal_entries = 0  # lines in the journal, drained ones included
+        self._thread = None
+        self._stopping = False
+        self._ids = iter(())
+        self.drained = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault("ORDER_INTAKE", False)
+        self.directory = app.config.setdefault("ORDER_INTAKE_DIR", os.path.join(app.instance_path, "order-intake"))
+        self.max_pending = app.config.setdefault("ORDER_INTAKE_MAX_PENDING", 1000)
+        self.batch_size = app.config.setdefault("ORDER_INTAKE_BATCH", 100)
+        self.linger = app.config.setdefault("ORDER_INTAKE_LINGER_MS", 20) / 1000
+        self.fsync = app.config.setdefault("ORDER_INTAKE_FSYNC", True)
+        self.id_block = app.config.setdefault("ORDER_INTAKE_ID_BLOCK", 20)
+        self.app = app
+        self._reset()
+        app.extensions["order_intake"] = self
+        self._init_metrics(app)
+
+    def _init_metrics(self, app):
+        from app.core.metrics import metrics
+        self.depth_gauge = self.drain_latency = self.outcomes = None
+        if not metrics.enabled:
+            return
+        from prometheus_client import Counter, Gauge, Histogram
+        from app.core.metrics import LATENCY_BUCKETS
+        self.depth_gauge = Gauge(
+            "order_intake_depth", "Orders acknowledged but not yet written",
+            multiprocess_mode="livesum", registry=metrics.registry)
+        self.drain_latency = Histogram(
+            "order_intake_drain_seconds", "Time from 202 to the order being committed",
+            buckets=LATENCY_BUCKETS, registry=metrics.registry)
+        self.outcomes = Counter(
+            "order_intake_orders", "Queued orders by outcome (drained, failed, rejected)",
+            ["result"], registry=metrics.registry)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Open this worker's journal, adopt orphaned ones and start the drainer (after fork)."""
+        if not self.enabled:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._journal_path = os.path.join(
+                self.directory, f"{JOURNAL_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+            self._journal = self._open_journal([])
+            self._adopt_orphans(os.path.basename(self._journal_path))
+            self._thread = threading.Thread(target=self._run, name="order-intake", daemon=True)
+            self._thread.start()
+
+    def _adopt_orphans(self, own):
+        for name in sorted(os.listdir(self.directory)):
+            if not name.startswith(JOURNAL_PREFIX) or name.startswith(own):
+                continue
+            if name.endswith(".jsonl.new"):
+                # A compaction that died before its rename; the journal itself is intact
+                with open(os.path.join(self.directory, name), "ab") as handle:
+                    if _lock(handle):
+                        os.remove(os.path.join(self.directory, name))
+                continue
+            if not name.endswith(".jsonl"):
+                continue
+            path = os.path.join(self.directory, name)
+            with open(path, "ab") as handle:
+                if not _lock(handle):
+                    continue  # a live worker's journal
+                entries = [e for e in _read_journal(path) if e["id"] not in self._pending]
+                # Copy into our journal before deleting theirs, so a crash here loses nothing
+                self._append(entries)
+                for entry in entries:
+                    self._pending[entry["id"]] = entry
+                os.remove(path)
+            if entries:
+                log.warning("Recovered %d queued orders from %s", len(entries), name)
+        self._set_depth()
+
+    def shutdown(self, timeout=10):
+        """Write out what is queued, then stop the drainer (gunicorn worker_exit)."""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    # --- Submit ---
+
+    def submit(self, restaurant_id, table_number, total, note, lines, event_items, created_at, table_id=None):
+        """Queue a validated order; returns its id. Raises IntakeFull when backlogged."""
+        self.start()
+        if len(self._pending) >= self.max_pending:
+            self._rejected()
+            raise IntakeFull()
+        order_id = self._next_id()
+        entry = {
+            "id": order_id,
+            "restaurant_id": restaurant_id,
+            "table_number": table_number,
+            "table_id": table_id,
+            "total": total,
+            "note": note,
+            "created_at": created_at.isoformat(),
+            "lines": lines,
+            "event_items": event_items,
+            "queued_at": time.time(),
+        }
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self._rejected()
+                raise IntakeFull()
+            self._append([entry])
+            self._pending[order_id] = entry
+            self._set_depth()
+            self._cond.notify()
+        return order_id
+
+    def peek(self, order_id):
+        """The queued entry for `order_id` if this worker has not written it yet."""
+        return self._pending.get(order_id)
+
+    def find(self, order_id):
+        """The queued entry for `order_id` from this worker or any other journal in ORDER_INTAKE_DIR."""
+        entry = self.peek(order_id)
+        if entry is not None or not self.enabled:
+            return entry
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return None
+        own = os.path.basename(self._journal_path) if self._journal is not None else None
+        for name in names:
+            if not name.startswith(JOURNAL_PREFIX) or not name.endswith(".jsonl") or name == own:
+                continue
+            try:
+                entries = _read_journal(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # compacted or adopted meanwhile
+            for entry in entries:
+                if entry["id"] == order_id:
+                    return entry
+        return None
+
+    def reserved(self, order_id):
+        """Whether `order_id` was handed out by some worker (it may still be queued anywhere)."""
+        if db.session.get_bind().dialect.name == "postgresql":
+            high = db.session.execute(text(
+                "SELECT pg_sequence_last_value(pg_get_serial_sequence('\"order\"', 'id'))"
+            )).scalar()
+            return high is not None and order_id <= high
+        high = db.session.execute(select(IdAllocator.next_id).where(IdAllocator.name == "order")).scalar()
+        return high is not None and order_id < high
+
+    def _open_journal(self, entries):
+        """
+        A new journal holding `entries`, locked under a name other workers
+        ignore and then renamed over the journal path: no window in which
+        another worker could mistake it for an orphan or see it half written.
+        """
+        handle = open(self._journal_path + ".new", "wb")
+        _lock(handle)
+        self._write_entries(handle, entries)
+        os.replace(self._journal_path + ".new", self._journal_path)
+        self._journal_entries = len(entries)
+        return handle
+
+    def _write_entries(self, handle, entries):
+        handle.write(b"".join(json.dumps(e, separators=(",", ":")).encode() + b"\n" for e in entries))
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+    def _append(self, entries):
+        if not entries:
+            return
+        self._write_entries(self._journal, entries)
+        self._journal_entries += len(entries)
+
+    def _compact(self):
+        """Drop drained orders from the journal (called with the lock held)."""
+        if not self._pending:
+            # Everything in the journal is committed; start it over
+            self._journal.truncate(0)
+            self._journal.seek(0)
+            self._journal_entries = 0
+        elif self._journal_entries >= 2 * len(self._pending):
+            entries = [dict(e) for e in self._pending.values()]
+            for entry in entries:
+                entry.pop("created", None)
+            old, self._journal = self._journal, self._open_journal(entries)
+            old.close()
+
+    def _rejected(self):
+        self.rejected += 1
+        if self.outcomes is not None:
+            self.outcomes.labels("rejected").inc()
+
+    def _set_depth(self):
+        if self.depth_gauge is not None:
+            self.depth_gauge.set(len(self._pending))
+
+    # --- Ids ---
+
+    def _next_id(self):
+        with self._id_lock:
+            order_id = next(self._ids, None)
+            if order_id is None:
+                self._ids = iter(self._reserve_ids(self.id_block))
+                order_id = next(self._ids)
+            return order_id
+
+    def _reserve_ids(self, count):
+        """
+        Runs on (and commits) the request's session: create_order has only read
+        at this point, and a second pooled connection per request could starve
+        the pool under exactly the burst this mode is for.
+        """
+        if db.session.get_bind().dialect.name == "postgresql":
+            ids = list(db.session.execute(text(
+                "SELECT nextval(pg_get_serial_sequence('\"order\"', 'id')) FROM generate_series(1, :n)"
+            ), {"n": count}).scalars())
+            db.session.commit()
+            return ids
+        # Never hand out ids below what synchronous inserts already used
+        table = IdAllocator.__table__
+        floor = select(func.coalesce(func.max(Order.id), 0) + 1).scalar_subquery()
+        start = case((table.c.next_id > floor, table.c.next_id), else_=floor)
+        end = db.session.execute(
+            update(table).where(table.c.name == "order").values(next_id=start + count).returning(table.c.next_id)
+        ).scalar()
+        db.session.commit()
+        if end is None:
+            raise RuntimeError("id_allocator has no 'order' row; run `flask db upgrade`")
+        return list(range(end - count, end))
+
+    # --- Drain ---
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending:
+                    return  # stopping and empty
+                # Give a burst a moment to accumulate into one transaction
+                deadline = time.monotonic() + self.linger
+                while len(self._pending) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        break
+                batch = list(self._pending.values())[:self.batch_size]
+            try:
+                with self.app.app_context():
+                    done = self._drain(batch)
+                backoff = 0.0
+            except OperationalError:
+                # Database busy or unreachable: keep everything queued and retry
+                backoff = min(max(backoff * 2, 0.05), 5.0)
+                log.warning("Order intake drain failed; retrying in %.2fs", backoff, exc_info=True)
+                time.sleep(backoff)
+                continue
+            except Exception:
+                log.exception("Order intake crashed while draining")
+                time.sleep(1)
+                continue
+            with self._cond:
+                for order_id in done:
+                    self._pending.pop(order_id, None)
+                self._compact()
+                self._set_depth()
+
+    def _drain(self, batch):
+        """Write `batch`; returns the ids that may leave the queue (written or dead-lettered)."""
+        try:
+            self._write(batch)
+            return [e["id"] for e in batch]
+        except OperationalError:
+            db.session.rollback()
+            raise
+        except Exception:
+            db.session.rollback()
+            if len(batch) == 1:
+                self._dead_letter(batch[0])
+                return [batch[0]["id"]]
+        # Find the bad order(s) without holding back the rest
+        done = []
+        for entry in batch:
+            done.extend(self._drain([entry]))
+        return done
+
+    def _write(self, batch):
+        ids = [e["id"] for e in batch]
+        existing = set(db.session.execute(select(Order.id).where(Order.id.in_(ids))).scalars())
+        fresh = [e for e in batch if e["id"] not in existing]  # replayed after a crash otherwise
+        if fresh:
+            for entry in fresh:
+                entry["created"] = datetime.fromisoformat(entry["created_at"])
+            db.session.execute(insert(Order), [{
+                "id": e["id"], "restaurant_id": e["restaurant_id"], "table_number": e["table_number"],
+                "table_id": e.get("table_id"), "total_amount": e["total"], "note": e["note"],
+                "status": "PENDING", "created_at": e["created"], "revision": 1,
+            } for e in fresh])
+            db.session.execute(insert(OrderItem), [
+                dict(line, order_id=e["id"]) for e in fresh for line in e["lines"]
+            ])
+            record_orders([(e["restaurant_id"], e["created"], e["total"], e["lines"]) for e in fresh])
+        db.session.commit()
+
+        now = time.time()
+        for entry in fresh:
+            order_events.publish(entry["restaurant_id"], "order.created", {
+                "id": entry["id"],
+                "table": entry["table_number"],
+                "total": entry["total"],
+                "status": "PENDING",
+                "revision": 1,
+                "itemsCount": len(entry["event_items"]),
+                "note": entry["note"],
+                "createdAt": entry["created"],
+                "items": entry["event_items"],
+            })
+            if self.drain_latency is not None:
+                self.drain_latency.observe(now - entry["queued_at"])
+        self.drained += len(fresh)
+        if self.outcomes is not None and fresh:
+            self.outcomes.labels("drained").inc(len(fresh))
+
+    def _dead_letter(self, entry):
+        log.error("Order %s could not be written; moved to %s", entry["id"], DEAD_LETTERS, exc_info=True)
+        entry.pop("created", None)
+        with open(os.path.join(self.directory, DEAD_LETTERS), "ab") as handle:
+            handle.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+        self.failed += 1
+        if self.outcomes is not None:
+            self.outcomes.labels("failed").inc()
+
+    def stats(self):
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "oldest_age_seconds": round(time.time() - oldest["queued_at"], 3) if oldest else 0.0,
+            "drained": self.drained,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+order_intake = OrderIntake()
@@ -0,0 +1,45 @@
+"""
+JSON provider backed by orjson when it is installed, otherwise Flask's
+stdlib provider. Output matches the default provider's semantics: keys
+sorted, datetimes as HTTP dates (via the same `default` hook), compact
+unless in debug mode; only non-ASCII text is emitted as UTF-8 instead of
+\\u escapes.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: `pip install orjson`
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    if orjson is not None:
+        # Datetimes go through DefaultJSONProvider.default so API dates keep their format
+        OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumpb(self, obj, indent=False):
+        options = self.OPTIONS | orjson.OPT_INDENT_2 if indent else self.OPTIONS
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)  # stdlib-only options (cls, ...)
+        return self.dumpb(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumpb(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def json_provider_class(app):
+    """FastJSONProvider if orjson is importable and JSON_FAST is on, else the stdlib provider."""
+    if orjson is not None and app.config.get("JSON_FAST", True):
+        return FastJSONProvider
+    return DefaultJSONProvider
@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select, update, func, and_
+from app.database import db
+from app.models.models import Restaurant, Category, MenuItem, Order
+from app.core.images import variant_urls, srcset
+from app.core.compression import EncodedBody
+
+# Bump when the payload shape changes so clients drop old ETags
+MENU_SCHEMA = 2
+# Session.info key: restaurants whose menu the current transaction changed
+MENU_CHANGES = "menu_changes"
+
+
+class MenuCache:
+    """
+    Per-process LRU of serialized public menus, keyed by restaurant id.
+    Each entry remembers the menu_version it was built from, so a bump in the
+    database invalidates it in every worker on the next request.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # restaurant_id -> (menu_version, EncodedBody)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.maxsize = app.config.setdefault("MENU_CACHE_SIZE", 256)
+        app.extensions["menu_cache"] = self
+
+    def get(self, restaurant_id, version):
+        with self._lock:
+            entry = self._entries.get(restaurant_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(restaurant_id)
+            return entry[1]
+
+    def put(self, restaurant_id, version, body):
+        with self._lock:
+            self._entries[restaurant_id] = (version, body)
+            self._entries.move_to_end(restaurant_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+menu_cache = MenuCache()
+
+
+def bump_menu_version(restaurant_id):
+    """
+    Increment the restaurant's menu version in the current transaction.
+    Call before commit from every admin write that changes the public menu.
+    The id is also noted on the session for after-commit hooks (app.core.publish).
+    """
+    db.session.info.setdefault(MENU_CHANGES, set()).add(restaurant_id)
+    db.session.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(menu_version=Restaurant.menu_version + 1)
+    )
+
+
+def build_menu_payload(restaurant_id):
+    """
+    Public menu as plain dicts from a single column-level query (no ORM
+    instances): restaurant -> active categories -> active items, already in
+    display order. Empty categories are kept.
+    """
+    rows = db.session.execute(
+        select(
+            Restaurant.name, Restaurant.slug, Category.id, Category.name,
+            MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.price,
+            MenuItem.currency, MenuItem.image_url, MenuItem.sort_order,
+        )
+        .select_from(Restaurant)
+        .outerjoin(Category, and_(Category.restaurant_id == Restaurant.id, Category.is_active.is_(True)))
+        .outerjoin(MenuItem, and_(MenuItem.category_id == Category.id, MenuItem.is_active.is_(True)))
+        .where(Restaurant.id == restaurant_id)
+        .order_by(Category.sort_order, Category.id, MenuItem.sort_order, MenuItem.id)
+    ).all()
+
+    response_categories = []
+    current = None
+    for (_, _, cat_id, cat_name, item_id, name, description, price,
+         currency, image_url, sort_order) in rows:
+        if cat_id is None:
+            continue
+        if current is None or current["id"] != cat_id:
+            current = {"id": cat_id, "name": cat_name, "items": []}
+            response_categories.append(current)
+        if item_id is None:
+            continue
+        item = {
+            "id": item_id, "name": name, "description": description,
+            "price": price, "currency": currency, "image_url": image_url,
+            "sort_order": sort_order
+        }
+        variants = variant_urls(image_url)
+        if variants:
+            item["image_variants"] = variants
+            item["image_srcset"] = srcset(variants)
+        current["items"].append(item)
+
+    return {
+        "restaurant_name": rows[0][0],
+        "slug": rows[0][1],
+        "categories": response_categories
+    }
+
+
+def render_menu(restaurant_id):
+    # Same bytes jsonify() would produce, so cached and live responses match.
+    # Compressed variants are built on first use and cached alongside.
+    payload = build_menu_payload(restaurant_id)
+    return EncodedBody((current_app.json.dumps(payload) + "\n").encode("utf-8"))
+
+
+def get_menu_version(slug):
+    """
+    Return (id, menu_version) for `slug`, or None if the restaurant does not exist.
+    This is the only query a cache hit or a 304 revalidation costs.
+    """
+    return db.session.execute(
+        select(Restaurant.id, Restaurant.menu_version).where(Restaurant.slug == slug)
+    ).first()
+
+
+def get_menu_body(restaurant_id, version):
+    body = menu_cache.get(restaurant_id, version)
+    if body is None:
+        body = render_menu(restaurant_id)
+        menu_cache.put(restaurant_id, version, body)
+    return body
+
+
+def menu_etag(restaurant_id, version):
+    return f"menu-{MENU_SCHEMA}-{restaurant_id}-{version}"
+
+
+def warm_menu_cache(limit):
+    """
+    Prebuild snapshots for the `limit` restaurants with the most orders.
+    """
+    if not limit:
+        return 0
+
+    popular = db.session.execute(
+        select(Order.restaurant_id)
+        .group_by(Order.restaurant_id)
+        .order_by(func.count(Order.id).desc())
+        .limit(limit)
+    ).scalars().all()
+
+    for restaurant_id, version in db.session.execute(
+        select(Restaurant.id, Restaurant.menu_version).where(Restaurant.id.in_(popular))
+    ):
+        menu_cache.put(restaurant_id, version, render_menu(restaurant_id))
+    return len(popular)
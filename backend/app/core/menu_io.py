@@ -0,0 +1,266 @@
+import csv
+import io
+import json
+import math
+from sqlalchemy import select, insert, update
+from app.database import db
+from app.models.models import Category, MenuItem
+from app.core.menu_cache import bump_menu_version
+
+COLUMNS = ["id", "category", "name", "description", "price", "currency", "image_url", "sort_order", "is_active"]
+BATCH_SIZE = 500
+JSON_CHUNK_SIZE = 64 * 1024
+EXPORT_FETCH_SIZE = 500
+
+
+# --- Parsing ---
+
+def _text(stream):
+    if not hasattr(stream, "read1"):
+        stream = io.BufferedReader(stream)
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(_text(stream))
+    for row in reader:
+        yield row
+
+
+def iter_json_rows(stream):
+    """Accept either a JSON array or JSON Lines; both are parsed incrementally."""
+    text = _text(stream)
+    first = text.read(1)
+    while first and first.isspace():
+        first = text.read(1)
+    if first == "[":
+        yield from _iter_json_array(text)
+        return
+    pending = first
+    for line in text:
+        line = (pending + line).strip()
+        pending = ""
+        if line:
+            yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def _iter_json_array(text):
+    """Elements of a JSON array whose "[" was already read, decoded one at a time."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    after_value = False  # expecting "," or "]" rather than an element
+    first = True
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos < len(buf):
+            if after_value:
+                if buf[pos] == "]":
+                    return
+                if buf[pos] != ",":
+                    raise ValueError(f"expected ',' or ']' in JSON array, got {buf[pos]!r}")
+                pos, after_value = pos + 1, False
+                continue
+            if first and buf[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = len(buf)  # probably cut off; read more and retry
+            # A value ending right at the buffer end may be a cut-off number
+            if end < len(buf) or eof:
+                yield value
+                pos, after_value, first = end, True, False
+                continue
+        elif eof:
+            raise ValueError("unterminated JSON array")
+        chunk = text.read(JSON_CHUNK_SIZE)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def _bool(value, default=True):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "evet")
+
+
+def _clean(raw):
+    """Normalize one input row or raise ValueError with a readable message."""
+    name = (raw.get("name") or "").strip()
+    category = (raw.get("category") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    if not category:
+        raise ValueError("category is required")
+    try:
+        price = float(raw.get("price"))
+    except (TypeError, ValueError):
+        raise ValueError("price must be a number")
+    if not math.isfinite(price):
+        # float() takes "nan" / "inf" / "1e999"; SQLite would store NaN as NULL
+        raise ValueError("price must be a finite number")
+    if price < 0:
+        raise ValueError("price must not be negative")
+    try:
+        sort_order = int(raw.get("sort_order") or 0)
+        item_id = int(raw["id"]) if raw.get("id") not in (None, "") else None
+    except (TypeError, ValueError):
+        raise ValueError("id and sort_order must be integers")
+    return {
+        "id": item_id,
+        "category": category,
+        "name": name,
+        "description": raw.get("description") or None,
+        "price": price,
+        "currency": raw.get("currency") or "TRY",
+        "image_url": raw.get("image_url") or None,
+        "sort_order": sort_order,
+        "is_active": _bool(raw.get("is_active")),
+    }
+
+
+# --- Import ---
+
+def import_menu(restaurant_id, rows, dry_run=False):
+    """
+    Upsert categories (by name) and items (by id, else by category + name)
+    for one restaurant in a single transaction. `rows` is consumed as it
+    arrives: every BATCH_SIZE valid rows are written with batched statements,
+    so memory stays flat however large the upload. Invalid rows are skipped
+    and reported; dry_run rolls everything back.
+    """
+    # One query each for existing categories and items; all validation uses these maps
+    categories = {
+        name.casefold(): cat_id for cat_id, name in db.session.execute(
+            select(Category.id, Category.name).where(Category.restaurant_id == restaurant_id)
+        )
+    }
+    items_by_key = {}
+    item_ids = set()
+    for item_id, category_id, name in db.session.execute(
+        select(MenuItem.id, MenuItem.category_id, MenuItem.name).where(MenuItem.restaurant_id == restaurant_id)
+    ):
+        items_by_key[(category_id, name.casefold())] = item_id
+        item_ids.add(item_id)
+
+    report = {"dry_run": dry_run, "created_categories": 0, "created_items": 0, "updated_items": 0, "errors": []}
+    created_ids = set()  # items inserted by this import; later rows for them update
+    batch = []
+    for line_no, raw in enumerate(rows, start=1):
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("row must be an object")
+            row = _clean(raw)
+        except ValueError as exc:
+            report["errors"].append({"row": line_no, "error": str(exc)})
+            continue
+        if row["id"] is not None and row["id"] not in item_ids:
+            report["errors"].append({"row": line_no, "error": f"item {row['id']} not found"})
+            continue
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            _write_batch(restaurant_id, batch, categories, items_by_key, created_ids, report)
+            batch = []
+    _write_batch(restaurant_id, batch, categories, items_by_key, created_ids, report)
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        if report["created_items"] or report["updated_items"]:
+            bump_menu_version(restaurant_id)
+        db.session.commit()
+    return report
+
+
+def _write_batch(restaurant_id, batch, categories, items_by_key, created_ids, report):
+    """Write one batch of cleaned rows: new categories, new items, updates. Updates the maps."""
+    # New categories in one multi-row INSERT ... RETURNING
+    new_names = {}
+    for row in batch:
+        key = row["category"].casefold()
+        if key not in categories and key not in new_names:
+            new_names[key] = row["category"]
+    if new_names:
+        base_order = len(categories)
+        created = db.session.execute(
+            insert(Category).returning(Category.id, Category.name),
+            [
+                {"restaurant_id": restaurant_id, "name": name, "sort_order": base_order + i + 1, "is_active": True}
+                for i, name in enumerate(new_names.values())
+            ]
+        )
+        for cat_id, name in created:
+            categories[name.casefold()] = cat_id
+        report["created_categories"] += len(new_names)
+
+    new_items, updates = {}, []
+    for row in batch:
+        category_id = categories[row.pop("category").casefold()]
+        key = (category_id, row["name"].casefold())
+        item_id = row.pop("id") or items_by_key.get(key)
+        row["category_id"] = category_id
+        if item_id:
+            updates.append({"id": item_id, **row})
+        else:
+            # The same new item repeated in one batch: last row wins
+            new_items[key] = {"restaurant_id": restaurant_id, **row}
+
+    if new_items:
+        # RETURNING the ids so repeats in later batches become updates
+        for item_id, category_id, name in db.session.execute(
+            insert(MenuItem).returning(MenuItem.id, MenuItem.category_id, MenuItem.name),
+            list(new_items.values())
+        ):
+            items_by_key[(category_id, name.casefold())] = item_id
+            created_ids.add(item_id)
+        report["created_items"] += len(new_items)
+    if updates:
+        db.session.execute(update(MenuItem), updates)
+        report["updated_items"] += sum(1 for u in updates if u["id"] not in created_ids)
+
+
+# --- Export ---
+
+def iter_export_rows(restaurant_id):
+    # yield_per streams with a server-side cursor (Postgres) instead of loading the menu
+    result = db.session.execute(
+        select(
+            MenuItem.id, Category.name, MenuItem.name, MenuItem.description, MenuItem.price,
+            MenuItem.currency, MenuItem.image_url, MenuItem.sort_order, MenuItem.is_active
+        )
+        .join(Category, Category.id == MenuItem.category_id)
+        .where(MenuItem.restaurant_id == restaurant_id)
+        .order_by(Category.sort_order, Category.id, MenuItem.sort_order, MenuItem.id)
+        .execution_options(yield_per=EXPORT_FETCH_SIZE)
+    )
+    for row in result:
+        yield dict(zip(COLUMNS, row))
+
+
+def export_csv(rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+
+def export_json(rows):
+    yield "["
+    sep = ""
+    for row in rows:
+        yield sep + json.dumps(row, ensure_ascii=False)
+        sep = ",\n"
+    yield "]\n"
@@ -0,0 +1,95 @@
+"""
+Request instrumentation exported in Prometheus text format at /metrics.
+
+Every request is recorded by route template and method: count (by status),
+latency, response size and time spent in the database. Under gunicorn set
+PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so each worker writes to a
+shared directory and a scrape of any worker returns totals for all of them.
+"""
+import os
+import time
+from flask import g, request
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+from app.core.querylog import query_log
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.registry = None
+        self._children = {}  # (method, route, status) -> bound metric children
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_TOKEN", "")
+        app.extensions["metrics"] = self
+        if not self.enabled:
+            return
+
+        # Private registry: create_app() may run more than once per process (tests, scripts)
+        self.registry = CollectorRegistry(auto_describe=True)
+        self._children = {}
+        labels = ["method", "route"]
+        self.requests = Counter(
+            "http_requests", "HTTP requests served", labels + ["status"], registry=self.registry)
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Time from request start to response",
+            labels, buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.size = Histogram(
+            "http_response_size_bytes", "Response body size (streamed responses excluded)",
+            labels, buckets=SIZE_BUCKETS, registry=self.registry)
+        self.db_time = Histogram(
+            "http_request_db_seconds", "Time spent executing SQL per request",
+            labels, buckets=LATENCY_BUCKETS, registry=self.registry)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    # --- Hooks ---
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+
+    def _after_request(self, response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        rule = request.url_rule
+        key = (request.method, rule.rule if rule is not None else UNMATCHED_ROUTE, response.status_code)
+        children = self._children.get(key)
+        if children is None:
+            # .labels() takes a lock and builds the label tuple; do it once per key
+            method, route, status = key
+            children = self._children[key] = (
+                self.requests.labels(method, route, str(status)),
+                self.latency.labels(method, route),
+                self.db_time.labels(method, route),
+                self.size.labels(method, route),
+            )
+        count, latency, db_time, size = children
+        count.inc()
+        latency.observe(elapsed)
+        db_time.observe(query_log.stats()[1])  # counted by app.core.querylog
+        if not response.is_streamed:
+            size.observe(response.content_length or 0)
+        return response
+
+    # --- Export ---
+
+    def render(self):
+        """Returns (body, content_type) for a scrape."""
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = self.registry
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+metrics = Metrics()
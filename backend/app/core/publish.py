@@ -0,0 +1,253 @@
+"""
+Static menu publishing.
+
+Renders each restaurant's public menu (the get_menu payload plus branding
+settings) to content-hashed files that nginx, a CDN or the frontend host
+can serve without reaching gunicorn:
+
+    <MENU_PUBLISH_DIR>/<slug>/menu.<hash>.json       immutable, cache forever
+    <MENU_PUBLISH_DIR>/<slug>/menu.<hash>.json.gz    precompressed (gzip_static)
+    <MENU_PUBLISH_DIR>/<slug>/menu.<hash>.json.br    precompressed (brotli_static), with Brotli installed
+    <MENU_PUBLISH_DIR>/<slug>/current.json           {"version", "hash", "path", ...}; always revalidated
+
+Files are written under temporary names and renamed into place, the
+pointer last, so readers see the old menu or the new one, never a mix. The
+last MENU_PUBLISH_KEEP versions stay on disk for clients that fetched an
+older pointer.
+
+`flask menus publish` republishes every restaurant whose pointer is behind
+its menu_version (all of them with --force) on a thread pool. With
+MENU_PUBLISH=1, every admin write that bumps menu_version also queues a
+background republish of that restaurant once its transaction commits.
+GET /api/public/restaurants/<slug>/menu stays the live fallback.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import click
+from flask import current_app, has_app_context
+from flask.cli import AppGroup
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.database import db
+from app.models.models import Restaurant
+from app.core.menu_cache import MENU_SCHEMA, MENU_CHANGES, build_menu_payload
+from app.core.compression import ENCODINGS, encode
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+POINTER = "current.json"
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+PUBLISH_COLUMNS = (Restaurant.id, Restaurant.slug, Restaurant.menu_version, Restaurant.theme_color,
+                   Restaurant.wifi_ssid, Restaurant.wifi_password)
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_pointer_thread_lock = threading.Lock()
+
+
+@contextmanager
+def _pointer_lock(directory):
+    # Publishers in other threads and workers may race on one restaurant
+    with _pointer_thread_lock, open(os.path.join(directory, ".lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def read_pointer(directory):
+    try:
+        with open(os.path.join(directory, POINTER), "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def render_static_menu(row):
+    """Bytes of the published document: the public menu payload plus settings."""
+    payload = build_menu_payload(row.id)
+    payload["schema"] = MENU_SCHEMA
+    payload["version"] = row.menu_version
+    payload["settings"] = {
+        "theme_color": row.theme_color,
+        "wifi_ssid": row.wifi_ssid,
+        "wifi_password": row.wifi_password,
+    }
+    return (current_app.json.dumps(payload) + "\n").encode("utf-8")
+
+
+class MenuPublisher:
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.keep = 3
+        self.max_workers = 4
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.directory = app.config.get("MENU_PUBLISH_DIR") or os.path.join(app.instance_path, "published-menus")
+        self.keep = max(1, app.config.setdefault("MENU_PUBLISH_KEEP", 3))
+        self.max_workers = app.config.setdefault("MENU_PUBLISH_WORKERS", 4)
+        self.enabled = app.config.setdefault("MENU_PUBLISH", False)
+        app.extensions["menu_publisher"] = self
+        if self.enabled and not event.contains(Session, "after_commit", _after_commit):
+            event.listen(Session, "after_commit", _after_commit)
+            event.listen(Session, "after_rollback", _after_rollback)
+
+    # --- Publishing ---
+
+    def publish(self, row, force=False):
+        """
+        Publish one restaurant (a PUBLISH_COLUMNS row). Returns "published",
+        or "current" when its pointer already has this menu_version.
+        """
+        if not row.slug or row.slug.startswith(".") or "/" in row.slug or os.sep in row.slug:
+            raise ValueError(f"unsafe slug for a path: {row.slug!r}")
+        directory = os.path.join(self.directory, row.slug)
+        pointer = read_pointer(directory)
+        if not force and pointer and pointer.get("version", 0) >= row.menu_version:
+            return "current"
+
+        raw = render_static_menu(row)
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+        name = f"menu.{digest}.json"
+        path = os.path.join(directory, name)
+        os.makedirs(directory, exist_ok=True)
+        # Content-addressed: an existing file already has all its variants,
+        # since the raw file is renamed into place after them
+        if not os.path.exists(path):
+            for encoding in ENCODINGS:
+                _write_atomic(path + SUFFIXES[encoding], encode(raw, encoding, cached=True))
+            _write_atomic(path, raw)
+
+        with _pointer_lock(directory):
+            # The newest version wins
+            current = read_pointer(directory)
+            if current and current.get("version", 0) > row.menu_version:
+                return "current"
+            _write_atomic(os.path.join(directory, POINTER), json.dumps({
+                "slug": row.slug,
+                "version": row.menu_version,
+                "hash": digest,
+                "path": name,
+                "bytes": len(raw),
+                "encodings": list(ENCODINGS),
+                "publishedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }).encode("utf-8"))
+            self._prune(directory, name)
+        return "published"
+
+    def _prune(self, directory, current):
+        published = sorted(
+            (entry for entry in os.scandir(directory)
+             if entry.name.startswith("menu.") and entry.name.endswith(".json") and entry.name != current),
+            key=lambda entry: entry.stat().st_mtime, reverse=True,
+        )
+        for entry in published[self.keep - 1:]:
+            for suffix in ("", *SUFFIXES.values()):
+                try:
+                    os.remove(entry.path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def publish_all(self, slugs=None, force=False, workers=None):
+        """Publish every restaurant (or `slugs`) on a thread pool. Returns {outcome: count}."""
+        query = select(*PUBLISH_COLUMNS).order_by(Restaurant.id)
+        if slugs:
+            query = query.where(Restaurant.slug.in_(slugs))
+        rows = db.session.execute(query).all()
+        db.session.remove()
+        app = current_app._get_current_object()
+
+        def job(row):
+            # Own app context, so each thread gets its own session and connection
+            with app.app_context():
+                try:
+                    return self.publish(row, force)
+                except Exception:
+                    log.exception("Publishing the menu of %s failed", row.slug)
+                    return "failed"
+
+        counts = {"published": 0, "current": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=workers or self.max_workers, thread_name_prefix="publish") as pool:
+            for outcome in pool.map(job, rows):
+                counts[outcome] += 1
+        return counts
+
+    # --- Background republish after admin writes ---
+
+    def submit(self, restaurant_ids):
+        app = current_app._get_current_object()
+        with self._lock:
+            fresh = [r for r in restaurant_ids if r not in self._pending]
+            if not fresh:
+                return  # a queued job will read the latest menu anyway
+            self._pending.update(fresh)
+            if self._executor is None:
+                # Created lazily, i.e. after a gunicorn fork, never in the master
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="publish")
+        for restaurant_id in fresh:
+            self._executor.submit(self._run, app, restaurant_id)
+
+    def _run(self, app, restaurant_id):
+        with self._lock:
+            # Writes committed from here on queue another run
+            self._pending.discard(restaurant_id)
+        try:
+            with app.app_context():
+                row = db.session.execute(select(*PUBLISH_COLUMNS).where(Restaurant.id == restaurant_id)).first()
+                if row is not None:
+                    self.publish(row)
+        except Exception:
+            log.exception("Publishing the menu of restaurant %s failed", restaurant_id)
+
+
+menu_publisher = MenuPublisher()
+
+
+def _after_commit(session):
+    changed = session.info.pop(MENU_CHANGES, None)
+    if changed and menu_publisher.enabled and has_app_context():
+        menu_publisher.submit(changed)
+
+
+def _after_rollback(session):
+    session.info.pop(MENU_CHANGES, None)
+
+
+# --- CLI ---
+
+menus_cli = AppGroup("menus", help="Static menu files.")
+
+
+@menus_cli.command("publish")
+@click.option("--slug", "slugs", multiple=True, help="Only this restaurant (repeatable).")
+@click.option("--force", is_flag=True, help="Re-render menus whose published version is current.")
+@click.option("--workers", type=int, default=None, help="Parallel publishers (default MENU_PUBLISH_WORKERS).")
+def publish_command(slugs, force, workers):
+    """Render public menus to content-hashed JSON files in MENU_PUBLISH_DIR."""
+    started = time.perf_counter()
+    counts = menu_publisher.publish_all(slugs, force, workers)
+    click.echo(f"Published {counts['published']}, already current {counts['current']}, "
+               f"failed {counts['failed']} in {time.perf_counter() - started:.1f}s -> {menu_publisher.directory}")
+    if counts["failed"]:
+        raise SystemExit(1)
@@ -0,0 +1,178 @@
+"""
+Per-request SQL accounting.
+
+One pair of cursor events counts statements and time per thread (i.e. per
+request under gthread). The numbers feed the /metrics DB-time histogram,
+optional X-Query-Count / X-Query-Time-Ms response headers, a slow-query log
+(statement, parameters and EXPLAIN plan) and `query_budget`, which fails a
+check when a block issues more statements than declared.
+"""
+import functools
+import logging
+import threading
+import time
+from flask import request
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+PARAMS_LOG_LIMIT = 1000
+
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, budget, statements):
+        self.budget = budget
+        self.statements = statements
+        listing = "\n".join(f"  {i}. {s}" for i, s in enumerate(statements, start=1))
+        super().__init__(f"{len(statements)} SQL statements issued, budget is {budget}:\n{listing}")
+
+
+class QueryLog:
+    def __init__(self):
+        self.debug_headers = False
+        self.slow_seconds = None
+        self.explain_slow = True
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.debug_headers = app.config.setdefault("QUERY_DEBUG_HEADERS", False)
+        slow_ms = app.config.setdefault("SLOW_QUERY_MS", 200)
+        self.slow_seconds = slow_ms / 1000 if slow_ms > 0 else None
+        self.explain_slow = app.config.setdefault("SLOW_QUERY_EXPLAIN", True)
+        app.extensions["query_log"] = self
+
+        app.before_request(self.reset)
+        if self.debug_headers:
+            app.after_request(self._add_headers)
+        with app.app_context():
+            from app.database import db
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", self._before_execute)
+                event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    # --- Per-thread counters ---
+
+    def reset(self):
+        self._local.count = 0
+        self._local.seconds = 0.0
+
+    def stats(self):
+        """(statements, seconds) issued by this thread since the last reset (request start)."""
+        return getattr(self._local, "count", 0), getattr(self._local, "seconds", 0.0)
+
+    def _budgets(self):
+        budgets = getattr(self._local, "budgets", None)
+        if budgets is None:
+            budgets = self._local.budgets = []
+        return budgets
+
+    # --- Cursor events ---
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        self._local.started = None
+        self._local.count = getattr(self._local, "count", 0) + 1
+        self._local.seconds = getattr(self._local, "seconds", 0.0) + elapsed
+        for recorded in getattr(self._local, "budgets", ()):
+            recorded.append(" ".join(statement.split()))
+        if self.slow_seconds is not None and elapsed >= self.slow_seconds:
+            self._log_slow(conn, statement, parameters, executemany, elapsed)
+
+    def _log_slow(self, conn, statement, parameters, executemany, elapsed):
+        plan = None
+        if self.explain_slow and not executemany:
+            plan = explain(conn, statement, parameters)
+        params = repr(parameters)
+        if len(params) > PARAMS_LOG_LIMIT:
+            params = params[:PARAMS_LOG_LIMIT] + "..."
+        log.warning(
+            "Slow query (%.1f ms) on %s\n%s\nparameters: %s%s",
+            elapsed * 1000, _endpoint(), statement, params,
+            f"\nplan:\n{plan}" if plan else "",
+        )
+
+    def _add_headers(self, response):
+        count, seconds = self.stats()
+        response.headers["X-Query-Count"] = str(count)
+        response.headers["X-Query-Time-Ms"] = f"{seconds * 1000:.2f}"
+        return response
+
+
+query_log = QueryLog()
+
+
+def _endpoint():
+    try:
+        return f"{request.method} {request.path}"
+    except RuntimeError:  # outside a request (CLI, background thread)
+        return "<no request>"
+
+
+def explain(conn, statement, parameters):
+    """
+    Plan for a statement that just ran, via a separate DBAPI cursor so no
+    SQLAlchemy events fire. On Postgres it runs inside a savepoint so a
+    failing EXPLAIN cannot abort the caller's transaction.
+    """
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    dbapi_conn = conn.connection.dbapi_connection
+    cursor = dbapi_conn.cursor()
+    try:
+        if dialect == "postgresql":
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as exc:
+            if dialect == "postgresql":
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"<EXPLAIN failed: {exc}>"
+        if dialect == "postgresql":
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return "\n".join(str(row[-1]) for row in rows)
+    finally:
+        cursor.close()
+
+
+class query_budget:
+    """
+    Fail when more than `max_statements` SQL statements run inside the block
+    (on this thread). Usable as a context manager or a decorator:
+
+        with query_budget(3):
+            client.post("/api/public/orders", json=...)
+
+        @query_budget(2)
+        def check_order_status(): ...
+
+    Raises QueryBudgetExceeded (an AssertionError) listing the statements.
+    """
+
+    def __init__(self, max_statements):
+        self.max_statements = max_statements
+        self.statements = []
+
+    def __enter__(self):
+        self.statements = []
+        query_log._budgets().append(self.statements)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        query_log._budgets().pop()  # budgets nest, innermost exits first
+        if exc_type is None and len(self.statements) > self.max_statements:
+            raise QueryBudgetExceeded(self.max_statements, self.statements)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with query_budget(self.max_statements):
+                return fn(*args, **kwargs)
+        return wrapper
@@ -0,0 +1,225 @@
+"""
+Admission control for the unauthenticated write endpoints.
+
+Two layers, applied by the `limiter.limit(...)` decorator in this order:
+
+  1. Token buckets keyed per client IP, restaurant slug, table, ... Each rule
+     is "<count>/<period>" (e.g. "10/minute"): a bucket holds up to <count>
+     tokens and refills at count/period per second. An empty bucket answers
+     429 with Retry-After set to when the next token arrives.
+  2. A per-worker concurrency cap. Requests over the cap are shed at once
+     with 503 + Retry-After instead of queueing behind CPU-heavy work
+     (password hashing, order writes) while menu scans wait for a thread.
+
+Buckets live in the worker by default, so with N gunicorn workers a client
+gets up to N times the configured rate. RATE_LIMIT_STORE="redis://..." (needs
+the `redis` package) or a "package.module:Class" naming a RateLimitStore
+subclass shares them across workers and hosts.
+"""
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from flask import current_app, jsonify, request
+from werkzeug.utils import import_string
+
+try:
+    import redis
+except ImportError:  # optional: `pip install redis`
+    redis = None
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+Rule = namedtuple("Rule", ["rate", "burst"])  # tokens per second, bucket size
+Limit = namedtuple("Limit", ["name", "config_key", "key_func"])
+
+
+def parse_rule(value):
+    """'10/minute' -> Rule(rate=10/60, burst=10). Empty, '0' or 'off' disables the rule."""
+    if not value or value in ("0", "off"):
+        return None
+    count, _, period = value.partition("/")
+    count = int(count)
+    period = period.strip().lower().rstrip("s") or "second"
+    seconds = PERIODS[period] if period in PERIODS else float(period)
+    return Rule(count / seconds, count) if count > 0 else None
+
+
+class RateLimitStore(ABC):
+    """Interface for token-bucket state."""
+
+    @abstractmethod
+    def take(self, key, rule, cost=1):
+        """Remove `cost` tokens from bucket `key`. Returns (allowed, retry_after_seconds)."""
+
+
+class LocalRateLimitStore(RateLimitStore):
+    """
+    Buckets in a bounded LRU map shared by the threads of one worker. An
+    evicted bucket was idle long enough to be full again in practice, so
+    eviction only ever errs towards letting a request through.
+    """
+
+    def __init__(self, maxsize=50000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, rule, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (rule.burst, now))
+            tokens = min(rule.burst, tokens + (now - updated) * rule.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rule.rate
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Buckets in Redis, refilled and taken atomically in a Lua script using the
+    Redis clock, so every worker and host shares one view of each bucket.
+    """
+
+    SCRIPT = """
+    local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, app):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_STORE is a redis:// URL but the redis package is not installed")
+        self.prefix = app.config.setdefault("RATE_LIMIT_PREFIX", "qrmenu:rl:")
+        self.client = redis.Redis.from_url(app.config["RATE_LIMIT_STORE"], socket_timeout=0.25)
+        self._take = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, rule, cost=1):
+        try:
+            wait = float(self._take(keys=[self.prefix + key], args=[rule.rate, rule.burst, cost]))
+        except redis.RedisError:
+            current_app.logger.warning("rate limit store unavailable; admitting request")
+            return True, 0.0
+        return wait == 0, wait
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = False
+        self.store = None
+        self._rules = {}  # config key -> Rule or None
+        self._slots = {}  # config key -> BoundedSemaphore or None
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault("RATE_LIMIT_ENABLED", True)
+        spec = app.config.setdefault("RATE_LIMIT_STORE", "local")
+        if spec == "local":
+            self.store = LocalRateLimitStore(app.config.setdefault("RATE_LIMIT_LOCAL_SIZE", 50000))
+        elif spec.startswith(("redis://", "rediss://", "unix://")):
+            self.store = RedisRateLimitStore(app)
+        else:
+            # "package.module:ClassName", a RateLimitStore constructed with the app
+            store_class = import_string(spec)
+            if not (isinstance(store_class, type) and issubclass(store_class, RateLimitStore)):
+                raise TypeError(f"RATE_LIMIT_STORE {spec!r} is not a RateLimitStore subclass")
+            self.store = store_class(app)
+        self._rules = {}
+        self._slots = {}
+        app.extensions["rate_limiter"] = self
+
+    def rule(self, config_key):
+        if config_key not in self._rules:
+            self._rules[config_key] = parse_rule(current_app.config.get(config_key))
+        return self._rules[config_key]
+
+    def slots(self, config_key):
+        if config_key not in self._slots:
+            size = current_app.config.get(config_key) or 0
+            # setdefault: threads racing here must end up sharing one semaphore
+            self._slots.setdefault(config_key, threading.BoundedSemaphore(size) if size > 0 else None)
+        return self._slots[config_key]
+
+    def check(self, scope, limits):
+        """Returns the longest Retry-After among exhausted buckets, or None if admitted."""
+        retry_after = None
+        for limit in limits:
+            rule = self.rule(limit.config_key)
+            if rule is None:
+                continue
+            key = limit.key_func()
+            if key is None:
+                continue
+            allowed, wait = self.store.take(f"{scope}:{limit.name}:{key}", rule)
+            if not allowed:
+                retry_after = max(retry_after or 0, wait)
+        return retry_after
+
+    def limit(self, scope, *limits, concurrency=None):
+        """
+        Decorate a view with token-bucket `limits` (Limit tuples) and an
+        optional concurrency cap read from the `concurrency` config key.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+                retry_after = self.check(scope, limits)
+                if retry_after is not None:
+                    return _reject(429, "Too many requests, please slow down", retry_after)
+                slots = self.slots(concurrency) if concurrency else None
+                if slots is None:
+                    return view(*args, **kwargs)
+                if not slots.acquire(blocking=False):
+                    return _reject(503, "Server busy, please retry", 1)
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    slots.release()
+            return wrapper
+        return decorator
+
+
+def _reject(status, message, retry_after):
+    # Public endpoints report "error", auth ones "msg" (what AdminLogin shows)
+    response = jsonify({"error": message, "msg": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def client_ip():
+    # Behind a proxy, PROXY_COUNT makes ProxyFix set remote_addr from X-Forwarded-For
+    return request.remote_addr or "unknown"
+
+
+def json_field(*names):
+    """Key function reading (and joining) fields of the JSON body; None if any is missing."""
+    def key_func():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return None
+        values = [data.get(name) for name in names]
+        if any(v is None or v == "" for v in values):
+            return None
+        return ":".join(str(v).strip().lower() for v in values)
+    return key_func
+
+
+limiter = RateLimiter()
@@ -0,0 +1,168 @@
+"""
+Read/write split across the primary database and read replicas.
+
+DATABASE_REPLICA_URLS (comma separated) adds one SQLAlchemy bind per
+replica ("replica1", "replica2", ... see app.database.replica_binds).
+RoutingSession then sends SELECTs issued while handling a GET/HEAD request
+to a replica; everything else stays on the primary:
+
+  - writes, flushes and anything that is not a SELECT (text(), connection())
+  - every later statement of a request once it has written
+  - GETs from a client that wrote recently: write requests set a short-lived
+    cookie (REPLICA_STICKY_SECONDS) so a customer polling the order they just
+    placed, or an owner reloading a list they just edited, reads its own writes
+  - replicas that failed their last health probe, errored, or lag more than
+    REPLICA_MAX_LAG_SECONDS behind the primary
+
+Replicas are probed lazily, at most every REPLICA_CHECK_INTERVAL seconds,
+with REPLICA_LAG_QUERY (by default replay lag on Postgres, a liveness check
+elsewhere). Locally, two SQLite files stand in for a primary and a replica:
+
+    sqlite3 instance/qrmenu.db ".backup instance/replica.db"
+    DATABASE_REPLICA_URLS=sqlite:///replica.db flask --app app.main run
+
+See check_replicas.py for an end-to-end check.
+"""
+import random
+import threading
+import time
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql import Select
+
+REPLICA_BIND_PREFIX = "replica"
+SAFE_METHODS = {"GET", "HEAD"}
+
+LAG_QUERIES = {
+    # Caught-up standbys report 0 even when the primary has been idle for a while
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+DEFAULT_LAG_QUERY = "SELECT 0"
+
+
+class ReplicaState:
+    __slots__ = ("key", "healthy", "lag", "checked_at", "error")
+
+    def __init__(self, key):
+        self.key = key
+        self.healthy = False
+        self.lag = None
+        self.checked_at = None  # never probed
+        self.error = None
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.enabled = False
+        self.states = {}  # bind key -> ReplicaState
+        self._probe_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_lag = app.config.setdefault("REPLICA_MAX_LAG_SECONDS", 5.0)
+        self.check_interval = app.config.setdefault("REPLICA_CHECK_INTERVAL", 5.0)
+        self.sticky_seconds = app.config.setdefault("REPLICA_STICKY_SECONDS", 5)
+        self.cookie = app.config.setdefault("REPLICA_STICKY_COOKIE", "qr_primary")
+        self.lag_query = app.config.setdefault("REPLICA_LAG_QUERY", "")
+        keys = sorted(k for k in app.config.get("SQLALCHEMY_BINDS", {}) if k.startswith(REPLICA_BIND_PREFIX))
+        self.states = {key: ReplicaState(key) for key in keys}
+        self.enabled = bool(self.states) and app.config.setdefault("REPLICA_READS", True)
+        app.extensions["replica_router"] = self
+        if not self.enabled:
+            return
+
+        from app.database import db
+        with app.app_context():
+            for key in keys:
+                # A failing replica is taken out of rotation at once, not at the next probe
+                event.listen(db.engines[key], "handle_error", lambda ctx, k=key: self._mark_failed(k, ctx))
+        app.after_request(self._after_request)
+
+    # --- Health ---
+
+    def _mark_failed(self, key, context):
+        state = self.states[key]
+        state.healthy = False
+        state.error = str(context.original_exception)[:200]
+        state.checked_at = time.monotonic()
+
+    def probe(self, key, engine):
+        state = self.states[key]
+        try:
+            with engine.connect() as conn:
+                query = self.lag_query or LAG_QUERIES.get(engine.dialect.name, DEFAULT_LAG_QUERY)
+                lag = conn.execute(text(query)).scalar()
+            state.lag = float(lag or 0)
+            state.healthy = True
+            state.error = None
+        except Exception as exc:
+            state.healthy = False
+            state.error = str(exc)[:200]
+        state.checked_at = time.monotonic()
+
+    def _refresh(self, engines):
+        now = time.monotonic()
+        stale = [s for s in self.states.values()
+                 if s.checked_at is None or now - s.checked_at >= self.check_interval]
+        # One thread probes; the others route on the previous results meanwhile
+        if stale and self._probe_lock.acquire(blocking=False):
+            try:
+                for state in stale:
+                    self.probe(state.key, engines[state.key])
+            finally:
+                self._probe_lock.release()
+
+    def choose(self, engines):
+        """A healthy, caught-up replica engine, or None for the primary."""
+        self._refresh(engines)
+        usable = [s.key for s in self.states.values() if s.healthy and s.lag is not None and s.lag <= self.max_lag]
+        return engines[random.choice(usable)] if usable else None
+
+    def status(self):
+        return {
+            key: {"healthy": s.healthy, "lag_seconds": s.lag, "error": s.error}
+            for key, s in self.states.items()
+        }
+
+    # --- Per request ---
+
+    def replica_for_request(self, engines):
+        """The replica this request reads from (chosen once per request), or None."""
+        if not self.enabled or not has_request_context():
+            return None
+        if "db_replica" not in g:
+            use_replica = request.method in SAFE_METHODS and self.cookie not in request.cookies
+            g.db_replica = self.choose(engines) if use_replica else None
+        return g.db_replica
+
+    def pin_primary(self):
+        if has_request_context():
+            g.db_replica = None
+            g.db_wrote = True
+
+    def _after_request(self, response):
+        if g.get("db_wrote") and self.sticky_seconds > 0:
+            response.set_cookie(self.cookie, "1", max_age=self.sticky_seconds, httponly=True, samesite="Lax")
+        return response
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends request-time reads to a replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and replica_router.enabled:
+            if isinstance(clause, Select) and not self._flushing and self._is_clean():
+                engine = replica_router.replica_for_request(self._db.engines)
+                if engine is not None:
+                    return engine
+            elif self._flushing or getattr(clause, "is_dml", False):
+                # Writes (and whatever follows them) stay on the primary
+                replica_router.pin_primary()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,230 @@
+"""
+Sales rollups: hourly order/revenue totals and daily per-item sales.
+
+Rows are incremented in the same transaction that places or cancels an
+order, so reports never scan Order/OrderItem. Buckets are UTC, like
+Order.created_at. `flask reports rebuild` recomputes them from the orders.
+
+The price is paid on the write path: placing an order costs two more
+statements (3 -> 5, the rollup share of its budget in
+check_query_budgets.py) and a cancellation three more.
+"""
+from collections import defaultdict
+from datetime import timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, delete, func, true
+from sqlalchemy.dialects import postgresql, sqlite
+from app.database import db
+from app.models.models import Order, OrderItem, MenuItem, SalesHourly, ItemSalesDaily
+
+CANCELLED = "CANCELLED"
+REBUILD_BATCH = 1000
+
+_HOURLY_FIELDS = ("orders", "revenue", "cancelled_orders", "cancelled_revenue")
+_ITEM_FIELDS = ("quantity", "revenue")
+
+
+def _hour(created_at):
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(conn, table, rows, fields):
+    """INSERT ... ON CONFLICT (primary key) DO UPDATE SET field = field + excluded.field"""
+    dialect = postgresql if conn.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key],
+        set_={f: table.c[f] + stmt.excluded[f] for f in fields},
+    )
+    conn.execute(stmt, rows)
+
+
+def _apply(entries):
+    """
+    Add `entries` to the rollups in two upserts. Each entry is
+    (restaurant_id, created_at, total, lines, sign, cancellation); rows that
+    land on the same key are summed first, as one statement may not touch a
+    key twice.
+    """
+    hourly = defaultdict(lambda: [0, 0.0, 0, 0.0])
+    per_item = defaultdict(lambda: [0, 0.0])
+    for restaurant_id, created_at, total, lines, sign, cancellation in entries:
+        entry = hourly[(restaurant_id, _hour(created_at))]
+        entry[0] += sign
+        entry[1] += sign * total
+        if cancellation:
+            entry[2] -= sign
+            entry[3] -= sign * total
+        day = created_at.date()
+        for line in lines:
+            item = per_item[(restaurant_id, day, line["menu_item_id"])]
+            item[0] += sign * line["quantity"]
+            item[1] += sign * line["line_total"]
+
+    conn = db.session.connection()
+    if hourly:
+        _upsert(conn, SalesHourly.__table__, [
+            {"restaurant_id": rid, "hour": hour, "orders": orders, "revenue": revenue,
+             "cancelled_orders": cancelled, "cancelled_revenue": cancelled_revenue}
+            for (rid, hour), (orders, revenue, cancelled, cancelled_revenue) in hourly.items()
+        ], _HOURLY_FIELDS)
+    if per_item:
+        _upsert(conn, ItemSalesDaily.__table__, [
+            {"restaurant_id": rid, "day": day, "menu_item_id": item_id, "quantity": qty, "revenue": revenue}
+            for (rid, day, item_id), (qty, revenue) in per_item.items()
+        ], _ITEM_FIELDS)
+
+
+def record_order(restaurant_id, created_at, total, lines):
+    """Count a new order. `lines` are dicts with menu_item_id, quantity, line_total. Two statements."""
+    _apply([(restaurant_id, created_at, total, lines, 1, False)])
+
+
+def record_orders(orders):
+    """record_order() for many (restaurant_id, created_at, total, lines) at once, still two statements."""
+    _apply([(restaurant_id, created_at, total, lines, 1, False) for restaurant_id, created_at, total, lines in orders])
+
+
+def record_status_changes(changes):
+    """
+    Adjust rollups for orders entering or leaving CANCELLED; other changes
+    are ignored. `changes` are (order_id, restaurant_id, created_at, total,
+    old_status, new_status) for transitions already applied. At most three
+    statements however many orders changed.
+    """
+    affected = {
+        order_id: (restaurant_id, created_at, total, -1 if new_status == CANCELLED else 1)
+        for order_id, restaurant_id, created_at, total, old_status, new_status in changes
+        if (old_status == CANCELLED) != (new_status == CANCELLED)
+    }
+    if not affected:
+        return
+    lines = defaultdict(list)
+    for order_id, item_id, qty, line_total in db.session.execute(
+        select(OrderItem.order_id, OrderItem.menu_item_id, OrderItem.quantity, OrderItem.line_total)
+        .where(OrderItem.order_id.in_(affected))
+    ):
+        lines[order_id].append({"menu_item_id": item_id, "quantity": qty, "line_total": line_total})
+    _apply([
+        (restaurant_id, created_at, total, lines[order_id], sign, True)
+        for order_id, (restaurant_id, created_at, total, sign) in affected.items()
+    ])
+
+
+# --- Rebuild ---
+
+def rebuild_rollups(conn, restaurant_id=None):
+    """
+    Recompute rollups from Order/OrderItem (all restaurants, or one).
+    Streams the orders and writes aggregates in batches; returns row counts.
+    """
+    orders, lines = Order.__table__, OrderItem.__table__
+    hourly_t, items_t = SalesHourly.__table__, ItemSalesDaily.__table__
+    scope = (lambda t: t.c.restaurant_id == restaurant_id) if restaurant_id else (lambda t: true())
+
+    conn.execute(delete(hourly_t).where(scope(hourly_t)))
+    conn.execute(delete(items_t).where(scope(items_t)))
+
+    hourly = defaultdict(lambda: [0, 0.0, 0, 0.0])
+    for rid, created_at, status, total in conn.execution_options(yield_per=REBUILD_BATCH).execute(
+        select(orders.c.restaurant_id, orders.c.created_at, orders.c.status, orders.c.total_amount)
+        .where(scope(orders), orders.c.created_at.is_not(None))
+    ):
+        entry = hourly[(rid, _hour(created_at))]
+        offset = 2 if status == CANCELLED else 0
+        entry[offset] += 1
+        entry[offset + 1] += total
+
+    items = defaultdict(lambda: [0, 0.0])
+    for rid, created_at, item_id, qty, line_total in conn.execution_options(yield_per=REBUILD_BATCH).execute(
+        select(orders.c.restaurant_id, orders.c.created_at, lines.c.menu_item_id, lines.c.quantity, lines.c.line_total)
+        .join(orders, orders.c.id == lines.c.order_id)
+        .where(scope(orders), orders.c.created_at.is_not(None), orders.c.status != CANCELLED)
+    ):
+        entry = items[(rid, created_at.date(), item_id)]
+        entry[0] += qty
+        entry[1] += line_total
+
+    hourly_rows = [
+        {"restaurant_id": rid, "hour": hour, **dict(zip(_HOURLY_FIELDS, values))}
+        for (rid, hour), values in hourly.items()
+    ]
+    item_rows = [
+        {"restaurant_id": rid, "day": day, "menu_item_id": item_id, "quantity": qty, "revenue": revenue}
+        for (rid, day, item_id), (qty, revenue) in items.items()
+    ]
+    for table, rows in ((hourly_t, hourly_rows), (items_t, item_rows)):
+        for start in range(0, len(rows), REBUILD_BATCH):
+            conn.execute(table.insert(), rows[start:start + REBUILD_BATCH])
+    return {"hours": len(hourly_rows), "item_days": len(item_rows)}
+
+
+# --- Reads ---
+
+def sales_report(restaurant_id, start, end, granularity="day", top=10):
+    """
+    Totals, a time series and the top items for [start, end) (dates).
+    Reads only rollup rows: cost grows with the range, not with order volume.
+    """
+    bucket = SalesHourly.hour if granularity == "hour" else func.date(SalesHourly.hour)
+    series = [
+        {
+            "period": period if isinstance(period, str) else period.isoformat(),
+            "orders": orders,
+            "revenue": round(revenue, 2),
+            "cancelled_orders": cancelled,
+        }
+        for period, orders, revenue, cancelled in db.session.execute(
+            select(bucket, func.sum(SalesHourly.orders), func.sum(SalesHourly.revenue),
+                   func.sum(SalesHourly.cancelled_orders))
+            .where(SalesHourly.restaurant_id == restaurant_id,
+                   SalesHourly.hour >= start, SalesHourly.hour < end)
+            .group_by(bucket).order_by(bucket)
+        )
+    ]
+
+    quantity = func.sum(ItemSalesDaily.quantity).label("quantity")
+    top_items = [
+        {"id": item_id, "name": name, "quantity": qty, "revenue": round(revenue, 2)}
+        for item_id, name, qty, revenue in db.session.execute(
+            select(ItemSalesDaily.menu_item_id, MenuItem.name, quantity, func.sum(ItemSalesDaily.revenue))
+            .outerjoin(MenuItem, MenuItem.id == ItemSalesDaily.menu_item_id)
+            .where(ItemSalesDaily.restaurant_id == restaurant_id,
+                   ItemSalesDaily.day >= start.date(), ItemSalesDaily.day < end.date())
+            .group_by(ItemSalesDaily.menu_item_id, MenuItem.name)
+            .having(quantity > 0)
+            .order_by(quantity.desc(), ItemSalesDaily.menu_item_id)
+            .limit(top)
+        )
+    ]
+
+    orders = sum(p["orders"] for p in series)
+    revenue = sum(p["revenue"] for p in series)
+    return {
+        "from": start.date().isoformat(),
+        "to": (end - timedelta(days=1)).date().isoformat(),
+        "granularity": granularity,
+        "totals": {
+            "orders": orders,
+            "revenue": round(revenue, 2),
+            "average_order": round(revenue / orders, 2) if orders else 0.0,
+            "cancelled_orders": sum(p["cancelled_orders"] for p in series),
+        },
+        "series": series,
+        "top_items": top_items,
+    }
+
+
+# --- CLI ---
+
+reports_cli = AppGroup("reports", help="Sales rollups.")
+
+
+@reports_cli.command("rebuild")
+@click.option("--restaurant", "restaurant_id", type=int, default=None, help="Only this restaurant.")
+def rebuild_command(restaurant_id):
+    """Recompute sales rollups from the order history."""
+    with db.engine.begin() as conn:
+        counts = rebuild_rollups(conn, restaurant_id)
+    click.echo(f"Rebuilt {counts['hours']} hourly and {counts['item_days']} item-day rows.")
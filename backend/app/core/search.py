@@ -0,0 +1,222 @@
+"""
+Public menu search: a per-restaurant inverted index with prefix lookup.
+
+Item names, descriptions and category names are folded the Turkish way
+("İ"/"I" -> "i"/"ı", as str.lower() gets wrong) and then stripped of
+diacritics, so "CORBA", "çorba" and "Çorba" all hit "Çorbalar". Every folded
+word goes into a posting map (term -> item ids) next to a sorted term list;
+a query word matches all terms it is a prefix of (bisect + a short scan),
+and several query words must all match.
+
+Indexes are built from the same payload as the public menu and, like the
+menu cache, remember the menu_version they reflect. After an admin change
+the next search diffs the fresh payload against the old index and only
+re-tokenizes items whose text changed. Readers always see a complete
+index: updates build a new one and swap it in.
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from app.core.menu_cache import build_menu_payload
+
+# Letters NFKD leaves alone. ı folds to i so "kiymali" finds "kıymalı".
+BASE_LETTERS = (("ı", "i"), ("ß", "ss"), ("æ", "ae"), ("œ", "oe"), ("ø", "o"), ("ł", "l"), ("đ", "d"))
+WORD = re.compile(r"\w+")
+COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+
+# Score per query word by where it matched
+NAME_EXACT, NAME_PREFIX, OTHER = 4, 3, 1
+
+
+def fold(text):
+    """Turkish-locale lower case without diacritics: 'İÇECEKLER' -> 'icecekler'."""
+    if not text:
+        return ""
+    if text.isascii():
+        # "I" would lower to "ı" in Turkish, which folds back to "i"
+        return text.lower()
+    # str.lower() turns "İ" into "i" + a combining dot; map it first
+    text = unicodedata.normalize("NFKD", text.replace("İ", "i").lower())
+    text = COMBINING_MARKS.sub("", text)
+    for letter, base in BASE_LETTERS:
+        if letter in text:
+            text = text.replace(letter, base)
+    return text
+
+
+def terms(text):
+    return WORD.findall(fold(text))
+
+
+class Document:
+    __slots__ = ("key", "name_terms", "terms", "position", "result")
+
+    def __init__(self, key, name_terms, all_terms, position, result):
+        self.key = key
+        self.name_terms = name_terms
+        self.terms = all_terms
+        self.position = position
+        self.result = result
+
+    @classmethod
+    def tokenize(cls, key, position, result):
+        name, description, category = key
+        name_terms = frozenset(terms(name))
+        all_terms = name_terms | frozenset(terms(description)) | frozenset(terms(category))
+        return cls(key, name_terms, all_terms, position, result)
+
+
+class MenuIndex:
+    """One restaurant's index at one menu_version. Never mutated once published."""
+
+    __slots__ = ("version", "docs", "postings", "vocabulary")
+
+    def __init__(self, version, docs, postings, vocabulary):
+        self.version = version
+        self.docs = docs  # item id -> Document
+        self.postings = postings  # term -> frozenset of item ids
+        self.vocabulary = vocabulary  # sorted terms
+
+    @classmethod
+    def build(cls, version, payload):
+        return cls(version, {}, {}, []).update(version, payload)
+
+    def update(self, version, payload):
+        """New index for `payload`, reusing the tokens of unchanged items."""
+        docs, changed = {}, {}  # changed: term -> (removed ids, added ids)
+        position = 0
+        for category in payload["categories"]:
+            for item in category["items"]:
+                key = (item["name"], item["description"], category["name"])
+                result = dict(item, category_id=category["id"], category_name=category["name"])
+                old = self.docs.get(item["id"])
+                if old is not None and old.key == key:
+                    doc = Document(key, old.name_terms, old.terms, position, result)
+                else:
+                    doc = Document.tokenize(key, position, result)
+                    if old is not None:
+                        for term in old.terms - doc.terms:
+                            changed.setdefault(term, (set(), set()))[0].add(item["id"])
+                    for term in doc.terms if old is None else doc.terms - old.terms:
+                        changed.setdefault(term, (set(), set()))[1].add(item["id"])
+                docs[item["id"]] = doc
+                position += 1
+        for item_id, old in self.docs.items():
+            if item_id not in docs:
+                for term in old.terms:
+                    changed.setdefault(term, (set(), set()))[0].add(item_id)
+
+        if not changed:
+            return MenuIndex(version, docs, self.postings, self.vocabulary)
+        postings = dict(self.postings)
+        vocabulary = list(self.vocabulary)
+        rebuild_vocabulary = len(changed) > len(vocabulary) // 4
+        for term, (removed, added) in changed.items():
+            ids = (postings.get(term, frozenset()) - removed) | added
+            if ids:
+                if term not in postings and not rebuild_vocabulary:
+                    insort(vocabulary, term)
+                postings[term] = frozenset(ids)
+            elif term in postings:
+                del postings[term]
+                if not rebuild_vocabulary:
+                    del vocabulary[bisect_left(vocabulary, term)]
+        if rebuild_vocabulary:
+            vocabulary = sorted(postings)
+        return MenuIndex(version, docs, postings, vocabulary)
+
+    def prefix_matches(self, prefix):
+        """Ids of items with a term starting with `prefix`."""
+        vocabulary = self.vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(prefix):
+            end += 1
+        if end - start == 1:
+            return self.postings[vocabulary[start]]
+        matched = set()
+        for term in vocabulary[start:end]:
+            matched |= self.postings[term]
+        return matched
+
+    def search(self, query, limit):
+        """(total, best `limit` results) for items matching every word of `query` as a prefix."""
+        words = list(dict.fromkeys(terms(query)))
+        if not words:
+            return 0, []
+        candidates = None
+        for word in sorted(words, key=len, reverse=True):  # longest words are the most selective
+            matched = self.prefix_matches(word)
+            candidates = set(matched) if candidates is None else candidates & matched
+            if not candidates:
+                return 0, []
+
+        def score(item_id):
+            doc = self.docs[item_id]
+            total = 0
+            for word in words:
+                if word in doc.name_terms:
+                    total += NAME_EXACT
+                elif any(t.startswith(word) for t in doc.name_terms):
+                    total += NAME_PREFIX
+                else:
+                    total += OTHER
+            return -total, doc.position
+
+        ranked = sorted(candidates, key=score)[:limit]
+        return len(candidates), [self.docs[item_id].result for item_id in ranked]
+
+
+class SearchIndex:
+    """Per-process LRU of MenuIndex objects keyed by restaurant id, like MenuCache."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # restaurant_id -> MenuIndex
+        self._lock = threading.Lock()
+        self._build_locks = {}  # restaurant_id -> Lock, so one thread rebuilds a stale index
+
+    def init_app(self, app):
+        self.maxsize = app.config.setdefault("SEARCH_INDEX_SIZE", 256)
+        app.config.setdefault("SEARCH_MAX_RESULTS", 100)
+        app.extensions["search_index"] = self
+
+    def get(self, restaurant_id, version):
+        """Index for `version`, built or updated from the database if needed."""
+        with self._lock:
+            index = self._entries.get(restaurant_id)
+            if index is not None:
+                self._entries.move_to_end(restaurant_id)
+                if index.version == version:
+                    return index
+            build_lock = self._build_locks.setdefault(restaurant_id, threading.Lock())
+        with build_lock:
+            with self._lock:
+                current = self._entries.get(restaurant_id)
+            if current is not None and current.version == version:
+                return current
+            payload = build_menu_payload(restaurant_id)
+            index = current.update(version, payload) if current else MenuIndex.build(version, payload)
+            self.put(restaurant_id, index)
+            return index
+
+    def put(self, restaurant_id, index):
+        with self._lock:
+            self._entries[restaurant_id] = index
+            self._entries.move_to_end(restaurant_id)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._build_locks.pop(evicted, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._build_locks.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+search_index = SearchIndex()
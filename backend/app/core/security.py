@@ -1 +1,126 @@
 # security.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session, object_session
+from app.database import db
+from app.models.models import User, Restaurant
+
+AuthContext = namedtuple("AuthContext", ["user_id", "restaurant_id", "role", "slug"])
+# Session.info key: users the current transaction updated or deleted
+USER_CHANGES = "user_changes"
+
+
+class IdentityCache:
+    """
+    Small TTL + LRU map of user id -> AuthContext, shared by the threads of a
+    worker. Local writes invalidate once they commit (see the session events
+    below); the TTL bounds how long another worker can serve a stale role.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, AuthContext)
+        self._lock = threading.Lock()
+        self.generation = 0  # bumped by every invalidation
+
+    def init_app(self, app):
+        self.maxsize = app.config.setdefault("IDENTITY_CACHE_SIZE", 1024)
+        self.ttl = app.config.setdefault("IDENTITY_CACHE_TTL", 60)
+        app.extensions["identity_cache"] = self
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, ctx, generation):
+        """Cache `ctx` unless an invalidation happened since `generation` was read."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return  # the row may predate a commit that was just invalidated
+            self._entries[ctx.user_id] = (time.monotonic() + self.ttl, ctx)
+            self._entries.move_to_end(ctx.user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+# Flush only records the change: until commit, other requests still read
+# (and may cache) the old row, so the entry is dropped after commit.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_user_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(USER_CHANGES, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users(session):
+    changed = session.info.pop(USER_CHANGES, None)
+    if changed:
+        identity_cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop(USER_CHANGES, None)
+
+
+def load_auth_context(user_id):
+    ctx = identity_cache.get(user_id)
+    if ctx is not None:
+        return ctx
+
+    generation = identity_cache.generation
+    row = db.session.execute(
+        select(User.id, User.restaurant_id, User.role, Restaurant.slug)
+        .join(Restaurant, Restaurant.id == User.restaurant_id)
+        .where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    ctx = AuthContext(*row)
+    identity_cache.put(ctx, generation)
+    return ctx
+
+
+def current_auth():
+    """
+    Resolved identity of the JWT holder, computed once per request and kept on
+    flask.g. Returns None if the user no longer exists. Callers must have
+    verified the JWT already (jwt_required / verify_jwt_in_request).
+    """
+    if "auth" not in g:
+        try:
+            user_id = int(get_jwt_identity())
+        except (TypeError, ValueError):
+            g.auth = None
+        else:
+            g.auth = load_auth_context(user_id)
+    return g.auth
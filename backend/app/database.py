@@ -1,3 +1,164 @@
+import threading
+import time
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from app.core.replicas import RoutingSession, REPLICA_BIND_PREFIX
 
-db = SQLAlchemy()
+# RoutingSession sends request-time reads to replica binds when configured
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+class PoolMetrics:
+    """Counters for one engine's pool: checkout wait, saturation and connection churn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def observe_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self, pool):
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "checkout_timeouts": self.timeouts,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+            }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "saturation": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+            })
+        return stats
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same object
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def engine_options(config, url=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database URL (or `url`).
+    Postgres: a per-worker pool sized to the worker's threads, pre-ping and
+    recycle. SQLite: a timed pool and a busy timeout (pragmas are set on connect).
+    """
+    url = make_url(url or config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return {}
+        return {
+            "poolclass": TimedQueuePool,
+            "connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000},
+        }
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries ("replica1", ...) for DATABASE_REPLICA_URLS, each with its own pool."""
+    return {
+        f"{REPLICA_BIND_PREFIX}{i}": {"url": url, **engine_options(config, url)}
+        for i, url in enumerate(config.get("DATABASE_REPLICA_URLS") or [], start=1)
+    }
+
+
+def _sqlite_pragmas(config):
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        "PRAGMA synchronous = NORMAL",
+    ]
+    if config["SQLITE_WAL"]:
+        # WAL lets readers run during an order commit instead of "database is locked"
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+    return on_connect
+
+
+def init_engines(app):
+    """Attach pragmas and pool metrics to every engine of `app` (no connections are opened)."""
+    metrics = app.extensions.setdefault("pool_metrics", {})
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _sqlite_pragmas(app.config))
+
+            bind_metrics = metrics[bind or "default"] = PoolMetrics()
+            if isinstance(engine.pool, TimedQueuePool):
+                engine.pool.metrics = bind_metrics
+            event.listen(engine, "connect", lambda *a, m=bind_metrics: m.count("connects"))
+            event.listen(engine, "close", lambda *a, m=bind_metrics: m.count("closes"))
+            event.listen(engine, "invalidate", lambda *a, m=bind_metrics: m.count("invalidations"))
+
+
+def pool_stats(app):
+    with app.app_context():
+        metrics = app.extensions.get("pool_metrics", {})
+        return {
+            bind or "default": metrics[bind or "default"].snapshot(engine.pool)
+            for bind, engine in db.engines.items()
+            if (bind or "default") in metrics
+        }
+
+
+def fetch_dicts(statement):
+    """
+    Run a column-level select() and return plain dicts keyed by column label.
+    zip() over the keys is several times faster than dict(row) per RowMapping.
+    """
+    result = db.session.execute(statement)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
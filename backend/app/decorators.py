@@ -1,8 +1,7 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from app.database import db
-from app.models.models import User
+from flask_jwt_extended import verify_jwt_in_request
+from app.core.security import current_auth
 
 def same_user_required():
     """
@@ -14,9 +13,7 @@ def same_user_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = db.session.get(User, current_user_id)
-            if not user:
+            if not current_auth():
                 return jsonify({"msg": "User not found"}), 401
             # For now, just pass through if user exists
             return fn(*args, **kwargs)
@@ -31,13 +28,12 @@ def owner_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = db.session.get(User, current_user_id)
+            auth = current_auth()
             
-            if not user:
+            if not auth:
                 return jsonify({"msg": "User not found"}), 401
                 
-            if user.role != 'owner':
+            if auth.role != 'owner':
                 return jsonify({"msg": "Admins only"}), 403
                 
             return fn(*args, **kwargs)
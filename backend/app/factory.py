@@ -0,0 +1,146 @@
+import os
+from dotenv import load_dotenv
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app.config import load_config
+from app.core.json_provider import json_provider_class
+from app.database import db, engine_options, replica_binds, init_engines
+from app.core.replicas import replica_router
+from app.core.menu_cache import menu_cache, warm_menu_cache
+from app.core.search import search_index
+from app.core.publish import menu_publisher, menus_cli
+from app.core.events import order_events
+from app.core.security import identity_cache
+from app.core.images import image_pipeline
+from app.core.querylog import query_log
+from app.core.metrics import metrics
+from app.core.compression import compression
+from app.core.intake import order_intake
+from app.core.ratelimit import limiter
+from app.migrations import pending_migrations
+from app.migrations.cli import db_cli
+from app.core.reports import reports_cli
+from app.routers.auth import auth_bp
+from app.routers.admin import admin_bp
+from app.routers.admin_features import admin_bp as admin_features_bp
+from app.routers.public import public_bp
+from app.routers.orders import orders_bp
+from app.routers.reports import reports_bp
+from app.routers.media import media_bp
+from app.routers.system import system_bp
+
+jwt = JWTManager()
+
+# The extensions above are module-level singletons that init_app() configures
+# in place (order intake, replica router, rate limiter, metrics, caches), so
+# one process serves one app. This is the app they are bound to.
+_bound_app = None
+
+
+def create_app(config=None):
+    """
+    Build the Flask app. Does no database or filesystem work: schema and demo
+    data come from `flask db init`, caches fill on first use (or warm_caches).
+    `config` overrides values loaded from the environment.
+
+    One app per process: a second call would silently reconfigure the first
+    app's extensions, so it raises until release_app() unbinds the first.
+    """
+    global _bound_app
+    if _bound_app is not None:
+        raise RuntimeError("create_app() already ran in this process; call release_app() on that app first")
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config.update(load_config())
+    app.config["UPLOAD_FOLDER"] = os.path.join(app.root_path, "static", "uploads")
+    if config:
+        app.config.update(config)
+    if app.config.get("PROXY_COUNT"):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_COUNT"], x_proto=app.config["PROXY_COUNT"])
+    app.json = json_provider_class(app)(app)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
+    app.config.setdefault("SQLALCHEMY_BINDS", replica_binds(app.config))
+
+    db.init_app(app)
+    init_engines(app)
+    replica_router.init_app(app)
+    menu_cache.init_app(app)
+    search_index.init_app(app)
+    menu_publisher.init_app(app)
+    order_events.init_app(app)
+    identity_cache.init_app(app)
+    image_pipeline.init_app(app)
+    query_log.init_app(app)
+    metrics.init_app(app)
+    compression.init_app(app)
+    order_intake.init_app(app)
+    limiter.init_app(app)
+    jwt.init_app(app)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(reports_cli)
+    app.cli.add_command(menus_cli)
+
+    # CORS: Allow * in Dev, specific origin in Prod
+    frontend_url = app.config["FRONTEND_URL"]
+    # Allow localhost and any cloudflare tunnel subdomain
+    origins = [frontend_url, "http://localhost:5173", "http://127.0.0.1:5173", r"^https://.*\.trycloudflare\.com$"]
+    if frontend_url == "*": origins = "*"
+
+    CORS(app, resources={r"/api/*": {"origins": origins}}, supports_credentials=True)
+
+    # Register Blueprints with /api prefix
+    # Note: Blueprints already have internal prefixes like /auth, /admin, /public
+    # So we just mount them under /api to get /api/auth, /api/admin, etc.
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(admin_features_bp, url_prefix='/api/admin')
+    app.register_blueprint(public_bp, url_prefix='/api/public')
+    app.register_blueprint(orders_bp, url_prefix='/api')
+    app.register_blueprint(reports_bp, url_prefix='/api/admin')
+    app.register_blueprint(media_bp, url_prefix='/media')
+    app.register_blueprint(system_bp)
+    app.before_request(lambda: check_schema(app))
+
+    _bound_app = app
+    return app
+
+
+def release_app(app):
+    """
+    Write out `app`'s queued orders, stop its background work and unbind the
+    extensions, so a script can build another app in the same process.
+    """
+    global _bound_app
+    if app is _bound_app:
+        order_intake.shutdown()
+        _bound_app = None
+
+
+def check_schema(app):
+    """
+    Raise if the database is missing migrations, i.e. the models are ahead of
+    it (new columns), instead of failing queries with "no such column".
+    Runs once per app: in warm_caches() under gunicorn, else on the first
+    request (`flask run`, app.main); init_db() leaves a migrated database.
+    """
+    if app.extensions.get("schema_checked"):
+        return
+    pending = pending_migrations(db.engine)
+    if pending:
+        raise RuntimeError(f"database is missing migrations {pending}; run `flask --app app.main db upgrade`")
+    app.extensions["schema_checked"] = True
+
+
+def warm_caches(app):
+    """Per-worker warm-up, run after fork (see gunicorn.conf.py)."""
+    with app.app_context():
+        # Connections inherited from a preloading master must not be shared
+        db.engine.dispose(close=False)
+        check_schema(app)
+        # Pre-build the busiest menus so the first scans after a deploy are cache hits
+        warm_menu_cache(app.config["MENU_CACHE_WARM"])
+        # Drain orders a crashed worker acknowledged but never wrote
+        order_intake.start()
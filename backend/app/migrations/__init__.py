@@ -0,0 +1,109 @@
+"""
+Versioned schema migrations.
+
+Each module in this package named vNNNN_<description>.py defines an integer
+`revision`, a one-line `description`, and `upgrade(conn)` / `downgrade(conn)`
+functions that receive a SQLAlchemy Connection inside a transaction. Applied
+revisions are recorded in the `schema_migrations` table.
+
+Migrations must be idempotent against a schema built by db.create_all()
+(fresh installs create the current models first, then upgrade), so use the
+helpers below, which check before they alter.
+"""
+import importlib
+import pkgutil
+from datetime import datetime, timezone
+import sqlalchemy as sa
+
+VERSION_TABLE = "schema_migrations"
+
+_version_table = sa.Table(
+    VERSION_TABLE, sa.MetaData(),
+    sa.Column("version", sa.Integer, primary_key=True),
+    sa.Column("description", sa.String(200)),
+    sa.Column("applied_at", sa.DateTime),
+)
+
+
+def load_migrations():
+    modules = []
+    for info in pkgutil.iter_modules(__path__):
+        if info.name.startswith("v") and info.name[1:5].isdigit():
+            modules.append(importlib.import_module(f"{__name__}.{info.name}"))
+    modules.sort(key=lambda m: m.revision)
+    return modules
+
+
+def current_version(conn):
+    _version_table.create(conn, checkfirst=True)
+    return conn.execute(sa.select(sa.func.max(_version_table.c.version))).scalar() or 0
+
+
+def pending_migrations(engine):
+    """Revisions the database has not applied yet. Read-only, unlike current_version()."""
+    with engine.connect() as conn:
+        version = 0
+        if sa.inspect(conn).has_table(VERSION_TABLE):
+            version = conn.execute(sa.select(sa.func.max(_version_table.c.version))).scalar() or 0
+    return [m.revision for m in load_migrations() if m.revision > version]
+
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to `target` (default: latest). Returns applied revisions."""
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+        for migration in load_migrations():
+            if migration.revision <= version or (target is not None and migration.revision > target):
+                continue
+            migration.upgrade(conn)
+            conn.execute(_version_table.insert().values(
+                version=migration.revision,
+                description=migration.description,
+                applied_at=datetime.now(timezone.utc).replace(tzinfo=None),
+            ))
+            applied.append(migration.revision)
+    return applied
+
+
+def downgrade(engine, target):
+    """Revert applied migrations newer than `target`. Returns reverted revisions."""
+    reverted = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+        for migration in reversed(load_migrations()):
+            if migration.revision > version or migration.revision <= target:
+                continue
+            migration.downgrade(conn)
+            conn.execute(_version_table.delete().where(_version_table.c.version == migration.revision))
+            reverted.append(migration.revision)
+    return reverted
+
+
+# --- Helpers for migration modules ---
+
+def reflect(conn, table_name):
+    return sa.Table(table_name, sa.MetaData(), autoload_with=conn)
+
+
+def has_column(conn, table_name, column_name):
+    return any(c["name"] == column_name for c in sa.inspect(conn).get_columns(table_name))
+
+
+def add_column(conn, table_name, column_ddl):
+    """Add a column given as raw DDL (e.g. 'menu_version INTEGER NOT NULL DEFAULT 1') if missing."""
+    column_name = column_ddl.split()[0]
+    if not has_column(conn, table_name, column_name):
+        quoted = conn.dialect.identifier_preparer.quote(table_name)
+        conn.execute(sa.text(f"ALTER TABLE {quoted} ADD COLUMN {column_ddl}"))
+
+
+def create_index(conn, name, table_name, *columns, unique=False):
+    table = reflect(conn, table_name)
+    sa.Index(name, *[table.c[c] for c in columns], unique=unique).create(conn, checkfirst=True)
+
+
+def drop_index(conn, name, table_name):
+    index = next((i for i in reflect(conn, table_name).indexes if i.name == name), None)
+    if index is not None:
+        index.drop(conn)
@@ -0,0 +1,56 @@
+import click
+from flask.cli import AppGroup
+from app.database import db
+from app.migrations import load_migrations, current_version, upgrade, downgrade
+
+db_cli = AppGroup("db", help="Schema migrations.")
+
+
+@db_cli.command("init")
+@click.option("--seed/--no-seed", default=True, help="Insert the demo restaurant if the database is empty.")
+def init_command(seed):
+    """Create tables, apply migrations and seed demo data."""
+    from flask import current_app
+    from app.seed import init_db
+    init_db(current_app, seed=seed)
+    click.echo("Database initialized.")
+
+
+@db_cli.command("seed")
+def seed_command():
+    """Insert demo data (idempotent)."""
+    from app.seed import seed_data
+    seed_data()
+
+
+@db_cli.command("upgrade")
+@click.option("--to", "target", type=int, default=None, help="Stop at this revision.")
+def upgrade_command(target):
+    """Apply pending migrations."""
+    applied = upgrade(db.engine, target)
+    click.echo(f"Applied: {applied}" if applied else "Already up to date.")
+
+
+@db_cli.command("downgrade")
+@click.option("--to", "target", type=int, required=True, help="Revision to go back to (0 = none).")
+def downgrade_command(target):
+    """Revert migrations newer than --to."""
+    reverted = downgrade(db.engine, target)
+    click.echo(f"Reverted: {reverted}" if reverted else "Nothing to revert.")
+
+
+@db_cli.command("current")
+def current_command():
+    """Show the applied revision."""
+    with db.engine.begin() as conn:
+        click.echo(current_version(conn))
+
+
+@db_cli.command("history")
+def history_command():
+    """List known migrations."""
+    with db.engine.begin() as conn:
+        version = current_version(conn)
+    for migration in load_migrations():
+        mark = "*" if migration.revision <= version else " "
+        click.echo(f"{mark} {migration.revision:04d}  {migration.description}")
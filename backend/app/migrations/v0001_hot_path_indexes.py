@@ -0,0 +1,30 @@
+from app.migrations import add_column, create_index, drop_index
+
+revision = 1
+description = "Baseline columns and hot-path indexes"
+
+INDEXES = [
+    ("ix_table_restaurant", "table", ("restaurant_id",)),
+    ("ix_category_restaurant_sort", "category", ("restaurant_id", "sort_order")),
+    ("ix_menu_item_restaurant_category_sort", "menu_item", ("restaurant_id", "category_id", "sort_order")),
+    ("ix_menu_item_category", "menu_item", ("category_id",)),
+    ("ix_order_restaurant_status_created", "order", ("restaurant_id", "status", "created_at")),
+    ("ix_order_restaurant_created", "order", ("restaurant_id", "created_at")),
+    ("ix_order_item_order", "order_item", ("order_id",)),
+]
+
+
+def upgrade(conn):
+    # Columns added to the models before migrations existed; databases built
+    # by an older create_all() lack them.
+    add_column(conn, "restaurant", "menu_version INTEGER NOT NULL DEFAULT 1")
+    add_column(conn, "order", "revision INTEGER NOT NULL DEFAULT 1")
+
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, *columns)
+
+
+def downgrade(conn):
+    # Baseline columns stay: the models cannot run without them.
+    for name, table, _ in reversed(INDEXES):
+        drop_index(conn, name, table)
@@ -0,0 +1,17 @@
+from app.models.models import SalesHourly, ItemSalesDaily
+
+revision = 2
+description = "Sales rollup tables (hourly totals, daily item sales)"
+
+
+def upgrade(conn):
+    from app.core.reports import rebuild_rollups
+    SalesHourly.__table__.create(conn, checkfirst=True)
+    ItemSalesDaily.__table__.create(conn, checkfirst=True)
+    # Existing order history; cheap no-op on a fresh install
+    rebuild_rollups(conn)
+
+
+def downgrade(conn):
+    ItemSalesDaily.__table__.drop(conn, checkfirst=True)
+    SalesHourly.__table__.drop(conn, checkfirst=True)
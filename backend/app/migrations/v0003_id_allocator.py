@@ -0,0 +1,17 @@
+import sqlalchemy as sa
+from app.models.models import IdAllocator, Order
+
+revision = 3
+description = "Id allocator for orders acknowledged before they are written"
+
+
+def upgrade(conn):
+    table = IdAllocator.__table__
+    table.create(conn, checkfirst=True)
+    if conn.execute(sa.select(table.c.name).where(table.c.name == "order")).first() is None:
+        next_id = conn.execute(sa.select(sa.func.coalesce(sa.func.max(Order.id), 0) + 1)).scalar()
+        conn.execute(table.insert().values(name="order", next_id=next_id))
+
+
+def downgrade(conn):
+    IdAllocator.__table__.drop(conn, checkfirst=True)
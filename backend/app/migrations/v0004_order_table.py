@@ -0,0 +1,14 @@
+from app.migrations import add_column, create_index, drop_index
+
+revision = 4
+description = "Link orders to the QR table they were placed from"
+
+
+def upgrade(conn):
+    add_column(conn, "order", "table_id INTEGER REFERENCES \"table\" (id) ON DELETE SET NULL")
+    create_index(conn, "ix_order_table_created", "order", "table_id", "created_at")
+
+
+def downgrade(conn):
+    # The column stays: the model reads it, and SQLite cannot drop it everywhere
+    drop_index(conn, "ix_order_table_created", "order")
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from app.database import db
 
 class Restaurant(db.Model):
@@ -14,7 +15,14 @@ class Restaurant(db.Model):
     wifi_ssid = db.Column(db.String(100), nullable=True)
     wifi_password = db.Column(db.String(100), nullable=True)
 
+    # Bumped on every admin menu/settings write; keys the public menu cache
+    menu_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
 class Table(db.Model):
+    __table_args__ = (
+        db.Index("ix_table_restaurant", "restaurant_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     name = db.Column(db.String(50), nullable=False) # "Table 1", "Bar 2", "Garden 5"
@@ -29,6 +37,11 @@ class User(db.Model):
     role = db.Column(db.String(20), default="owner")
 
 class Category(db.Model):
+    __table_args__ = (
+        # Public menu + admin list: tenant filter ordered by sort_order
+        db.Index("ix_category_restaurant_sort", "restaurant_id", "sort_order"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -38,6 +51,13 @@ class Category(db.Model):
     items = db.relationship('MenuItem', backref='category', lazy=True)
 
 class MenuItem(db.Model):
+    __table_args__ = (
+        # Admin item list (optionally per category) ordered by sort_order
+        db.Index("ix_menu_item_restaurant_category_sort", "restaurant_id", "category_id", "sort_order"),
+        # Category.items loads and the delete-category guard
+        db.Index("ix_menu_item_category", "category_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
@@ -50,17 +70,35 @@ class MenuItem(db.Model):
     is_active = db.Column(db.Boolean, default=True)
 
 class Order(db.Model):
+    __table_args__ = (
+        # Kitchen feed: tenant + status filter, newest first
+        db.Index("ix_order_restaurant_status_created", "restaurant_id", "status", "created_at"),
+        # Unfiltered feed pages and per-restaurant aggregates
+        db.Index("ix_order_restaurant_created", "restaurant_id", "created_at"),
+        # Table tracking: one table's recent orders
+        db.Index("ix_order_table_created", "table_id", "created_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     table_number = db.Column(db.Integer, nullable=False)
+    # Set when the order came in through a table QR code (tableToken)
+    table_id = db.Column(db.Integer, db.ForeignKey('table.id', ondelete="SET NULL"), nullable=True)
     status = db.Column(db.String(20), default="PENDING") # PENDING, PREPARING, READY, SERVED, CANCELLED
     total_amount = db.Column(db.Float, nullable=False, default=0.0)
     note = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    # Set in Python (UTC, microseconds) so keyset cursors compare exactly on SQLite too
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    # Bumped on every status change; keys the public order status ETag
+    revision = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     items = db.relationship('OrderItem', backref='order', lazy=True)
 
 class OrderItem(db.Model):
+    __table_args__ = (
+        db.Index("ix_order_item_order", "order_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_item.id'), nullable=False)
@@ -70,3 +108,29 @@ class OrderItem(db.Model):
     
     # Relationship to access item details if needed
     menu_item = db.relationship('MenuItem')
+
+# --- Sales rollups (maintained by app.core.reports, rebuilt by `flask reports rebuild`) ---
+
+class SalesHourly(db.Model):
+    # One row per restaurant per UTC hour; CANCELLED orders move to the cancelled_* columns
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), primary_key=True)
+    hour = db.Column(db.DateTime, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    cancelled_orders = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+class ItemSalesDaily(db.Model):
+    # No FK on menu_item_id: sales history outlives deleted menu items
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    menu_item_id = db.Column(db.Integer, primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+# --- Id blocks handed out ahead of INSERT (app.core.intake on databases without sequences) ---
+
+class IdAllocator(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    # First id not yet handed out; never below max(id) + 1 of the target table
+    next_id = db.Column(db.Integer, nullable=False)
@@ -1,42 +1,43 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.database import db
-from app.models.models import User, Category, MenuItem
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from app.database import db, fetch_dicts
+from app.models.models import Category, MenuItem
 from app.decorators import owner_required
+from app.core.security import current_auth
+from app.core.menu_cache import bump_menu_version
 
 admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.before_request
 @jwt_required()
 def ensure_restaurant_context():
-    current_user_id = get_jwt_identity()
-    user = db.session.get(User, current_user_id)
-    if not user:
+    # Resolves the auth context once; decorators and handlers reuse it via g
+    if not current_auth():
         return jsonify({"msg": "User not found"}), 401
 
 def get_current_user_restaurant_id():
-    current_user_id = get_jwt_identity()
-    user = db.session.get(User, current_user_id)
-    return user.restaurant_id
+    return current_auth().restaurant_id
 
 @admin_bp.route("/ping", methods=["GET"])
 def ping():
-    current_user_id = get_jwt_identity()
-    user = db.session.get(User, current_user_id)
+    auth = current_auth()
     return jsonify({
         "ok": True,
-        "restaurant_id": user.restaurant_id,
-        "role": user.role
+        "restaurant_id": auth.restaurant_id,
+        "role": auth.role
     })
 
 # --- Categories CRUD ---
 @admin_bp.route("/categories", methods=["GET"])
 def list_categories():
     restaurant_id = get_current_user_restaurant_id()
-    categories = Category.query.filter_by(restaurant_id=restaurant_id).order_by(Category.sort_order).all()
-    return jsonify([{
-        "id": c.id, "name": c.name, "sort_order": c.sort_order, "is_active": c.is_active
-    } for c in categories])
+    # Plain rows, no ORM instances: this is polled by the admin UI
+    return jsonify(fetch_dicts(
+        select(Category.id, Category.name, Category.sort_order, Category.is_active)
+        .where(Category.restaurant_id == restaurant_id)
+        .order_by(Category.sort_order)
+    ))
 
 @admin_bp.route("/categories", methods=["POST"])
 @owner_required()
@@ -54,6 +55,7 @@ def create_category():
         is_active=data.get("is_active", True)
     )
     db.session.add(cat)
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({"id": cat.id, "msg": "Category created"}), 201
 
@@ -68,6 +70,7 @@ def update_category(cat_id):
     if "sort_order" in data: cat.sort_order = data["sort_order"]
     if "is_active" in data: cat.is_active = data["is_active"]
     
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({"msg": "Category updated"})
 
@@ -82,6 +85,7 @@ def delete_category(cat_id):
         return jsonify({"msg": "Cannot delete category with existing items"}), 400
         
     db.session.delete(cat)
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({"msg": "Category deleted"})
 
@@ -89,19 +93,16 @@ def delete_category(cat_id):
 @admin_bp.route("/items", methods=["GET"])
 def list_items():
     restaurant_id = get_current_user_restaurant_id()
-    query = MenuItem.query.filter_by(restaurant_id=restaurant_id)
+    query = select(
+        MenuItem.id, MenuItem.category_id, MenuItem.name, MenuItem.price, MenuItem.currency,
+        MenuItem.description, MenuItem.image_url, MenuItem.is_active, MenuItem.sort_order
+    ).where(MenuItem.restaurant_id == restaurant_id)
     
     cat_id = request.args.get("category_id")
     if cat_id:
-        query = query.filter_by(category_id=cat_id)
+        query = query.where(MenuItem.category_id == cat_id)
         
-    items = query.order_by(MenuItem.sort_order).all()
-    return jsonify([{
-        "id": i.id, "category_id": i.category_id, "name": i.name, 
-        "price": i.price, "currency": i.currency, "description": i.description,
-        "image_url": i.image_url,
-        "is_active": i.is_active, "sort_order": i.sort_order
-    } for i in items])
+    return jsonify(fetch_dicts(query.order_by(MenuItem.sort_order)))
 
 @admin_bp.route("/items", methods=["POST"])
 @owner_required()
@@ -129,6 +130,7 @@ def create_item():
         is_active=data.get("is_active", True)
     )
     db.session.add(item)
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({"id": item.id, "msg": "Item created"}), 201
 
@@ -148,6 +150,7 @@ def update_item(item_id):
         if k in data:
             setattr(item, k, data[k])
 
+    bump_menu_version(restaurant_id)
     db.session.commit()
     return jsonify({"msg": "Item updated"})
 
@@ -157,14 +160,162 @@ def delete_item(item_id):
     restaurant_id = get_current_user_restaurant_id()
     item = MenuItem.query.filter_by(id=item_id, restaurant_id=restaurant_id).first_or_404()
     db.session.delete(item)
+    bump_menu_version(restaurant_id)
     db.session.commit()
     # Also clean up image if stored locally (not implemented here)
     return jsonify({"msg": "Item deleted"})
 
+# --- Batch Edits (drag-and-drop reorder, bulk toggles) ---
+from sqlalchemy import update, case
+
+BATCH_MAX = 1000
+CATEGORY_BATCH_FIELDS = {"sort_order": int, "is_active": bool}
+ITEM_BATCH_FIELDS = {"sort_order": int, "is_active": bool, "price": float, "category_id": int}
+
+def _valid(kind, value):
+    if kind is bool:
+        return isinstance(value, bool)
+    if isinstance(value, bool):
+        return False
+    if kind is float:
+        return isinstance(value, (int, float)) and value >= 0
+    return isinstance(value, kind)
+
+def _parse_batch(data, fields):
+    """Validate a list of {id, <field>: value} patches into {id: {field: value}}."""
+    if not isinstance(data, list) or not data:
+        return None, "Expected a non-empty list of patches"
+    if len(data) > BATCH_MAX:
+        return None, f"At most {BATCH_MAX} patches per request"
+
+    patches = {}
+    for patch in data:
+        if not isinstance(patch, dict) or not _valid(int, patch.get("id")):
+            return None, "Every patch needs an integer id"
+        if patch["id"] in patches:
+            return None, f"Duplicate id {patch['id']}"
+        clean = {}
+        for field, kind in fields.items():
+            if field in patch:
+                if not _valid(kind, patch[field]):
+                    return None, f"Invalid {field} for id {patch['id']}"
+                clean[field] = patch[field]
+        patches[patch["id"]] = clean
+    return patches, None
+
+def _apply_batch(model, restaurant_id, patches):
+    """
+    Apply all patches with a single set-based statement:
+    UPDATE ... SET col = CASE id WHEN .. THEN .. ELSE col END
+    WHERE restaurant_id = :tenant AND id IN (...)
+    Returns the ids that did not match this restaurant (nothing is written then).
+    """
+    values = {}
+    for field in {f for patch in patches.values() for f in patch}:
+        whens = {row_id: patch[field] for row_id, patch in patches.items() if field in patch}
+        values[field] = case(whens, value=model.id, else_=getattr(model, field))
+
+    stmt = update(model).where(model.restaurant_id == restaurant_id, model.id.in_(patches))
+    if values:
+        result = db.session.execute(stmt.values(**values).execution_options(synchronize_session=False))
+        if result.rowcount == len(patches):
+            return []
+        db.session.rollback()
+
+    # Slow path only: work out which ids are foreign or missing
+    found = set(db.session.execute(
+        select(model.id).where(model.restaurant_id == restaurant_id, model.id.in_(patches))
+    ).scalars())
+    return sorted(set(patches) - found)
+
+@admin_bp.route("/categories", methods=["PATCH"])
+@owner_required()
+def batch_update_categories():
+    restaurant_id = get_current_user_restaurant_id()
+    patches, error = _parse_batch(request.json, CATEGORY_BATCH_FIELDS)
+    if error:
+        return jsonify({"msg": error}), 400
+
+    missing = _apply_batch(Category, restaurant_id, patches)
+    if missing:
+        return jsonify({"msg": "Categories not found", "ids": missing}), 404
+
+    bump_menu_version(restaurant_id)
+    db.session.commit()
+    return jsonify({"msg": "Categories updated", "updated": len(patches)})
+
+@admin_bp.route("/items", methods=["PATCH"])
+@owner_required()
+def batch_update_items():
+    restaurant_id = get_current_user_restaurant_id()
+    patches, error = _parse_batch(request.json, ITEM_BATCH_FIELDS)
+    if error:
+        return jsonify({"msg": error}), 400
+
+    # Moved items: validate every target category in one query
+    target_categories = {p["category_id"] for p in patches.values() if "category_id" in p}
+    if target_categories:
+        owned = db.session.execute(
+            select(db.func.count(Category.id))
+            .where(Category.restaurant_id == restaurant_id, Category.id.in_(target_categories))
+        ).scalar()
+        if owned != len(target_categories):
+            return jsonify({"msg": "Invalid category"}), 400
+
+    missing = _apply_batch(MenuItem, restaurant_id, patches)
+    if missing:
+        return jsonify({"msg": "Items not found", "ids": missing}), 404
+
+    bump_menu_version(restaurant_id)
+    db.session.commit()
+    return jsonify({"msg": "Items updated", "updated": len(patches)})
+
+# --- Bulk Import / Export ---
+from flask import Response, stream_with_context
+from app.core.menu_io import iter_csv_rows, iter_json_rows, import_menu, iter_export_rows, export_csv, export_json
+
+@admin_bp.route("/menu/import", methods=["POST"])
+@owner_required()
+def import_menu_rows():
+    """
+    Upsert a whole menu from CSV or JSON (array or JSON Lines), sent as the
+    request body or a multipart 'file'. ?format=csv|json, ?dry_run=1 to validate
+    without writing. Responds with counts and a per-row error report.
+    """
+    restaurant_id = get_current_user_restaurant_id()
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "json"):
+        return jsonify({"msg": "format must be csv or json"}), 400
+    dry_run = request.args.get("dry_run", "0").lower() in ("1", "true", "yes")
+
+    stream = request.files["file"].stream if "file" in request.files else request.stream
+    rows = iter_csv_rows(stream) if fmt == "csv" else iter_json_rows(stream)
+    try:
+        report = import_menu(restaurant_id, rows, dry_run=dry_run)
+    except (ValueError, UnicodeDecodeError) as exc:
+        db.session.rollback()
+        return jsonify({"msg": f"Could not parse {fmt}: {exc}"}), 400
+
+    return jsonify(report), (200 if dry_run else 201)
+
+@admin_bp.route("/menu/export", methods=["GET"])
+def export_menu_rows():
+    restaurant_id = get_current_user_restaurant_id()
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "json"):
+        return jsonify({"msg": "format must be csv or json"}), 400
+
+    rows = iter_export_rows(restaurant_id)
+    body = export_csv(rows) if fmt == "csv" else export_json(rows)
+    mimetype = "text/csv" if fmt == "csv" else "application/json"
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename=menu.{fmt}"
+    })
+
 # --- Image Upload ---
 from werkzeug.utils import secure_filename
-import os
 from flask import current_app
+from app.core.images import image_pipeline, save_upload, variant_urls, InvalidImage
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
 
@@ -181,16 +332,19 @@ def upload_file():
     if file.filename == '':
         return jsonify({"msg": "No selected file"}), 400
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        # Create unique filename to prevent overwrite and caching
-        import time
-        unique_filename = f"{int(time.time())}_{filename}"
-        
-        file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename))
-        
-        # Generate URL
-        # Assuming app serves static from /static
-        url = f"{request.host_url}static/uploads/{unique_filename}"
-        return jsonify({"url": url})
+        ext = secure_filename(file.filename).rsplit('.', 1)[1].lower()
+        ext = "jpg" if ext == "jpeg" else ext
+
+        # Content-addressed name: identical uploads dedupe and URLs are immutable
+        try:
+            digest = save_upload(file.stream, current_app.config['UPLOAD_FOLDER'], ext)
+        except InvalidImage:
+            return jsonify({"msg": "Invalid image"}), 400
+
+        # Resize/transcode off the request thread
+        image_pipeline.submit(digest, ext)
+
+        url = f"{request.host_url}media/{digest}.{ext}"
+        return jsonify({"url": url, "variants": variant_urls(url)})
         
     return jsonify({"msg": "Invalid file type"}), 400
@@ -1,19 +1,26 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.models import db, Restaurant, Table, User, Category, MenuItem
+from flask_jwt_extended import jwt_required
+from app.models.models import db, Restaurant, Table, Category, MenuItem
 from app.decorators import owner_required
+from app.core.security import current_auth
+from app.core.menu_cache import bump_menu_version
 import uuid
 
 admin_bp = Blueprint('admin_features', __name__)
 
+@admin_bp.before_request
+@jwt_required()
+def ensure_restaurant_context():
+    # Same guard as app.routers.admin: a token for a deleted user gets 401
+    if not current_auth():
+        return jsonify({"msg": "User not found"}), 401
+
 # --- SETTINGS ENDPOINTS ---
 
 @admin_bp.route('/settings', methods=['GET'])
 @jwt_required()
 def get_settings():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    restaurant = Restaurant.query.get(user.restaurant_id)
+    restaurant = db.session.get(Restaurant, current_auth().restaurant_id)
 
     return jsonify({
         'name': restaurant.name,
@@ -26,9 +33,7 @@ def get_settings():
 @admin_bp.route('/settings', methods=['PUT'])
 @jwt_required()
 def update_settings():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    restaurant = Restaurant.query.get(user.restaurant_id)
+    restaurant = db.session.get(Restaurant, current_auth().restaurant_id)
     
     data = request.json
     
@@ -37,6 +42,7 @@ def update_settings():
     if 'wifi_ssid' in data: restaurant.wifi_ssid = data['wifi_ssid']
     if 'wifi_password' in data: restaurant.wifi_password = data['wifi_password']
     
+    bump_menu_version(restaurant.id)
     db.session.commit()
     return jsonify({'msg': 'Settings updated'})
 
@@ -45,31 +51,33 @@ def update_settings():
 @admin_bp.route('/tables', methods=['GET'])
 @jwt_required()
 def get_tables():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    auth = current_auth()
     
-    tables = Table.query.filter_by(restaurant_id=user.restaurant_id).all()
+    tables = Table.query.filter_by(restaurant_id=auth.restaurant_id).all()
     return jsonify([{
         'id': t.id,
         'name': t.name,
         'token': t.token,
         'is_active': t.is_active,
-        'url': f"/r/{user.restaurant.slug}?t={t.token or t.id}" # Simplified logical URL
+        'url': f"/r/{auth.slug}?t={t.token or t.id}" # Simplified logical URL
     } for t in tables])
 
 @admin_bp.route('/tables', methods=['POST'])
 @jwt_required()
 def create_table():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    auth = current_auth()
     data = request.json
     
     # Generate simple token or use name
     token = str(uuid.uuid4())[:8]
     
+    name = data.get('name')
+    if not name:
+        name = f"Table {Table.query.filter_by(restaurant_id=auth.restaurant_id).count() + 1}"
+    
     new_table = Table(
-        restaurant_id=user.restaurant_id,
-        name=data.get('name', f"Table {len(user.restaurant.tables) + 1}"),
+        restaurant_id=auth.restaurant_id,
+        name=name,
         token=token,
         is_active=True
     )
@@ -82,10 +90,9 @@ def create_table():
 @admin_bp.route('/tables/<int:id>', methods=['DELETE'])
 @jwt_required()
 def delete_table(id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    auth = current_auth()
     
-    table = Table.query.filter_by(id=id, restaurant_id=user.restaurant_id).first()
+    table = Table.query.filter_by(id=id, restaurant_id=auth.restaurant_id).first()
     if not table:
         return jsonify({'msg': 'Table not found'}), 404
         
@@ -95,9 +102,7 @@ def delete_table(id):
 @admin_bp.route('/seed-demo', methods=['POST'])
 @jwt_required() # Protect this
 def seed_demo_data():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    restaurant = Restaurant.query.get(user.restaurant_id)
+    restaurant = db.session.get(Restaurant, current_auth().restaurant_id)
     
     # 1. Ensure Categories exist
     cats_data = ["Başlangıçlar", "Ana Yemekler", "İçecekler", "Tatlılar"]
@@ -145,6 +150,7 @@ def seed_demo_data():
     add_item("Tatlılar", "Fıstıklı Baklava", "Antep fıstıklı çıtır baklava (3 dilim).", 220.0, "https://images.unsplash.com/photo-1597075687490-8f673c6c17f6?w=500&q=80")
     add_item("Tatlılar", "Sütlaç", "Fırınlanmış köy sütlacı.", 140.0, "https://images.unsplash.com/photo-1563805042-7684c019e1cb?w=500&q=80")
 
+    bump_menu_version(restaurant.id)
     db.session.commit()
     return jsonify({"msg": "Demo data seeded successfully", "restaurant": restaurant.name})
 
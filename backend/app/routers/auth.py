@@ -2,10 +2,19 @@ from flask import Blueprint, jsonify, request
 from werkzeug.security import check_password_hash
 from flask_jwt_extended import create_access_token
 from app.models.models import User
+from app.core.ratelimit import limiter, Limit, client_ip, json_field
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route("/login", methods=["POST"])
+# check_password_hash is deliberately slow: throttle guessing and cap how many
+# threads per worker can be hashing at once
+@limiter.limit(
+    "login",
+    Limit("ip", "RATE_LIMIT_LOGIN_IP", client_ip),
+    Limit("account", "RATE_LIMIT_LOGIN_ACCOUNT", json_field("email")),
+    concurrency="LOGIN_CONCURRENCY",
+)
 def login():
     data = request.json
     email = data.get("email")
@@ -0,0 +1,33 @@
+import os
+from flask import Blueprint, current_app, send_from_directory, abort
+from werkzeug.exceptions import NotFound
+
+media_bp = Blueprint('media', __name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+ORIGINAL_EXTENSIONS = ("jpg", "png", "webp")
+
+@media_bp.route("/<path:filename>", methods=["GET"])
+def get_media(filename):
+    """
+    Serve uploads. Names are content hashes, so they can be cached forever.
+    send_from_directory handles Range/conditional requests and uses X-Sendfile
+    when USE_X_SENDFILE is enabled behind nginx.
+    """
+    upload_dir = current_app.config["UPLOAD_FOLDER"]
+    try:
+        response = send_from_directory(upload_dir, filename, max_age=31536000)
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response
+    except NotFound:
+        pass
+
+    # Variant still being generated: serve the original, without caching
+    digest, sep, _ = filename.partition("_")
+    if sep:
+        for ext in ORIGINAL_EXTENSIONS:
+            if os.path.exists(os.path.join(upload_dir, f"{os.path.basename(digest)}.{ext}")):
+                response = send_from_directory(upload_dir, f"{os.path.basename(digest)}.{ext}", max_age=0)
+                response.headers["Cache-Control"] = "no-cache"
+                return response
+    abort(404)
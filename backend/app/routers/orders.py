@@ -1,14 +1,42 @@
-from flask import Blueprint, request, jsonify
+import base64
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify, current_app, abort
+from sqlalchemy import select, insert, update, case, and_, tuple_, false
+from sqlalchemy.orm import selectinload
 from app.database import db
-from app.models.models import Order, OrderItem, MenuItem, Restaurant
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.models import Order, OrderItem, MenuItem, Restaurant, Table
+from flask_jwt_extended import jwt_required
+from app.core.http_cache import not_modified, with_cache_headers
+from app.core.events import order_events, format_sse, EventGap
+from app.core.security import current_auth
+from app.core.reports import record_order, record_status_changes
+from app.core.ratelimit import limiter, Limit, client_ip, json_field
+from app.core.intake import order_intake, IntakeFull
 
 orders_bp = Blueprint("orders", __name__)
 
 # --- Public Endpoints ---
 
 @orders_bp.route("/public/orders", methods=["POST"])
+@limiter.limit(
+    "order",
+    Limit("ip", "RATE_LIMIT_ORDER_IP", client_ip),
+    Limit("table", "RATE_LIMIT_ORDER_TABLE", json_field("restaurantSlug", "tableNumber")),
+    Limit("restaurant", "RATE_LIMIT_ORDER_RESTAURANT", json_field("restaurantSlug")),
+    concurrency="ORDER_CONCURRENCY",
+)
 def create_order():
+    """
+    Place an order in a fixed number of statements regardless of cart size:
+      1. SELECT restaurant, QR table + active prices for every cart line (one IN lookup)
+      2. INSERT the order
+      3. INSERT all order lines (single executemany)
+      4-5. UPSERT the hourly and per-item sales rollups (app.core.reports)
+    With ORDER_INTAKE only step 1 runs here: the order is queued and
+    acknowledged with 202, and app.core.intake writes it in a batch.
+    """
     data = request.get_json()
     
     # Validation
@@ -16,98 +44,332 @@ def create_order():
     table_number = data.get("tableNumber")
     items = data.get("items") # list of { menuItemId, quantity }
     note = data.get("note", "")
+    table_token = data.get("tableToken") # from the QR URL; links the order to the table
 
     if not slug or not table_number or not items:
         return jsonify({"error": "Missing required fields"}), 400
-    
-    restaurant = Restaurant.query.filter_by(slug=slug).first()
-    if not restaurant:
+
+    lines = []
+    for item_data in items:
+        qty = item_data.get("quantity", 0)
+        if qty < 1:
+            continue
+        try:
+            lines.append((int(item_data.get("menuItemId")), qty))
+        except (TypeError, ValueError):
+            continue
+
+    # Outer joins keep the restaurant row even when no table or requested item matches
+    rows = db.session.execute(
+        select(Restaurant.id, Table.id, MenuItem.id, MenuItem.price, MenuItem.name)
+        .select_from(Restaurant)
+        .outerjoin(Table, and_(
+            Table.restaurant_id == Restaurant.id,
+            Table.token == str(table_token),
+            Table.is_active.is_(True),
+        ) if table_token else false())
+        .outerjoin(MenuItem, and_(
+            MenuItem.restaurant_id == Restaurant.id,
+            MenuItem.id.in_({menu_item_id for menu_item_id, _ in lines}),
+            MenuItem.is_active.is_(True),
+        ))
+        .where(Restaurant.slug == slug)
+    ).all()
+    if not rows:
         return jsonify({"error": "Restaurant not found"}), 404
+
+    restaurant_id, table_id = rows[0][:2]
+    menu = {menu_item_id: (price, name) for _, _, menu_item_id, price, name in rows if menu_item_id is not None}
         
     # Calculate Total Server-Side
     total_amount = 0.0
-    order_items = []
+    order_lines = []
+    event_items = []
     
-    for item_data in items:
-        menu_item_id = item_data.get("menuItemId")
-        qty = item_data.get("quantity", 0)
-        
-        if qty < 1:
-            continue
-            
-        menu_item = MenuItem.query.filter_by(id=menu_item_id, restaurant_id=restaurant.id).first()
-        if not menu_item:
+    for menu_item_id, qty in lines:
+        if menu_item_id not in menu:
             continue
+        price, name = menu[menu_item_id]
             
-        line_total = menu_item.price * qty
+        line_total = price * qty
         total_amount += line_total
         
-        order_items.append(OrderItem(
-            menu_item_id=menu_item.id,
-            quantity=qty,
-            unit_price=menu_item.price,
-            line_total=line_total
-        ))
+        order_lines.append({
+            "menu_item_id": menu_item_id,
+            "quantity": qty,
+            "unit_price": price,
+            "line_total": line_total
+        })
+        event_items.append({"name": name, "quantity": qty, "unit_price": price})
     
-    if not order_items:
+    if not order_lines:
         return jsonify({"error": "No valid items in order"}), 400
+
+    if order_intake.enabled:
+        try:
+            order_id = order_intake.submit(restaurant_id, table_number, total_amount, note, order_lines,
+                                           event_items, datetime.now(timezone.utc).replace(tzinfo=None),
+                                           table_id=table_id)
+        except IntakeFull:
+            response = jsonify({"error": "We are very busy, please try again in a moment"})
+            response.headers["Retry-After"] = "2"
+            return response, 503
+        return jsonify({
+            "message": "Order received",
+            "orderId": order_id,
+            "total": total_amount,
+            "table": table_number,
+            "queued": True
+        }), 202
         
     # Create Order
     new_order = Order(
-        restaurant_id=restaurant.id,
+        restaurant_id=restaurant_id,
         table_number=table_number,
+        table_id=table_id,
         total_amount=total_amount,
         note=note,
         status="PENDING"
     )
     db.session.add(new_order)
     db.session.flush() # Get ID
+    order_id = new_order.id # read before commit expires it (avoids a reload)
+    created_at = new_order.created_at
     
-    for oi in order_items:
-        oi.order_id = new_order.id
-        db.session.add(oi)
+    for line in order_lines:
+        line["order_id"] = order_id
+    db.session.execute(insert(OrderItem), order_lines)
+    record_order(restaurant_id, created_at, total_amount, order_lines)
         
     db.session.commit()
+
+    # Same shape as the admin feed so kitchen screens can insert it directly
+    order_events.publish(restaurant_id, "order.created", {
+        "id": order_id,
+        "table": table_number,
+        "total": total_amount,
+        "status": "PENDING",
+        "revision": 1,
+        "itemsCount": len(event_items),
+        "note": note,
+        "createdAt": created_at,
+        "items": event_items
+    })
     
     return jsonify({
         "message": "Order placed successfully", 
-        "orderId": new_order.id,
+        "orderId": order_id,
         "total": total_amount,
         "table": table_number
     }), 201
 
 @orders_bp.route("/public/orders/<int:order_id>", methods=["GET"])
 def get_order_status(order_id):
-    order = Order.query.get_or_404(order_id)
-    return jsonify({
-        "id": order.id,
-        "status": order.status,
-        "table": order.table_number,
-        "total": order.total_amount,
-        "createdAt": order.created_at,
+    revision = db.session.query(Order.revision).filter_by(id=order_id).scalar()
+    if revision is None:
+        queued = order_intake.find(order_id)
+        if queued is None:
+            if not (order_intake.enabled and order_intake.reserved(order_id)):
+                abort(404)
+            # Queued by a worker on another host: all that is known is that it exists
+            return jsonify({"id": order_id, "status": "PENDING", "table": None, "total": None,
+                            "createdAt": None, "items": []})
+        # Acknowledged but not written yet (ORDER_INTAKE); never cached
+        return jsonify({
+            "id": order_id,
+            "status": "PENDING",
+            "table": queued["table_number"],
+            "total": queued["total"],
+            "createdAt": datetime.fromisoformat(queued["created_at"]),
+            "items": [{"name": i["name"], "quantity": i["quantity"], "total": i["unit_price"] * i["quantity"]}
+                      for i in queued["event_items"]]
+        })
+
+    # Customers poll this; answer unchanged orders without loading items
+    etag = f"order-{order_id}-{revision}"
+    cache_control = current_app.config["ORDER_STATUS_CACHE_CONTROL"]
+    cached = not_modified(etag, cache_control)
+    if cached is not None:
+        return cached
+
+    # Order + lines + item names in one query (was one lazy load per line)
+    rows = db.session.execute(
+        select(Order.status, Order.table_number, Order.total_amount, Order.created_at,
+               MenuItem.name, OrderItem.quantity, OrderItem.line_total)
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .where(Order.id == order_id)
+        .order_by(OrderItem.id)
+    ).all()
+    if not rows:
+        abort(404)
+    status, table_number, total_amount, created_at = rows[0][:4]
+    response = jsonify({
+        "id": order_id,
+        "status": status,
+        "table": table_number,
+        "total": total_amount,
+        "createdAt": created_at,
         "items": [
             {
-                "name": i.menu_item.name,
-                "quantity": i.quantity,
-                "total": i.line_total
-            } for i in order.items
+                "name": name,
+                "quantity": quantity,
+                "total": line_total
+            } for _, _, _, _, name, quantity, line_total in rows if quantity is not None
         ]
     })
+    return with_cache_headers(response, etag, cache_control)
+
+# Orders a table still waits on; served and cancelled ones drop out of tracking
+TABLE_OPEN_STATUSES = ("PENDING", "ACCEPTED", "PREPARING", "READY")
+
+def _table_orders(slug, token):
+    """
+    (restaurant_id, table name, open orders with items) for a QR table from
+    one joined query, or None if slug + token name no active table.
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        hours=current_app.config["TABLE_ORDERS_MAX_AGE_HOURS"])
+    rows = db.session.execute(
+        select(Restaurant.id, Table.name, Order.id, Order.status, Order.revision, Order.table_number,
+               Order.total_amount, Order.created_at, Order.note,
+               MenuItem.name, OrderItem.quantity, OrderItem.line_total)
+        .select_from(Restaurant)
+        .join(Table, and_(Table.restaurant_id == Restaurant.id, Table.token == token, Table.is_active.is_(True)))
+        .outerjoin(Order, and_(
+            Order.table_id == Table.id,
+            Order.status.in_(TABLE_OPEN_STATUSES),
+            Order.created_at >= cutoff,
+        ))
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .where(Restaurant.slug == slug)
+        .order_by(Order.created_at, Order.id, OrderItem.id)
+    ).all()
+    if not rows:
+        return None
+
+    orders = {}
+    for (_, _, order_id, status, revision, table_number, total_amount, created_at, note,
+         name, quantity, line_total) in rows:
+        if order_id is None:
+            continue
+        order = orders.get(order_id)
+        if order is None:
+            order = orders[order_id] = {
+                "id": order_id,
+                "status": status,
+                "revision": revision,
+                "table": table_number,
+                "total": total_amount,
+                "note": note,
+                "createdAt": created_at,
+                "items": []
+            }
+        if quantity is not None:
+            order["items"].append({"name": name, "quantity": quantity, "total": line_total})
+    return rows[0][0], rows[0][1], list(orders.values())
+
+def _table_cursor(orders):
+    # (id, revision) of every open order: a new order, a status change or an
+    # order leaving the table changes it, and `since` can be diffed against it
+    return ",".join(f"{o['id']}:{o['revision']}" for o in orders) or "0"
+
+def _parse_table_cursor(cursor):
+    if cursor == "0":
+        return {}
+    return {int(order_id): int(revision) for order_id, revision in (p.split(":") for p in cursor.split(","))}
+
+@orders_bp.route("/public/restaurants/<string:slug>/tables/<string:token>/orders", methods=["GET"])
+@limiter.limit("table_orders", concurrency="TABLE_POLL_CONCURRENCY")
+def get_table_orders(slug, token):
+    """
+    Open orders of the table behind a QR code (restaurant slug + table token).
+
+    Plain polls get every open order and an ETag; If-None-Match answers 304
+    while nothing changed. With `since` (the `cursor` of a previous response)
+    only new or changed orders are returned, plus the ids of orders that were
+    served or cancelled in `removed`. `wait` (seconds, up to
+    TABLE_POLL_MAX_WAIT) holds a `since` request open until something
+    changes; on timeout the delta is empty.
+    """
+    since = request.args.get("since")
+    try:
+        known = _parse_table_cursor(since) if since else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    wait = min(max(request.args.get("wait", 0, type=float), 0), current_app.config["TABLE_POLL_MAX_WAIT"])
+
+    result = _table_orders(slug, token)
+    if result is None:
+        return jsonify({"error": "Table not found"}), 404
+    restaurant_id, table_name, orders = result
+    cursor = _table_cursor(orders)
+    cache_control = current_app.config["ORDER_STATUS_CACHE_CONTROL"]
+
+    if known is None:
+        etag = "table-" + hashlib.blake2b(cursor.encode(), digest_size=8).hexdigest()
+        cached = not_modified(etag, cache_control)
+        if cached is not None:
+            return cached
+        response = jsonify({"table": table_name, "cursor": cursor, "orders": orders})
+        return with_cache_headers(response, etag, cache_control)
+
+    if wait and cursor == since:
+        # Woken by order events published in this worker, and rechecking every
+        # TABLE_POLL_RECHECK seconds for orders other workers wrote. The DB
+        # connection goes back to the pool while waiting.
+        recheck = current_app.config["TABLE_POLL_RECHECK"]
+        deadline = time.monotonic() + wait
+        after_id = order_events.latest_id()
+        db.session.remove()
+        while cursor == since and (remaining := deadline - time.monotonic()) > 0:
+            try:
+                events = order_events.read(restaurant_id, after_id, min(remaining, recheck))
+            except EventGap:
+                events = []
+            after_id = events[-1].id if events else order_events.latest_id()
+            result = _table_orders(slug, token)
+            db.session.remove()
+            if result is None:
+                return jsonify({"error": "Table not found"}), 404
+            _, table_name, orders = result
+            cursor = _table_cursor(orders)
+
+    current = {o["id"] for o in orders}
+    response = jsonify({
+        "table": table_name,
+        "cursor": cursor,
+        "orders": [o for o in orders if known.get(o["id"]) != o["revision"]],
+        "removed": [order_id for order_id in known if order_id not in current],
+        "delta": True
+    })
+    response.headers["Cache-Control"] = cache_control
+    return response
 
 # --- Admin Endpoints ---
 
-@orders_bp.route("/admin/orders", methods=["GET"])
-@jwt_required()
-def get_admin_orders():
-    # In a real app, strict checks on 'restaurant_id' from JWT if multi-tenant
-    # For now, we return all orders (or filter by generic)
-    orders = Order.query.order_by(Order.created_at.desc()).all()
-    
-    return jsonify([{
+ORDER_STATUSES = ["PENDING", "ACCEPTED", "PREPARING", "READY", "SERVED", "CANCELLED"]
+# Allowed moves per current status; a cancelled order can be restored to PENDING
+ORDER_TRANSITIONS = {
+    "PENDING": {"ACCEPTED", "PREPARING", "CANCELLED"},
+    "ACCEPTED": {"PREPARING", "READY", "CANCELLED"},
+    "PREPARING": {"READY", "CANCELLED"},
+    "READY": {"SERVED"},
+    "SERVED": set(),
+    "CANCELLED": {"PENDING"},
+}
+ORDER_PAGE_SIZE = 50
+ORDER_PAGE_MAX = 200
+
+def admin_order_json(o):
+    return {
         "id": o.id,
         "table": o.table_number,
         "total": o.total_amount,
         "status": o.status,
+        "revision": o.revision,
         "itemsCount": len(o.items),
         "note": o.note,
         "createdAt": o.created_at,
@@ -118,19 +380,271 @@ def get_admin_orders():
                 "unit_price": i.unit_price
             } for i in o.items
         ]
-    } for o in orders])
+    }
+
+def _encode_cursor(order):
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), int(order_id)
+
+@orders_bp.route("/admin/orders", methods=["GET"])
+@jwt_required()
+def get_admin_orders():
+    """
+    Newest-first order feed for the caller's restaurant.
+
+    Query params: status (comma separated), since / until (ISO datetimes),
+    limit, cursor (opaque, from the previous page's next_cursor).
+    Pages are keyset-paginated on (created_at, id) and cost two queries:
+    the order page and one selectin load of its lines + menu items.
+    """
+    auth = current_auth()
+    if not auth:
+        return jsonify({"msg": "User not found"}), 401
+
+    query = Order.query.filter(Order.restaurant_id == auth.restaurant_id)
+
+    try:
+        statuses = [s for s in request.args.get("status", "").split(",") if s]
+        if any(s not in ORDER_STATUSES for s in statuses):
+            raise ValueError("status")
+        if statuses:
+            query = query.filter(Order.status.in_(statuses))
+        if request.args.get("since"):
+            query = query.filter(Order.created_at >= datetime.fromisoformat(request.args["since"]))
+        if request.args.get("until"):
+            query = query.filter(Order.created_at < datetime.fromisoformat(request.args["until"]))
+        if request.args.get("cursor"):
+            query = query.filter(tuple_(Order.created_at, Order.id) < _decode_cursor(request.args["cursor"]))
+        limit = int(request.args.get("limit", ORDER_PAGE_SIZE))
+        if limit < 1:
+            raise ValueError("limit")
+        limit = min(limit, ORDER_PAGE_MAX)
+    except ValueError:
+        return jsonify({"error": "Invalid filter"}), 400
+
+    # Fetch one extra row to know whether another page exists
+    orders = query.order_by(Order.created_at.desc(), Order.id.desc()).options(
+        selectinload(Order.items).joinedload(OrderItem.menu_item)
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = _encode_cursor(orders[-1])
+
+    return jsonify({
+        "orders": [admin_order_json(o) for o in orders],
+        "next_cursor": next_cursor
+    })
+
+@orders_bp.route("/admin/orders/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"]) # EventSource cannot send headers
+def stream_admin_orders():
+    """
+    Server-Sent Events feed of order.created / order.status for the caller's
+    restaurant. Reconnects resume from Last-Event-ID; if that id can no longer
+    be replayed a `resync` event tells the client to refetch /admin/orders.
+    Streams end after ORDER_STREAM_MAX_SECONDS and the browser reconnects,
+    so long-lived listeners never hold a worker thread indefinitely.
+    """
+    auth = current_auth()
+    if not auth:
+        return jsonify({"msg": "User not found"}), 401
+    restaurant_id = auth.restaurant_id
+
+    # Ids are opaque; one the broker does not know (another worker's, an
+    # earlier run's) makes the first read raise EventGap -> resync
+    after_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId") or order_events.latest_id()
+
+    heartbeat = current_app.config["ORDER_STREAM_HEARTBEAT"]
+    max_seconds = current_app.config["ORDER_STREAM_MAX_SECONDS"]
+    # Release the pooled DB connection; the stream itself never touches the DB
+    db.session.remove()
+
+    def generate():
+        nonlocal after_id
+        yield "retry: 3000\n\n"
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            try:
+                events = order_events.read(restaurant_id, after_id, heartbeat)
+            except EventGap:
+                after_id = order_events.latest_id()
+                yield format_sse("resync", "{}", after_id)
+                continue
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                after_id = event.id
+                yield format_sse(event.type, event.data, event.id)
+
+    return current_app.response_class(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no" # disable nginx response buffering
+    })
+
+def _transition_orders(restaurant_id, transitions):
+    """
+    Move orders to new statuses with optimistic concurrency.
+
+    `transitions` maps order id -> (new_status, expected_revision or None).
+    One SELECT reads the current state, then a single conditional
+    UPDATE ... SET status = CASE id .. END, revision = revision + 1
+    WHERE (id, revision) IN (...) applies every valid move. A row whose
+    revision changed in between is left alone and reported as a conflict,
+    so concurrent tablets never overwrite each other and no row locks are
+    held. Returns {id: result dict}; the caller commits.
+    """
+    current = {
+        row.id: row for row in db.session.execute(
+            select(Order.id, Order.status, Order.revision, Order.created_at, Order.total_amount)
+            .where(Order.restaurant_id == restaurant_id, Order.id.in_(transitions))
+        )
+    }
+
+    results = {}
+    pending = {}  # id -> revision the UPDATE is guarded by
+    for order_id, (new_status, expected) in transitions.items():
+        row = current.get(order_id)
+        if row is None:
+            results[order_id] = {"id": order_id, "result": "not_found"}
+        elif expected is not None and expected != row.revision:
+            results[order_id] = {"id": order_id, "result": "conflict", "status": row.status, "revision": row.revision}
+        elif new_status == row.status:
+            results[order_id] = {"id": order_id, "result": "unchanged", "status": row.status, "revision": row.revision}
+        elif new_status not in ORDER_TRANSITIONS[row.status]:
+            results[order_id] = {"id": order_id, "result": "invalid_transition",
+                                 "status": row.status, "revision": row.revision}
+        else:
+            pending[order_id] = row.revision
+
+    if not pending:
+        return results
+
+    applied = dict(db.session.execute(
+        update(Order)
+        .where(Order.restaurant_id == restaurant_id,
+               tuple_(Order.id, Order.revision).in_(list(pending.items())))
+        .values(status=case({oid: transitions[oid][0] for oid in pending}, value=Order.id),
+                revision=Order.revision + 1)
+        .returning(Order.id, Order.revision)
+        .execution_options(synchronize_session=False)
+    ).all())
+
+    lost = [order_id for order_id in pending if order_id not in applied]
+    if lost:
+        # Changed by someone else between our read and the UPDATE
+        for row in db.session.execute(
+            select(Order.id, Order.status, Order.revision).where(Order.id.in_(lost))
+        ):
+            results[row.id] = {"id": row.id, "result": "conflict", "status": row.status, "revision": row.revision}
+
+    # Only winning updates touch the rollups, so a race cannot count a cancellation twice
+    record_status_changes([
+        (order_id, restaurant_id, current[order_id].created_at, current[order_id].total_amount,
+         current[order_id].status, transitions[order_id][0])
+        for order_id in applied
+    ])
+    for order_id, revision in applied.items():
+        results[order_id] = {"id": order_id, "result": "updated",
+                             "status": transitions[order_id][0], "revision": revision}
+    return results
+
+
+def _publish_transitions(restaurant_id, results):
+    for result in results:
+        if result["result"] == "updated":
+            order_events.publish(restaurant_id, "order.status", {
+                "id": result["id"], "status": result["status"], "revision": result["revision"]
+            })
+
+
+def _parse_revision(value):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("revision")
+    return value
+
 
 @orders_bp.route("/admin/orders/<int:order_id>/status", methods=["PUT"])
 @jwt_required()
 def update_order_status(order_id):
-    order = Order.query.get_or_404(order_id)
-    data = request.get_json()
+    """
+    Body: {"status": ..., "revision": optional}. With a revision the change
+    only applies if the order is still at that revision (409 otherwise).
+    """
+    auth = current_auth()
+    if not auth:
+        return jsonify({"msg": "User not found"}), 401
+
+    data = request.get_json() or {}
     new_status = data.get("status")
-    
-    if new_status not in ["PENDING", "ACCEPTED", "PREPARING", "READY", "SERVED", "CANCELLED"]:
+    if new_status not in ORDER_STATUSES:
         return jsonify({"error": "Invalid status"}), 400
-        
-    order.status = new_status
+    try:
+        expected = _parse_revision(data.get("revision"))
+    except ValueError:
+        return jsonify({"error": "Invalid revision"}), 400
+
+    result = _transition_orders(auth.restaurant_id, {order_id: (new_status, expected)})[order_id]
+    if result["result"] == "not_found":
+        abort(404)
+    if result["result"] == "conflict":
+        return jsonify(dict(result, error="Order was changed by someone else")), 409
+    if result["result"] == "invalid_transition":
+        return jsonify(dict(result, error=f"Cannot move order from {result['status']} to {new_status}")), 409
+
     db.session.commit()
-    
-    return jsonify({"message": "Status updated", "status": order.status})
+    _publish_transitions(auth.restaurant_id, [result])
+    return jsonify({"message": "Status updated", "status": new_status, "revision": result["revision"]})
+
+
+@orders_bp.route("/admin/orders", methods=["PATCH"])
+@jwt_required()
+def batch_update_order_status():
+    """
+    Kitchen bulk actions ("mark all ready") in one round trip.
+
+    Body: [{"id": 12, "status": "READY", "revision": 4}, ...] (revision
+    optional, as for the single-order PUT). Valid transitions are applied
+    together; every order gets a result: updated, unchanged, conflict,
+    invalid_transition or not_found, with its current status and revision.
+    """
+    auth = current_auth()
+    if not auth:
+        return jsonify({"msg": "User not found"}), 401
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Expected a non-empty list of transitions"}), 400
+    if len(data) > ORDER_PAGE_MAX:
+        return jsonify({"error": f"At most {ORDER_PAGE_MAX} transitions per request"}), 400
+
+    transitions = {}
+    for entry in data:
+        if not isinstance(entry, dict) or isinstance(entry.get("id"), bool) or not isinstance(entry.get("id"), int):
+            return jsonify({"error": "Every transition needs an integer id"}), 400
+        if entry["id"] in transitions:
+            return jsonify({"error": f"Duplicate id {entry['id']}"}), 400
+        if entry.get("status") not in ORDER_STATUSES:
+            return jsonify({"error": f"Invalid status for id {entry['id']}"}), 400
+        try:
+            transitions[entry["id"]] = (entry["status"], _parse_revision(entry.get("revision")))
+        except ValueError:
+            return jsonify({"error": f"Invalid revision for id {entry['id']}"}), 400
+
+    results = _transition_orders(auth.restaurant_id, transitions)
+    db.session.commit()
+
+    ordered = [results[order_id] for order_id in transitions]
+    _publish_transitions(auth.restaurant_id, ordered)
+    return jsonify({
+        "updated": sum(1 for r in ordered if r["result"] == "updated"),
+        "results": ordered,
+    })
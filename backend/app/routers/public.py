@@ -1,45 +1,52 @@
-from flask import Blueprint, jsonify
-from sqlalchemy.orm import joinedload
-from app.models.models import Restaurant, Category, MenuItem
+from flask import Blueprint, abort, current_app, jsonify, request
+from app.core.menu_cache import get_menu_version, get_menu_body, menu_etag
+from app.core.search import search_index
+from app.core.http_cache import not_modified, with_cache_headers
+from app.core.compression import compression
 
 public_bp = Blueprint('public', __name__)
 
 @public_bp.route("/restaurants/<string:slug>/menu", methods=["GET"])
 def get_menu(slug):
-    restaurant = Restaurant.query.filter_by(slug=slug).first_or_404()
-    
-    # Fetch active categories and items efficiently
-    categories = Category.query.filter_by(
-        restaurant_id=restaurant.id, is_active=True
-    ).order_by(Category.sort_order).options(
-        joinedload(Category.items)
-    ).all()
-    
-    response_categories = []
-    for cat in categories:
-        # Filter active items in Python to avoid complex efficient queries for now (list is small)
-        active_items = [
-            {
-                "id": i.id, "name": i.name, "description": i.description,
-                "price": i.price, "currency": i.currency, "image_url": i.image_url,
-                "sort_order": i.sort_order
-            }
-            for i in cat.items if i.is_active
-        ]
-        # Sort items
-        active_items.sort(key=lambda x: (x["sort_order"], x["id"]))
-        
-        if active_items: # Optional: only show categories with items? Requirement says "active categories", assuming all.
-            pass
-
-        response_categories.append({
-            "id": cat.id,
-            "name": cat.name,
-            "items": active_items
-        })
-        
-    return jsonify({
-        "restaurant_name": restaurant.name,
-        "slug": restaurant.slug,
-        "categories": response_categories
-    })
+    row = get_menu_version(slug)
+    if row is None:
+        abort(404)
+
+    # Revalidation only needs the version; skip building/serializing the body
+    etag = menu_etag(row.id, row.menu_version)
+    cache_control = current_app.config["MENU_CACHE_CONTROL"]
+    cached = not_modified(etag, cache_control)
+    if cached is not None:
+        return cached
+
+    # Served from the per-worker snapshot cache; rebuilt only when menu_version changes.
+    # The snapshot also holds its gzip/br encodings, so hot requests never recompress.
+    body = get_menu_body(row.id, row.menu_version)
+    response = current_app.response_class(mimetype="application/json")
+    response.headers["Cache-Control"] = cache_control
+    return compression.respond(response, body, etag)
+
+
+@public_bp.route("/restaurants/<string:slug>/search", methods=["GET"])
+def search_menu(slug):
+    query = request.args.get("q", "").strip()
+    if len(query) > 100:
+        return jsonify({"error": "Search query too long"}), 400
+    max_results = current_app.config["SEARCH_MAX_RESULTS"]
+    limit = min(max(request.args.get("limit", 20, type=int), 1), max_results)
+
+    row = get_menu_version(slug)
+    if row is None:
+        abort(404)
+
+    # Results only change with the menu; the URL carries the query
+    etag = f"search-{menu_etag(row.id, row.menu_version)}"
+    cache_control = current_app.config["MENU_CACHE_CONTROL"]
+    cached = not_modified(etag, cache_control)
+    if cached is not None:
+        return cached
+
+    index = search_index.get(row.id, row.menu_version)
+    total, items = index.search(query, limit)
+    response = jsonify({"query": query, "total": total, "items": items})
+    return with_cache_headers(response, etag, cache_control)
@@ -0,0 +1,41 @@
+from datetime import date, datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify
+from app.decorators import owner_required
+from app.core.security import current_auth
+from app.core.reports import sales_report
+
+reports_bp = Blueprint("reports", __name__)
+
+REPORT_DEFAULT_DAYS = 7
+REPORT_MAX_DAYS = 366
+REPORT_MAX_HOURLY_DAYS = 31
+REPORT_TOP_MAX = 50
+
+
+@reports_bp.route("/reports", methods=["GET"])
+@owner_required()
+def get_reports():
+    """
+    Sales report from the rollup tables.
+
+    Query params: from / to (inclusive ISO dates, UTC; default the last 7 days),
+    granularity (day | hour), top (number of best-selling items).
+    """
+    try:
+        end = date.fromisoformat(request.args["to"]) if request.args.get("to") else datetime.now(timezone.utc).date()
+        start = (date.fromisoformat(request.args["from"]) if request.args.get("from")
+                 else end - timedelta(days=REPORT_DEFAULT_DAYS - 1))
+        granularity = request.args.get("granularity", "day")
+        top = min(int(request.args.get("top", 10)), REPORT_TOP_MAX)
+        if granularity not in ("day", "hour") or start > end or top < 0:
+            raise ValueError()
+    except ValueError:
+        return jsonify({"error": "Invalid report parameters"}), 400
+
+    days = (end - start).days + 1
+    if days > (REPORT_MAX_HOURLY_DAYS if granularity == "hour" else REPORT_MAX_DAYS):
+        return jsonify({"error": "Date range too large"}), 400
+
+    start_at = datetime.combine(start, datetime.min.time())
+    end_at = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    return jsonify(sales_report(current_auth().restaurant_id, start_at, end_at, granularity, top))
@@ -0,0 +1,53 @@
+import os
+import hmac
+from flask import Blueprint, jsonify, current_app, request, abort
+from app.database import pool_stats
+from app.core.metrics import metrics
+from app.core.replicas import replica_router
+from app.core.intake import order_intake
+from app.models.models import Restaurant, User
+
+system_bp = Blueprint('system', __name__)
+
+@system_bp.route("/api/health", methods=["GET"])
+def health_check():
+    return jsonify({"status": "healthy", "service": "qr-menu-backend"})
+
+@system_bp.route("/api/health/db", methods=["GET"])
+def db_health():
+    # Pool counters for this worker: checkout wait, saturation, connection churn;
+    # replica health and lag as last probed by this worker; its order intake queue
+    return jsonify({
+        "pid": os.getpid(),
+        "pools": pool_stats(current_app),
+        "replicas": replica_router.status(),
+        "order_intake": order_intake.stats(),
+    })
+
+@system_bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    # Bearer METRICS_TOKEN when configured, otherwise scrapes from localhost only
+    if not metrics.enabled:
+        abort(404)
+    token = current_app.config["METRICS_TOKEN"]
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return jsonify({"msg": "Unauthorized"}), 401
+    elif request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify({"msg": "Forbidden"}), 403
+    body, content_type = metrics.render()
+    return current_app.response_class(body, content_type=content_type)
+
+@system_bp.route("/", methods=["GET"])
+def home():
+    return jsonify({"message": "QR Menu API is running"})
+
+@system_bp.route("/debug/db", methods=["GET"])
+def debug_db():
+    restaurant = Restaurant.query.first()
+    user = User.query.first()
+    return jsonify({
+        "restaurant": restaurant.name if restaurant else None,
+        "owner": user.email if user else None
+    })
@@ -0,0 +1,68 @@
+import os
+from werkzeug.security import generate_password_hash
+from app.database import db
+from app.models.models import Restaurant, User, Category, MenuItem
+from app.migrations import upgrade as upgrade_schema
+
+
+def init_db(app, seed=True):
+    """Create the schema, apply migrations and (optionally) seed demo data."""
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    with app.app_context():
+        # db.drop_all() # Uncomment to reset
+        db.create_all()
+        # Bring databases created by older versions up to date (indexes, new columns)
+        upgrade_schema(db.engine)
+        app.extensions["schema_checked"] = True
+        if seed:
+            seed_data()
+
+
+# --- Seeding ---
+def seed_data():
+    if Restaurant.query.first():
+        # Check if we need to seed categories/items for existing restaurant
+        demo = Restaurant.query.filter_by(slug="demo-restoran").first()
+        if demo and not Category.query.filter_by(restaurant_id=demo.id).first():
+            print("Seeding extra data for existing restaurant...")
+            seed_menu_items(demo)
+            db.session.commit()
+        return
+    
+    # Create Restaurant
+    demo = Restaurant(name="Demo Restoran", slug="demo-restoran")
+    db.session.add(demo)
+    db.session.commit()
+    
+    # Create User
+    owner = User(
+        restaurant_id=demo.id,
+        email="owner@demo.com",
+        password_hash=generate_password_hash("123456"),
+        role="owner"
+    )
+    db.session.add(owner)
+    
+    seed_menu_items(demo)
+    db.session.commit()
+    print("Database seeded with initial data.")
+
+def seed_menu_items(restaurant):
+    cats = ["Başlangıçlar", "Ana Yemekler", "İçecekler"]
+    for idx, name in enumerate(cats):
+        c = Category(restaurant_id=restaurant.id, name=name, sort_order=idx+1)
+        db.session.add(c)
+        db.session.flush() # get ID
+        
+        # Add 2 items
+        for i in range(1, 3):
+            item = MenuItem(
+                restaurant_id=restaurant.id,
+                category_id=c.id,
+                name=f"{name} Ürün {i}",
+                description=f"Lezzetli {name.lower()} {i}",
+                price=100.0 * (idx + 1) + (i * 10),
+                sort_order=i,
+                image_url="https://images.unsplash.com/photo-1546069901-ba9599a7e63c?w=500&q=80"
+            )
+            db.session.add(item)
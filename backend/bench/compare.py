@@ -0,0 +1,66 @@
+"""
+Compare two bench.load reports and flag regressions.
+
+    python -m bench.compare baseline.json candidate.json [--threshold 10]
+
+Exits 1 if any scenario's p95 latency or SQL statements per request grew
+by more than --threshold percent, or its throughput dropped by more.
+"""
+import argparse
+import json
+import sys
+
+
+def _pct(old, new):
+    if not old or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(baseline, candidate, threshold):
+    rows, regressions = [], []
+    names = sorted(set(baseline["scenarios"]) & set(candidate["scenarios"])) + ["overall"]
+    for name in names:
+        old = baseline["overall"] if name == "overall" else baseline["scenarios"][name]
+        new = candidate["overall"] if name == "overall" else candidate["scenarios"][name]
+        metrics = {
+            "p95_ms": (old["latency"]["p95_ms"], new["latency"]["p95_ms"], 1),
+            "p99_ms": (old["latency"]["p99_ms"], new["latency"]["p99_ms"], 1),
+            "rps": (old["throughput_rps"], new["throughput_rps"], -1),
+            "sql": ((old["sql_per_request"] or {}).get("mean"), (new["sql_per_request"] or {}).get("mean"), 1),
+        }
+        for metric, (before, after, direction) in metrics.items():
+            change = _pct(before, after)
+            rows.append((name, metric, before, after, change))
+            # p99 is too noisy to gate on; it is reported only
+            if change is not None and metric != "p99_ms" and change * direction > threshold:
+                regressions.append(f"{name} {metric}: {before} -> {after} ({change:+.1f}%)")
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    for name, metric, before, after, change in rows:
+        delta = f"{change:+7.1f}%" if change is not None else "      -"
+        print(f"{name:14s} {metric:7s} {before if before is not None else '-':>10} "
+              f"{after if after is not None else '-':>10} {delta}")
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
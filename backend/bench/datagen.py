@@ -0,0 +1,165 @@
+"""
+Synthetic tenant generator for load tests. Writes straight to the tables
+with batched Core inserts (no ORM objects), so large datasets load in
+minutes:
+
+    DATABASE_URL=postgresql://... python -m bench.datagen --reset \\
+        --restaurants 1000 --items 50 --orders 1000000
+
+Output is deterministic for a given --seed. Restaurants are `bench-<n>`,
+owners `owner<n>@bench.local` / password `bench`. Sales rollups are rebuilt
+at the end so /api/admin/reports has data.
+"""
+import argparse
+import random
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from werkzeug.security import generate_password_hash
+from app.factory import create_app
+from app.database import db
+from app.seed import init_db
+from app.models.models import Restaurant, User, Table, Category, MenuItem, Order, OrderItem
+from app.core.reports import rebuild_rollups
+
+BATCH = 5000
+CATEGORY_NAMES = ["Başlangıçlar", "Çorbalar", "Ana Yemekler", "Izgaralar", "Tatlılar", "İçecekler", "Kahveler"]
+# Older orders are all finished; only the last hour still moves through the kitchen
+OPEN_STATUSES = ["PENDING", "ACCEPTED", "PREPARING", "READY"]
+
+
+class Writer:
+    """
+    Buffers rows per table and flushes them as executemany batches. Tables
+    are written in foreign key order: a full buffer first flushes the
+    tables it may reference, so rows never precede their parents.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, model, row):
+        table = model.__table__
+        buf = self.buffers.setdefault(table, [])
+        buf.append(row)
+        if len(buf) >= BATCH:
+            self.flush(table)
+
+    def flush(self, upto=None):
+        """Write the buffered rows parents first, stopping after `upto` if given."""
+        for t in db.metadata.sorted_tables:
+            rows = self.buffers.get(t)
+            if rows:
+                self.conn.execute(t.insert(), rows)
+                self.counts[t.name] = self.counts.get(t.name, 0) + len(rows)
+                self.buffers[t] = []
+            if t is upto:
+                break
+
+
+def generate(conn, restaurants, items, tables, orders, days, seed):
+    rng = random.Random(seed)
+    out = Writer(conn)
+    password_hash = generate_password_hash("bench")  # hashing per user would dominate the run
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    # Explicit ids let order lines reference orders without a round trip
+    menu = {}  # restaurant_id -> [(item_id, price)]
+    item_id = category_id = table_id = 0
+    for r in range(1, restaurants + 1):
+        out.add(Restaurant, {"id": r, "name": f"Bench Restaurant {r}", "slug": f"bench-{r}",
+                             "theme_color": "#e11d48", "menu_version": 1})
+        out.add(User, {"id": r, "restaurant_id": r, "email": f"owner{r}@bench.local",
+                       "password_hash": password_hash, "role": "owner"})
+        for t in range(1, tables + 1):
+            table_id += 1
+            out.add(Table, {"id": table_id, "restaurant_id": r, "name": f"Masa {t}",
+                            "token": secrets.token_hex(8), "is_active": True})
+
+        category_ids = []
+        for sort_order, name in enumerate(CATEGORY_NAMES[:max(1, min(len(CATEGORY_NAMES), items // 6))], start=1):
+            category_id += 1
+            category_ids.append(category_id)
+            out.add(Category, {"id": category_id, "restaurant_id": r, "name": name,
+                               "sort_order": sort_order, "is_active": True})
+
+        menu[r] = []
+        for n in range(items):
+            item_id += 1
+            price = float(rng.randrange(40, 900, 5))
+            menu[r].append((item_id, price))
+            out.add(MenuItem, {
+                "id": item_id, "restaurant_id": r, "category_id": category_ids[n % len(category_ids)],
+                "name": f"Ürün {n + 1}", "description": "Synthetic benchmark item with a short description.",
+                "price": price, "currency": "TRY", "image_url": None,
+                "sort_order": n, "is_active": rng.random() > 0.05,
+            })
+
+    # Skewed traffic: a few busy restaurants take most orders
+    weights = [1 / rank for rank in range(1, restaurants + 1)]
+    order_restaurants = rng.choices(range(1, restaurants + 1), weights=weights, k=orders)
+    line_id = 0
+    span = days * 86400
+    for order_id, r in enumerate(order_restaurants, start=1):
+        created_at = now - timedelta(seconds=rng.random() * span)
+        recent = (now - created_at).total_seconds() < 3600
+        status = rng.choice(OPEN_STATUSES) if recent else ("CANCELLED" if rng.random() < 0.03 else "SERVED")
+        lines = [(menu_item_id, price, rng.randint(1, 3))
+                 for menu_item_id, price in rng.sample(menu[r], k=min(len(menu[r]), rng.randint(1, 4)))]
+        out.add(Order, {"id": order_id, "restaurant_id": r, "table_number": rng.randint(1, max(tables, 1)),
+                        "status": status, "total_amount": sum(price * qty for _, price, qty in lines),
+                        "note": "", "created_at": created_at, "revision": 1})
+        for menu_item_id, price, qty in lines:
+            line_id += 1
+            out.add(OrderItem, {"id": line_id, "order_id": order_id, "menu_item_id": menu_item_id,
+                                "quantity": qty, "unit_price": price, "line_total": price * qty})
+
+    out.flush()
+    return out.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=50)
+    parser.add_argument("--items", type=int, default=50, help="Menu items per restaurant")
+    parser.add_argument("--tables", type=int, default=10, help="Tables per restaurant")
+    parser.add_argument("--orders", type=int, default=20000, help="Orders in total")
+    parser.add_argument("--days", type=int, default=90, help="Spread orders over this many days")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="Drop all tables first")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+    init_db(app, seed=False)
+
+    with app.app_context():
+        if db.session.query(Restaurant.id).first() is not None:
+            parser.error("database is not empty; use --reset")
+        db.session.remove()
+
+        started = time.perf_counter()
+        with db.engine.begin() as conn:
+            counts = generate(conn, args.restaurants, args.items, args.tables, args.orders, args.days, args.seed)
+        with db.engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # Explicit ids leave the sequences behind
+                for table in ("restaurant", "user", "table", "category", "menu_item", "order", "order_item"):
+                    conn.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM \"{table}\"))"
+                    )
+            rebuild_rollups(conn)
+        elapsed = time.perf_counter() - started
+
+    for table, count in sorted(counts.items()):
+        print(f"{table:12s} {count:>10,d}")
+    print(f"Generated in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Load test driving the real app through scenario mixes.
+
+    python -m bench.datagen --reset                     # once
+    python -m bench.load --mix mixed --requests 5000 --concurrency 8 --json before.json
+    python -m bench.load --server --workers 4 --mix scan --duration 30 --json scan.json
+    python -m bench.compare before.json after.json
+
+Default mode calls the app in-process through Flask test clients (one per
+thread) and counts SQL statements per request. --server starts gunicorn
+(gunicorn.conf.py, --workers processes) on a free port and drives it over
+HTTP, or targets an already running server with --url. Both modes use the
+database in DATABASE_URL, which must hold bench.datagen data.
+
+All simulated customers share one IP, so rate limits are switched off unless
+--rate-limits is given (a server started with --url keeps its own settings).
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+from sqlalchemy import select
+from flask_jwt_extended import create_access_token
+from app.factory import create_app
+from app.database import db
+from app.core.querylog import query_log
+from app.models.models import Restaurant, User, MenuItem
+from bench.common import BACKEND_DIR, latency_summary, environment, write_report
+
+MIXES = {
+    # Customers scanning QR codes
+    "scan": {"menu_scan": 1},
+    "orders": {"place_order": 1},
+    "kitchen": {"kitchen_poll": 1},
+    "admin": {"admin_edit": 1},
+    # Dinner rush: mostly scans, a steady order stream, kitchens polling, a few edits
+    "mixed": {"menu_scan": 70, "place_order": 15, "kitchen_poll": 12, "admin_edit": 3},
+}
+
+
+# --- Fixture ---
+
+def load_fixture(app, tenants, seed):
+    """Restaurants, owner tokens and active item ids for up to `tenants` bench restaurants."""
+    with app.app_context():
+        restaurants = db.session.execute(
+            select(Restaurant.id, Restaurant.slug).where(Restaurant.slug.like("bench-%"))
+            .order_by(Restaurant.id).limit(tenants)
+        ).all()
+        if not restaurants:
+            sys.exit("No bench restaurants found; run `python -m bench.datagen` first.")
+        ids = [r.id for r in restaurants]
+        owners = dict(db.session.execute(
+            select(User.restaurant_id, User.id).where(User.restaurant_id.in_(ids), User.role == "owner")
+        ).all())
+        items = defaultdict(list)
+        for restaurant_id, item_id, price in db.session.execute(
+            select(MenuItem.restaurant_id, MenuItem.id, MenuItem.price)
+            .where(MenuItem.restaurant_id.in_(ids), MenuItem.is_active.is_(True))
+        ):
+            items[restaurant_id].append((item_id, price))
+        tokens = {rid: create_access_token(identity=str(uid)) for rid, uid in owners.items()}
+
+    tenants = [
+        {"id": r.id, "slug": r.slug, "token": tokens[r.id], "items": items[r.id]}
+        for r in restaurants if r.id in tokens and items[r.id]
+    ]
+    # Same skew as the generated order history: low ids are the busy tenants
+    return tenants, [1 / rank for rank in range(1, len(tenants) + 1)]
+
+
+# --- Scenarios: each returns (method, path, json_body, headers) ---
+
+def menu_scan(tenant, rng):
+    return "GET", f"/api/public/restaurants/{tenant['slug']}/menu", None, {}
+
+
+def place_order(tenant, rng):
+    lines = rng.sample(tenant["items"], k=min(len(tenant["items"]), rng.randint(1, 4)))
+    return "POST", "/api/public/orders", {
+        "restaurantSlug": tenant["slug"],
+        "tableNumber": rng.randint(1, 10),
+        "items": [{"menuItemId": item_id, "quantity": rng.randint(1, 3)} for item_id, _ in lines],
+        "note": "",
+    }, {}
+
+
+def kitchen_poll(tenant, rng):
+    return "GET", "/api/admin/orders?status=PENDING,ACCEPTED,PREPARING&limit=50", None, _auth(tenant)
+
+
+def admin_edit(tenant, rng):
+    item_id, price = rng.choice(tenant["items"])
+    return "PUT", f"/api/admin/items/{item_id}", {"price": round(price * rng.uniform(0.9, 1.1), 2)}, _auth(tenant)
+
+
+def _auth(tenant):
+    return {"Authorization": f"Bearer {tenant['token']}"}
+
+
+SCENARIOS = {f.__name__: f for f in (menu_scan, place_order, kitchen_poll, admin_edit)}
+
+
+# --- Clients ---
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body, headers):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """One keep-alive connection per thread; reconnects if the server closes it."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.conn = None
+
+    def request(self, method, path, body, headers):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = dict(headers, **({"Content-Type": "application/json"} if payload else {}))
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+
+
+# --- Runner ---
+
+def run(make_client, tenants, weights, mix, concurrency, requests, duration, seed, count_sql=False):
+    names = list(mix)
+    mix_weights = [mix[n] for n in names]
+    samples = defaultdict(list)  # scenario -> [(seconds, status, statements)]
+    lock = threading.Lock()
+    remaining = [requests]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        client = make_client()
+        local = defaultdict(list)
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+            name = rng.choices(names, weights=mix_weights)[0]
+            tenant = rng.choices(tenants, weights=weights)[0]
+            method, path, body, headers = SCENARIOS[name](tenant, rng)
+            start = time.perf_counter()
+            try:
+                status = client.request(method, path, body, headers)
+            except Exception:
+                status = 0
+            elapsed = time.perf_counter() - start
+            # query_log counts per thread and resets at request start (in-process only)
+            local[name].append((elapsed, status, query_log.stats()[0] if count_sql else None))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    return samples, wall
+
+
+def summarize(samples, wall):
+    def block(values):
+        statements = [s for _, _, s in values if s is not None]
+        return {
+            "requests": len(values),
+            "errors": sum(1 for _, status, _ in values if status == 0 or status >= 400),
+            "throughput_rps": round(len(values) / wall, 1) if wall else None,
+            "latency": latency_summary([elapsed for elapsed, _, _ in values]),
+            "sql_per_request": {
+                "mean": round(sum(statements) / len(statements), 2),
+                "max": max(statements),
+            } if statements else None,
+        }
+    everything = [v for values in samples.values() for v in values]
+    return {"overall": block(everything), "scenarios": {name: block(v) for name, v in sorted(samples.items())}}
+
+
+# --- Server mode ---
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, rate_limits):
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               RATE_LIMIT_ENABLED="1" if rate_limits else "0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    probe = HttpClient(url)
+    for _ in range(200):
+        try:
+            if probe.request("GET", "/api/health", None, {}) == 200:
+                return proc, url
+        except OSError:
+            pass
+        if proc.poll() is not None:
+            sys.exit("gunicorn exited during startup")
+        time.sleep(0.05)
+    proc.terminate()
+    sys.exit("gunicorn did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--tenants", type=int, default=100, help="Spread traffic over this many restaurants")
+    parser.add_argument("--warmup", type=int, default=200, help="Untimed requests before measuring")
+    parser.add_argument("--server", action="store_true", help="Drive a real gunicorn server over HTTP")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers with --server")
+    parser.add_argument("--url", help="Use this running server instead of starting one")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep login/order rate limits enabled")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    app = create_app({"RATE_LIMIT_ENABLED": args.rate_limits})
+    tenants, weights = load_fixture(app, args.tenants, args.seed)
+    mix = MIXES[args.mix]
+
+    proc = None
+    if args.server or args.url:
+        url = args.url
+        if not url:
+            proc, url = start_server(args.workers, args.rate_limits)
+        make_client = lambda: HttpClient(url)
+        mode = {"mode": "http", "url": url, "workers": None if args.url else args.workers}
+    else:
+        make_client = lambda: InProcessClient(app)
+        mode = {"mode": "in-process"}
+
+    try:
+        if args.warmup:
+            run(make_client, tenants, weights, mix, args.concurrency, args.warmup, None, args.seed + 1)
+        samples, wall = run(make_client, tenants, weights, mix, args.concurrency,
+                            args.requests, args.duration, args.seed, count_sql=mode["mode"] == "in-process")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    report = {
+        "environment": environment(),
+        "config": dict(mode, mix=args.mix, concurrency=args.concurrency, tenants=len(tenants),
+                       duration_s=round(wall, 3), database=dialect, seed=args.seed),
+        **summarize(samples, wall),
+    }
+
+    print(f"{'scenario':14s} {'reqs':>7s} {'err':>5s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'sql':>5s}")
+    for name, block in list(report["scenarios"].items()) + [("overall", report["overall"])]:
+        lat, sql = block["latency"], block["sql_per_request"]
+        print(f"{name:14s} {block['requests']:7d} {block['errors']:5d} {block['throughput_rps']:8.1f} "
+              f"{lat['p50_ms']:8.2f} {lat['p95_ms']:8.2f} {lat['p99_ms']:8.2f} "
+              f"{(sql['mean'] if sql else float('nan')):5.1f}")
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Full static menu republish (app.core.publish) for many restaurants.
+
+    python -m bench.menu_publish [--restaurants 1000] [--items 40] [--workers 1,2,4,8] [--json publish.json]
+
+Builds a throwaway SQLite database with --restaurants synthetic tenants and
+publishes every menu into a fresh directory once per --workers value
+(cold: render + hash + gzip/brotli + atomic writes). Then, with the last
+worker count, measures a forced republish of unchanged menus (content
+hash hits, nothing re-encoded) and a plain publish where every pointer is
+already current. Thread scaling needs free cores and is bounded by the
+work that holds the GIL (JSON rendering, row handling); zlib compresses
+without it.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="qrmenu-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'publish.db')}"
+
+from app.factory import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.seed import init_db  # noqa: E402
+from app.core.publish import menu_publisher  # noqa: E402
+from bench.common import environment, write_report  # noqa: E402
+from bench.datagen import generate  # noqa: E402
+
+
+def directory_size(path):
+    total = files = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            total += os.path.getsize(os.path.join(root, name))
+            files += 1
+    return files, total
+
+
+def timed_publish(app, directory, force, workers):
+    app.config["MENU_PUBLISH_DIR"] = directory
+    menu_publisher.init_app(app)
+    with app.app_context():
+        start = time.perf_counter()
+        counts = menu_publisher.publish_all(force=force, workers=workers)
+        return time.perf_counter() - start, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma separated thread counts")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    app = create_app({"UPLOAD_FOLDER": os.path.join(_tmp, "uploads"), "SLOW_QUERY_MS": 0})
+    init_db(app, seed=False)
+    with app.app_context(), db.engine.begin() as conn:
+        generate(conn, restaurants=args.restaurants, items=args.items, tables=1, orders=0, days=1, seed=1)
+
+    report = {"environment": environment(), "restaurants": args.restaurants, "items": args.items, "results": {}}
+    print(f"publishing {args.restaurants} menus of {args.items} items ({os.cpu_count()} cpus)")
+    for workers in worker_counts:
+        directory = os.path.join(_tmp, f"menus-{workers}")
+        seconds, counts = timed_publish(app, directory, force=False, workers=workers)
+        files, size = directory_size(directory)
+        report["results"][f"cold_{workers}"] = {
+            "workers": workers, "seconds": round(seconds, 3), "menus_per_s": round(args.restaurants / seconds, 1),
+            "counts": counts, "files": files, "bytes": size,
+        }
+        print(f"  cold      {workers:2d} workers  {seconds:7.2f} s  {args.restaurants / seconds:8.1f} menus/s  "
+              f"{files} files, {size / 1e6:.1f} MB")
+
+    workers = worker_counts[-1]
+    for label, force in (("unchanged", True), ("current", False)):
+        seconds, counts = timed_publish(app, directory, force=force, workers=workers)
+        report["results"][label] = {"workers": workers, "seconds": round(seconds, 3), "counts": counts,
+                                    "menus_per_s": round(args.restaurants / seconds, 1)}
+        print(f"  {label:9s} {workers:2d} workers  {seconds:7.2f} s  {args.restaurants / seconds:8.1f} menus/s")
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Before/after cost of the menu read path on a large menu.
+
+    python -m bench.menu_read [--items 500] [--runs 200] [--json menu_read.json]
+
+Builds a throwaway SQLite database with one restaurant and --items menu
+items, then times, per variant, building the payload plus serializing it:
+
+  orm          ORM entities + joinedload, stdlib json (the previous code)
+  core         column-level select() rows, stdlib json
+  core+orjson  column-level select() rows, FastJSONProvider
+
+for the public menu (a cache miss) and the admin item list.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="qrmenu-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'menu.db')}"
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+from app.factory import create_app  # noqa: E402
+from app.database import db, fetch_dicts  # noqa: E402
+from app.seed import init_db  # noqa: E402
+from app.models.models import Category, MenuItem  # noqa: E402
+from app.core.menu_cache import build_menu_payload  # noqa: E402
+from app.core.json_provider import FastJSONProvider, orjson  # noqa: E402
+from app.core.images import variant_urls, srcset  # noqa: E402
+from bench.common import latency_summary, environment, write_report  # noqa: E402
+from bench.datagen import generate  # noqa: E402
+
+ITEM_COLUMNS = (
+    MenuItem.id, MenuItem.category_id, MenuItem.name, MenuItem.price, MenuItem.currency,
+    MenuItem.description, MenuItem.image_url, MenuItem.is_active, MenuItem.sort_order,
+)
+
+
+# --- Previous implementations, kept here as the baseline ---
+
+def orm_menu_payload(restaurant_id):
+    from app.models.models import Restaurant
+    restaurant = db.session.get(Restaurant, restaurant_id)
+    categories = Category.query.filter_by(
+        restaurant_id=restaurant.id, is_active=True
+    ).order_by(Category.sort_order).options(joinedload(Category.items)).all()
+    response_categories = []
+    for cat in categories:
+        items = [
+            {"id": i.id, "name": i.name, "description": i.description, "price": i.price,
+             "currency": i.currency, "image_url": i.image_url, "sort_order": i.sort_order}
+            for i in cat.items if i.is_active
+        ]
+        for item in items:
+            variants = variant_urls(item["image_url"])
+            if variants:
+                item["image_variants"] = variants
+                item["image_srcset"] = srcset(variants)
+        items.sort(key=lambda x: (x["sort_order"], x["id"]))
+        response_categories.append({"id": cat.id, "name": cat.name, "items": items})
+    return {"restaurant_name": restaurant.name, "slug": restaurant.slug, "categories": response_categories}
+
+
+def orm_item_list(restaurant_id):
+    items = MenuItem.query.filter_by(restaurant_id=restaurant_id).order_by(MenuItem.sort_order).all()
+    return [{
+        "id": i.id, "category_id": i.category_id, "name": i.name,
+        "price": i.price, "currency": i.currency, "description": i.description,
+        "image_url": i.image_url, "is_active": i.is_active, "sort_order": i.sort_order
+    } for i in items]
+
+
+def core_item_list(restaurant_id):
+    # Same statement as admin.list_items
+    return fetch_dicts(
+        select(*ITEM_COLUMNS).where(MenuItem.restaurant_id == restaurant_id).order_by(MenuItem.sort_order)
+    )
+
+
+def time_variant(app, build, provider, runs):
+    samples = []
+    with app.app_context():
+        for i in range(runs + 10):
+            db.session.expire_all()  # every run is a cache miss, as after a menu edit
+            start = time.perf_counter()
+            provider.dumps(build(1), separators=(",", ":"))
+            if i >= 10:  # first runs warm statement caches
+                samples.append(time.perf_counter() - start)
+            db.session.remove()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    app = create_app({"UPLOAD_FOLDER": os.path.join(_tmp, "uploads")})
+    init_db(app, seed=False)
+    with app.app_context(), db.engine.begin() as conn:
+        generate(conn, restaurants=1, items=args.items, tables=1, orders=0, days=1, seed=1)
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app) if orjson is not None else None
+    variants = {
+        "menu": [("orm", orm_menu_payload, stdlib), ("core", build_menu_payload, stdlib)],
+        "admin_items": [("orm", orm_item_list, stdlib), ("core", core_item_list, stdlib)],
+    }
+    if fast:
+        variants["menu"].append(("core+orjson", build_menu_payload, fast))
+        variants["admin_items"].append(("core+orjson", core_item_list, fast))
+
+    report = {"environment": environment(), "items": args.items, "runs": args.runs, "results": {}}
+    for endpoint, runs in variants.items():
+        results = report["results"][endpoint] = {}
+        for name, build, provider in runs:
+            results[name] = latency_summary(time_variant(app, build, provider, args.runs))
+        baseline = results["orm"]["p50_ms"]
+        print(f"{endpoint} ({args.items} items)")
+        for name, lat in results.items():
+            print(f"  {name:12s} p50 {lat['p50_ms']:7.2f} ms  p95 {lat['p95_ms']:7.2f} ms  "
+                  f"x{baseline / lat['p50_ms']:.2f}")
+    if not fast:
+        print("orjson not installed: core+orjson skipped")
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Menu search on a large menu: in-memory index vs a LIKE scan.
+
+    python -m bench.menu_search [--items 400] [--runs 2000] [--json search.json]
+
+Builds a throwaway SQLite database with one restaurant and --items menu
+items named from Turkish menu words, then times:
+
+  like         lower(name/description) LIKE '%q%' per query (what per-keystroke
+               filtering in SQL would cost); SQLite lower() only folds ASCII,
+               so its hit counts show what it misses
+  index        MenuIndex.search on a built index
+  build        full index build from the menu payload (first search)
+  update       incremental update after one item is renamed
+  endpoint     GET /api/public/restaurants/<slug>/search through the test client
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="qrmenu-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'search.db')}"
+
+from sqlalchemy import select, update, func, or_, bindparam  # noqa: E402
+from app.factory import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.seed import init_db  # noqa: E402
+from app.models.models import MenuItem  # noqa: E402
+from app.core.menu_cache import build_menu_payload  # noqa: E402
+from app.core.search import MenuIndex  # noqa: E402
+from bench.common import latency_summary, environment, write_report  # noqa: E402
+from bench.datagen import generate  # noqa: E402
+
+SLUG = "bench-1"
+WORDS = [
+    "Çay", "Türk", "Kahvesi", "Sütlü", "Buzlu", "Latte", "Şekersiz", "Ihlamur", "Işık", "İrmik",
+    "Ayran", "Şalgam", "Limonata", "Çilekli", "Vişneli", "Nar", "Portakal", "Sıcak", "Soğuk", "Çikolata",
+    "Fıstıklı", "Karamel", "Vanilyalı", "Tarçınlı", "Kıymalı", "Peynirli", "Ispanaklı", "Güllaç", "Künefe",
+    "Şiş", "Köfte", "Döner", "Mantı", "Çorba", "Mercimek", "Ezogelin", "Börek", "Gözleme", "Pide", "Lahmacun",
+]
+QUERIES = ["çay", "CAY", "sutlu", "Şeker", "ısp", "IHLAMUR", "irmik", "kıymalı pey", "fist", "KÜNEFE",
+           "c", "ko", "sicak cik", "nar", "latte buz"]
+
+
+def seed(app, items):
+    rng = random.Random(7)
+    with app.app_context(), db.engine.begin() as conn:
+        generate(conn, restaurants=1, items=items, tables=1, orders=0, days=1, seed=1)
+        ids = conn.execute(select(MenuItem.id)).scalars().all()
+        conn.execute(
+            update(MenuItem).where(MenuItem.id == bindparam("item_id"))
+            .values(name=bindparam("new_name"), description=bindparam("new_description"), is_active=True),
+            [{"item_id": i, "new_name": " ".join(rng.sample(WORDS, 3)),
+              "new_description": " ".join(rng.sample(WORDS, 6)).lower()} for i in ids],
+        )
+
+
+def like_search(query):
+    clauses = []
+    for word in query.lower().split():
+        pattern = f"%{word}%"
+        clauses.append(or_(func.lower(MenuItem.name).like(pattern), func.lower(MenuItem.description).like(pattern)))
+    return db.session.execute(
+        select(MenuItem.id, MenuItem.name).where(MenuItem.restaurant_id == 1, MenuItem.is_active.is_(True), *clauses)
+        .order_by(MenuItem.sort_order).limit(20)
+    ).all(), db.session.execute(
+        select(func.count(MenuItem.id)).where(MenuItem.restaurant_id == 1, MenuItem.is_active.is_(True), *clauses)
+    ).scalar()
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    app = create_app({"UPLOAD_FOLDER": os.path.join(_tmp, "uploads"), "RATE_LIMIT_ENABLED": False,
+                      "SLOW_QUERY_MS": 0})
+    init_db(app, seed=False)
+    seed(app, args.items)
+
+    report = {"environment": environment(), "items": args.items, "runs": args.runs, "results": {}, "hits": {}}
+    results = report["results"]
+    rng = random.Random(1)
+    with app.app_context():
+        payload = build_menu_payload(1)
+        index = MenuIndex.build(1, payload)
+        for query in QUERIES:
+            report["hits"][query] = {"index": index.search(query, 20)[0], "like": like_search(query)[1]}
+
+        results["like"] = latency_summary(timed(lambda: like_search(rng.choice(QUERIES)), args.runs // 10))
+        results["index"] = latency_summary(timed(lambda: index.search(rng.choice(QUERIES), 20), args.runs))
+        results["build"] = latency_summary(timed(lambda: MenuIndex.build(1, payload), max(10, args.runs // 100)))
+
+        def renamed():
+            changed = {**payload, "categories": [dict(c, items=list(c["items"])) for c in payload["categories"]]}
+            first = changed["categories"][0]["items"]
+            first[0] = dict(first[0], name=" ".join(rng.sample(WORDS, 3)))
+            return changed
+        variants = [renamed() for _ in range(max(10, args.runs // 100))]
+        results["update"] = latency_summary(timed(lambda: index.update(2, variants.pop()), len(variants)))
+
+    client = app.test_client()
+    client.get(f"/api/public/restaurants/{SLUG}/search?q=warm")
+    results["endpoint"] = latency_summary(timed(
+        lambda: client.get(f"/api/public/restaurants/{SLUG}/search", query_string={"q": rng.choice(QUERIES)}),
+        args.runs // 4,
+    ))
+
+    print(f"menu search ({args.items} items)")
+    for name, lat in results.items():
+        print(f"  {name:9s} p50 {lat['p50_ms']:8.3f} ms  p99 {lat['p99_ms']:8.3f} ms")
+    print("  hits (index / like): " + ", ".join(
+        f"{q!r} {h['index']}/{h['like']}" for q, h in report["hits"].items()))
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
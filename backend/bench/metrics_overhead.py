@@ -0,0 +1,93 @@
+"""
+Cost of request instrumentation on the public menu endpoint.
+
+    python -m bench.metrics_overhead --requests 5000 [--json overhead.json]
+
+Builds the app with METRICS_ENABLED against DATABASE_URL and times
+get_menu in interleaved rounds on one thread, with the metrics request
+hooks attached and detached in turn (one app per process, see
+create_app), so both variants see the same cache and machine state. Menu responses come from the snapshot
+cache, making this the worst case: the fixed per-request overhead is
+compared against the fastest request the app serves.
+"""
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import select
+from app.factory import create_app
+from app.database import db
+from app.models.models import Restaurant
+from app.core.metrics import metrics
+from bench.common import latency_summary, environment, write_report
+
+ROUNDS = 10
+_hook_slots = {}  # metrics hook -> its index in the app's hook list
+
+
+def first_slug(app):
+    with app.app_context():
+        slug = db.session.execute(select(Restaurant.slug).order_by(Restaurant.id)).scalars().first()
+    if slug is None:
+        raise SystemExit("No restaurant in the database; run `flask db init` or bench.datagen first.")
+    return slug
+
+
+def instrument(app, enabled):
+    """Attach or detach the metrics request hooks, keeping their place among the others."""
+    for hooks, hook in ((app.before_request_funcs[None], metrics._before_request),
+                        (app.after_request_funcs[None], metrics._after_request)):
+        if hook in hooks:
+            _hook_slots[hook] = hooks.index(hook)
+            hooks.remove(hook)
+        if enabled:
+            hooks.insert(_hook_slots[hook], hook)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per variant")
+    parser.add_argument("--multiprocess", action="store_true",
+                        help="Use prometheus multiprocess (mmap file) values, as under gunicorn")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+    if args.multiprocess:
+        os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="bench-metrics-"))
+
+    app = create_app({"METRICS_ENABLED": True})
+    path = f"/api/public/restaurants/{first_slug(app)}/menu"
+    client = app.test_client()
+    for _ in range(100):  # fill the menu cache and warm up
+        client.get(path)
+
+    samples = {"off": [], "on": []}
+    per_round = max(1, args.requests // ROUNDS)
+    for _ in range(ROUNDS):
+        for name in samples:
+            instrument(app, name == "on")
+            for _ in range(per_round):
+                start = time.perf_counter()
+                client.get(path).get_data()
+                samples[name].append(time.perf_counter() - start)
+
+    report = {
+        "environment": environment(),
+        "endpoint": path,
+        "multiprocess": bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR")),
+        "off": latency_summary(samples["off"]),
+        "on": latency_summary(samples["on"]),
+    }
+    overhead_us = (report["on"]["p50_ms"] - report["off"]["p50_ms"]) * 1000
+    report["overhead_p50_us"] = round(overhead_us, 1)
+    report["overhead_p50_pct"] = round(overhead_us / (report["off"]["p50_ms"] * 1000) * 100, 1)
+
+    for name in ("off", "on"):
+        lat = report[name]
+        print(f"metrics {name:3s}  p50 {lat['p50_ms']:.3f} ms  p95 {lat['p95_ms']:.3f} ms  p99 {lat['p99_ms']:.3f} ms")
+    print(f"overhead    p50 {report['overhead_p50_us']:+.1f} us ({report['overhead_p50_pct']:+.1f}%)")
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
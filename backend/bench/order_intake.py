@@ -0,0 +1,126 @@
+"""
+Order placement under a burst: synchronous writes vs ORDER_INTAKE.
+
+    python -m bench.order_intake [--orders 2000] [--concurrency 16] [--json intake.json]
+
+Builds a throwaway SQLite database with the demo menu and places --orders
+orders from --concurrency threads (in-process test clients), once per
+mode. Reports request latency and throughput, errors, and for the intake
+mode how long the background writer took to get every order into the
+database.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.mkdtemp(prefix="qrmenu-bench-")
+
+from sqlalchemy import select, func  # noqa: E402
+from app.factory import create_app, release_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.seed import init_db  # noqa: E402
+from app.models.models import MenuItem, Order  # noqa: E402
+from app.core.intake import order_intake  # noqa: E402
+from bench.common import latency_summary, environment, write_report  # noqa: E402
+
+SLUG = "demo-restoran"
+
+
+def build_app(mode):
+    path = os.path.join(_tmp, f"{mode}.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    app = create_app({
+        "UPLOAD_FOLDER": os.path.join(_tmp, "uploads"),
+        "RATE_LIMIT_ENABLED": False,
+        "ORDER_INTAKE": mode == "intake",
+        "ORDER_INTAKE_DIR": os.path.join(_tmp, f"{mode}-intake"),
+        "ORDER_INTAKE_MAX_PENDING": 100000,
+        "SLOW_QUERY_MS": 0,  # lock waits would flood the log
+    })
+    init_db(app)
+    return app
+
+
+def order_count(app):
+    with app.app_context():
+        return db.session.execute(select(func.count(Order.id))).scalar()
+
+
+def run(app, orders, concurrency):
+    with app.app_context():
+        item_ids = db.session.execute(select(MenuItem.id)).scalars().all()
+    samples, statuses = [], []
+    lock = threading.Lock()
+    remaining = [orders]
+
+    def worker(index):
+        rng = random.Random(index)
+        client = app.test_client()
+        local, codes = [], []
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            body = {
+                "restaurantSlug": SLUG,
+                "tableNumber": rng.randint(1, 20),
+                "items": [{"menuItemId": i, "quantity": rng.randint(1, 3)} for i in rng.sample(item_ids, 3)],
+            }
+            start = time.perf_counter()
+            response = client.post("/api/public/orders", json=body)
+            local.append(time.perf_counter() - start)
+            codes.append(response.status_code)
+        with lock:
+            samples.extend(local)
+            statuses.extend(codes)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    accepted = sum(1 for s in statuses if s in (201, 202))
+    # Intake mode: wait for the writer to catch up
+    while order_count(app) < accepted and order_intake.stats()["pending"]:
+        time.sleep(0.01)
+    settled = time.perf_counter() - started
+    return {
+        "requests": len(statuses),
+        "accepted": accepted,
+        "errors": len(statuses) - accepted,
+        "throughput_rps": round(len(statuses) / wall, 1),
+        "latency": latency_summary(samples),
+        "all_written_s": round(settled, 3),
+        "orders_in_db": order_count(app),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "orders": args.orders, "concurrency": args.concurrency, "results": {}}
+    for mode in ("sync", "intake"):
+        app = build_app(mode)
+        report["results"][mode] = result = run(app, args.orders, args.concurrency)
+        release_app(app)
+        lat = result["latency"]
+        print(f"{mode:7s} {result['throughput_rps']:8.1f} req/s  p50 {lat['p50_ms']:7.2f} ms  "
+              f"p95 {lat['p95_ms']:7.2f} ms  p99 {lat['p99_ms']:7.2f} ms  errors {result['errors']}  "
+              f"in db {result['orders_in_db']} after {result['all_written_s']:.2f} s")
+    if args.json:
+        write_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
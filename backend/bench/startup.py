@@ -0,0 +1,59 @@
+"""
+Cold-start benchmark: how long a fresh process (a scaled-from-zero Render
+instance, a new gunicorn worker, a one-off script) takes to import the app
+and answer its first request.
+
+    python -m bench.startup --runs 20 [--json results.json]
+
+Each run is a new interpreter, so nothing is shared between samples.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from bench.common import BACKEND_DIR, percentile, environment, write_report
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+response = app.test_client().get("/api/health")
+t2 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({"import": t1 - t0, "first_request": t2 - t1, "total": t2 - t0}))
+"""
+
+
+def run(runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    report = {"runs": runs, "environment": environment()}
+    for key in ("import", "first_request", "total"):
+        values = [s[key] * 1000 for s in samples]
+        report[key] = {
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "max_ms": round(max(values), 2),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.runs)
+    for key in ("import", "first_request", "total"):
+        print(f"{key:14s} p50 {report[key]['p50_ms']:8.2f} ms   p95 {report[key]['p95_ms']:8.2f} ms")
+    if args.json:
+        write_report(report, args.json)
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+from sqlalchemy import select, tuple_, and_
+from app.main import app
+from app.database import db
+from app.models.models import Category, MenuItem, Order, OrderItem, Table, SalesHourly, ItemSalesDaily
+
+# (label, statement, index expected in the plan; None = any index)
+HOT_QUERIES = [
+    ("public menu categories",
+     select(Category.id, MenuItem.id)
+     .outerjoin(MenuItem, and_(MenuItem.category_id == Category.id, MenuItem.is_active.is_(True)))
+     .where(Category.restaurant_id == 1, Category.is_active.is_(True))
+     .order_by(Category.sort_order, Category.id, MenuItem.sort_order, MenuItem.id),
+     "ix_category_restaurant_sort"),
+    ("category items",
+     select(MenuItem).where(MenuItem.category_id == 1),
+     "ix_menu_item_category"),
+    ("admin item list",
+     select(MenuItem).where(MenuItem.restaurant_id == 1, MenuItem.category_id == 1).order_by(MenuItem.sort_order),
+     "ix_menu_item_restaurant_category_sort"),
+    ("kitchen feed by status",
+     select(Order).where(Order.restaurant_id == 1, Order.status == "PENDING")
+     .order_by(Order.created_at.desc()),
+     "ix_order_restaurant_status_created"),
+    ("order feed page",
+     select(Order).where(Order.restaurant_id == 1,
+                         tuple_(Order.created_at, Order.id) < (datetime(2030, 1, 1), 10 ** 9))
+     .order_by(Order.created_at.desc(), Order.id.desc()).limit(51),
+     "ix_order_restaurant_created"),
+    ("table tracking",
+     select(Order).where(Order.table_id == 1, Order.status.in_(["PENDING", "READY"]),
+                         Order.created_at >= datetime(2026, 1, 1)),
+     "ix_order_table_created"),
+    ("order lines",
+     select(OrderItem).where(OrderItem.order_id.in_([1, 2, 3])),
+     "ix_order_item_order"),
+    ("restaurant tables",
+     select(Table).where(Table.restaurant_id == 1),
+     "ix_table_restaurant"),
+    ("table by QR token",
+     select(Table).where(Table.token == "abcd1234"),
+     None),
+    ("sales report series",
+     select(SalesHourly).where(SalesHourly.restaurant_id == 1,
+                               SalesHourly.hour >= datetime(2026, 1, 1), SalesHourly.hour < datetime(2026, 2, 1)),
+     None),
+    ("sales report top items",
+     select(ItemSalesDaily).where(ItemSalesDaily.restaurant_id == 1,
+                                  ItemSalesDaily.day >= date(2026, 1, 1), ItemSalesDaily.day < date(2026, 2, 1)),
+     None),
+]
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+        return "\n".join(r[-1] for r in rows)
+    # Tiny dev tables make Postgres prefer seq scans; ask whether an index *can* serve the query
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return "\n".join(r[0] for r in conn.exec_driver_sql("EXPLAIN " + sql).all())
+
+
+def check_indexes():
+    failures = 0
+    with app.app_context(), db.engine.begin() as conn:
+        print(f"Checking query plans on {conn.dialect.name}...")
+        for label, stmt, index in HOT_QUERIES:
+            plan = explain(conn, stmt)
+            ok = index in plan if index else "INDEX" in plan.upper()
+            print(f"[{'OK' if ok else 'SCAN'}] {label}" + ("" if ok else f"\n     {plan}"))
+            failures += not ok
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if check_indexes() else 0)
@@ -0,0 +1,113 @@
+"""
+Statement budgets for the hot endpoints.
+
+    python check_query_budgets.py
+
+Builds a throwaway SQLite database with the demo data, calls each endpoint
+through the test client inside query_budget() and exits 1 if any of them
+issues more SQL statements than declared. Lower a budget when an endpoint
+gets cheaper; raising one should come with a reason in the commit.
+
+A budget may be a pair (own, rollups): statements touching the sales
+rollup tables are then counted against `rollups` and the rest against
+`own`, so the order write keeps its own budget of three.
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="qrmenu-budgets-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'budgets.db')}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app.factory import create_app  # noqa: E402
+from app.seed import init_db  # noqa: E402
+from app.database import db  # noqa: E402
+from app.models.models import User, MenuItem, Table, SalesHourly, ItemSalesDaily  # noqa: E402
+from app.core.querylog import query_budget, QueryBudgetExceeded  # noqa: E402
+
+SLUG = "demo-restoran"
+TABLE_TOKEN = "budget01"
+ROLLUP_TABLES = (SalesHourly.__tablename__, ItemSalesDaily.__tablename__)
+
+
+def check_query_budgets():
+    app = create_app({"UPLOAD_FOLDER": os.path.join(_tmp, "uploads")})
+    init_db(app)
+    with app.app_context():
+        owner = db.session.execute(db.select(User).filter_by(email="owner@demo.com")).scalar_one()
+        token = create_access_token(identity=str(owner.id))
+        item_ids = db.session.execute(db.select(MenuItem.id).limit(3)).scalars().all()
+        db.session.add(Table(restaurant_id=owner.restaurant_id, name="Masa 4", token=TABLE_TOKEN))
+        db.session.commit()
+    auth = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+
+    order = {"restaurantSlug": SLUG, "tableNumber": 4, "tableToken": TABLE_TOKEN,
+             "items": [{"menuItemId": item_id, "quantity": 2} for item_id in item_ids]}
+    # Warm the identity cache so budgets below measure the endpoints, not auth
+    client.get("/api/admin/ping", headers=auth)
+
+    # (label, budget, method, path, json, headers); run in order, state carries over.
+    # json may be a callable taking that state.
+    checks = [
+        ("public menu, cold cache", 2, "GET", f"/api/public/restaurants/{SLUG}/menu", None, {}),
+        ("public menu, cached", 1, "GET", f"/api/public/restaurants/{SLUG}/menu", None, {}),
+        ("menu search, cold index", 2, "GET", f"/api/public/restaurants/{SLUG}/search?q=URUN", None, {}),
+        ("menu search, cached index", 1, "GET", f"/api/public/restaurants/{SLUG}/search?q=ur", None, {}),
+        # Menu/table lookup, order insert, lines insert; plus the hourly and
+        # per-item rollup upserts that sales reports added
+        ("place order", (3, 2), "POST", "/api/public/orders", order, {}),
+        ("table orders", 1, "GET", f"/api/public/restaurants/{SLUG}/tables/{TABLE_TOKEN}/orders", None, {}),
+        ("table orders, unchanged", 1, "GET", f"/api/public/restaurants/{SLUG}/tables/{TABLE_TOKEN}/orders",
+         None, {"If-None-Match": "{etag}"}),
+        ("table orders, delta", 1, "GET", f"/api/public/restaurants/{SLUG}/tables/{TABLE_TOKEN}/orders?since=0",
+         None, {}),
+        ("order status", 2, "GET", "/api/public/orders/{order_id}", None, {}),
+        ("order status, unchanged", 1, "GET", "/api/public/orders/{order_id}", None, {"If-None-Match": "{etag}"}),
+        ("kitchen feed", 2, "GET", "/api/admin/orders?status=PENDING", None, auth),
+        ("order status change", 2, "PUT", "/api/admin/orders/{order_id}/status", {"status": "ACCEPTED"}, auth),
+        ("bulk status change", 2, "PATCH", "/api/admin/orders",
+         lambda state: [{"id": state["order_id"], "status": "PREPARING"}], auth),
+        # + order lines and the two rollup upserts
+        ("order cancellation", 5, "PUT", "/api/admin/orders/{order_id}/status", {"status": "CANCELLED"}, auth),
+        ("admin categories", 1, "GET", "/api/admin/categories", None, auth),
+        ("admin items", 1, "GET", "/api/admin/items", None, auth),
+        ("sales report", 2, "GET", "/api/admin/reports", None, auth),
+    ]
+
+    state = {}
+    failures = 0
+    print("Checking SQL statement budgets on sqlite...")
+    for label, budget, method, path, body, headers in checks:
+        path = path.format(**state)
+        headers = {k: v.format(**state) for k, v in headers.items()}
+        if callable(body):
+            body = body(state)
+        own_budget, rollup_budget = budget if isinstance(budget, tuple) else (budget, None)
+        try:
+            with query_budget(own_budget + (rollup_budget or 0)) as used:
+                response = client.open(path, method=method, json=body, headers=headers)
+            status = f"[OK]   {label}: {len(used.statements)}/{own_budget}"
+            if rollup_budget is not None:
+                own = [s for s in used.statements if not any(t in s for t in ROLLUP_TABLES)]
+                status = (f"[OK]   {label}: {len(own)}/{own_budget} "
+                          f"+ rollups {len(used.statements) - len(own)}/{rollup_budget}")
+                if len(own) > own_budget:
+                    raise QueryBudgetExceeded(own_budget, own)
+        except QueryBudgetExceeded as exc:
+            failures += 1
+            status = f"[OVER] {label}: {exc}"
+            response = None
+        print(status)
+        if response is not None and response.status_code >= 400:
+            failures += 1
+            print(f"       unexpected HTTP {response.status_code}")
+        if response is not None and method == "POST":
+            state["order_id"] = response.get_json()["orderId"]
+        if response is not None and response.headers.get("ETag"):
+            state["etag"] = response.headers["ETag"]
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if check_query_budgets() else 0)
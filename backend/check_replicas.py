@@ -0,0 +1,91 @@
+"""
+End-to-end check of read-replica routing with two SQLite files.
+
+    python check_replicas.py
+
+Builds a primary with the demo data, copies it to a "replica" file and
+renames the restaurant there, so every response shows which database
+served it. Then checks that GETs read the replica, writes and the writer's
+follow-up reads use the primary, and that a lagging or broken replica is
+skipped. Exits 1 if any expectation fails.
+"""
+import os
+import sqlite3
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="qrmenu-replicas-")
+PRIMARY = os.path.join(_tmp, "primary.db")
+REPLICA = os.path.join(_tmp, "replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY}"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{REPLICA}"
+
+from app.factory import create_app  # noqa: E402
+from app.seed import init_db  # noqa: E402
+from app.database import db  # noqa: E402
+from app.models.models import MenuItem  # noqa: E402
+
+SLUG = "demo-restoran"
+
+
+def replica_sql(*statements):
+    with sqlite3.connect(REPLICA) as conn:
+        for statement in statements:
+            conn.execute(statement)
+
+
+def served_by(client):
+    return "replica" if client.get("/debug/db").get_json()["restaurant"] == "REPLICA" else "primary"
+
+
+def check_replicas():
+    app = create_app({
+        "UPLOAD_FOLDER": os.path.join(_tmp, "uploads"),
+        "RATE_LIMIT_ENABLED": False,
+        "REPLICA_CHECK_INTERVAL": 0,  # re-probe on every request
+        "REPLICA_LAG_QUERY": "SELECT seconds FROM replica_lag",
+    })
+    init_db(app)
+    with app.app_context():
+        item_id = db.session.execute(db.select(MenuItem.id)).scalars().first()
+        db.engine.dispose()
+    # backup() rather than a file copy: recent writes may still be in the WAL
+    with sqlite3.connect(PRIMARY) as source, sqlite3.connect(REPLICA) as target:
+        source.backup(target)
+    replica_sql("UPDATE restaurant SET name = 'REPLICA'",
+                "CREATE TABLE replica_lag (seconds REAL)", "INSERT INTO replica_lag VALUES (0)")
+
+    client = app.test_client()
+    checks = []
+
+    def expect(label, actual, wanted):
+        checks.append(actual == wanted)
+        print(f"[{'OK' if actual == wanted else 'FAIL'}]   {label}: {actual}")
+
+    expect("GET reads the replica", served_by(client), "replica")
+
+    response = client.post("/api/public/orders", json={
+        "restaurantSlug": SLUG, "tableNumber": 3, "items": [{"menuItemId": item_id, "quantity": 1}]})
+    expect("order placed on the primary", response.status_code, 201)
+    order_id = response.get_json()["orderId"]
+    expect("writer is pinned to the primary", served_by(client), "primary")
+    expect("writer sees its order", client.get(f"/api/public/orders/{order_id}").status_code, 200)
+
+    other = app.test_client()
+    expect("other clients still read the replica", served_by(other), "replica")
+    expect("...which has not seen the order yet", other.get(f"/api/public/orders/{order_id}").status_code, 404)
+
+    replica_sql("UPDATE replica_lag SET seconds = 60")
+    expect("lagging replica is skipped", served_by(other), "primary")
+
+    replica_sql("DROP TABLE replica_lag")
+    expect("failing replica is skipped", served_by(other), "primary")
+    health = client.get("/api/health/db").get_json()["replicas"]["replica1"]
+    expect("health reports the replica down", health["healthy"], False)
+
+    replica_sql("CREATE TABLE replica_lag (seconds REAL)", "INSERT INTO replica_lag VALUES (0.5)")
+    expect("recovered replica is used again", served_by(other), "replica")
+    return checks.count(False)
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if check_replicas() else 0)
@@ -0,0 +1,43 @@
+# Picked up automatically by `gunicorn app.main:app` when run from backend/.
+import glob
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+
+# Threaded workers so open SSE order streams (/api/admin/orders/stream) park a
+# thread each instead of pinning a whole sync worker. "gevent" also works.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+# With preload the app is imported once in the master and forked; create_app()
+# does no I/O, so nothing (DB connections, threads) leaks across the fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Prometheus multiprocess mode: workers write samples to this directory and a
+# /metrics scrape on any worker aggregates them. Must be set before the app
+# (and prometheus_client) is imported, i.e. here.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="qrmenu-metrics-"))
+
+
+def on_starting(server):
+    # Samples from a previous run would be added to this one's counters
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    from app.factory import warm_caches
+    warm_caches(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    # Write out queued orders (ORDER_INTAKE) before the worker goes away
+    from app.core.intake import order_intake
+    order_intake.shutdown()
@@ -24,7 +24,7 @@ export default function AdminOrders() {
     const fetchOrders = async () => {
         try {
             const res = await api.get('/admin/orders');
-            setOrders(res.data);
+            setOrders(res.data.orders);
         } catch (err) {
             console.error("Failed to fetch orders", err);
         } finally {
@@ -34,20 +34,51 @@ export default function AdminOrders() {
 
     useEffect(() => {
         fetchOrders();
-        // Poll every 10 seconds
+        // Keep polling even with the stream: with the default per-worker event
+        // broker, orders placed through another worker only show up here
         const interval = setInterval(fetchOrders, 10000);
-        return () => clearInterval(interval);
+
+        // Live updates over SSE; EventSource reconnects (with Last-Event-ID) on its own
+        const token = localStorage.getItem('token') || localStorage.getItem('access_token');
+        if (!token || typeof EventSource === 'undefined') {
+            return () => clearInterval(interval);
+        }
+
+        const source = new EventSource(`${api.defaults.baseURL}/admin/orders/stream?jwt=${encodeURIComponent(token)}`);
+        source.addEventListener('order.created', (e) => {
+            const order = JSON.parse(e.data);
+            setOrders(prev => prev.some(o => o.id === order.id) ? prev : [order, ...prev]);
+        });
+        source.addEventListener('order.status', (e) => {
+            const { id, status, revision } = JSON.parse(e.data);
+            setOrders(prev => prev.map(o => o.id === id ? { ...o, status, revision } : o));
+        });
+        // Server could not replay missed events (restart / other worker): refetch
+        source.addEventListener('resync', fetchOrders);
+        return () => {
+            source.close();
+            clearInterval(interval);
+        };
     }, []);
 
     const updateStatus = async (orderId, newStatus) => {
         // Optimistic update
         const prevOrders = [...orders];
+        const order = orders.find(o => o.id === orderId);
         setOrders(orders.map(o => o.id === orderId ? { ...o, status: newStatus } : o));
 
         try {
-            await api.put(`/admin/orders/${orderId}/status`, { status: newStatus });
+            // Sending the revision we saw makes the server reject changes made meanwhile on another screen
+            const res = await api.put(`/admin/orders/${orderId}/status`, { status: newStatus, revision: order?.revision });
+            setOrders(prev => prev.map(o => o.id === orderId ? { ...o, revision: res.data.revision } : o));
             toast.success(`Order #${orderId} marked as ${newStatus}`);
         } catch (err) {
+            if (err.response?.status === 409) {
+                const { status, revision } = err.response.data;
+                setOrders(prev => prev.map(o => o.id === orderId ? { ...o, status: status ?? o.status, revision } : o));
+                toast.error(`Order #${orderId} was already updated (${status})`);
+                return;
+            }
             setOrders(prevOrders);
             toast.error("Failed to update status");
         }
@@ -65,6 +65,7 @@ export default function CartDrawer() {
             const payload = {
                 restaurantSlug: slug,
                 tableNumber: tableNumber,
+                tableToken: localStorage.getItem(`qr_menu_table_token_${slug}`) || undefined,
                 items: cartItems.map(i => ({
                     menuItemId: i.id,
                     quantity: i.quantity
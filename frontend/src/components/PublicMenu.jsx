@@ -10,6 +10,28 @@ import { cn } from "@/lib/utils";
 import { useCart } from '../context/CartContext';
 import { toast } from "sonner";
 
+// Published static menus (`flask menus publish`), e.g. https://cdn.example.com/menus
+const STATIC_MENU_URL = import.meta.env.VITE_MENU_STATIC_URL;
+
+// Static files first (no backend round trip), the live API as the fallback
+async function loadMenu(slug) {
+    if (STATIC_MENU_URL) {
+        try {
+            const base = `${STATIC_MENU_URL}/${encodeURIComponent(slug)}`;
+            const pointer = await fetch(`${base}/current.json`, { cache: 'no-cache' });
+            if (pointer.ok) {
+                const { path } = await pointer.json();
+                const menu = await fetch(`${base}/${path}`);
+                if (menu.ok) return await menu.json();
+            }
+        } catch (err) {
+            console.warn("Static menu unavailable, using the API:", err);
+        }
+    }
+    const res = await api.get(`/public/restaurants/${slug}/menu`);
+    return res.data;
+}
+
 export default function PublicMenu() {
     const { slug } = useParams();
     const [searchParams] = useSearchParams();
@@ -21,6 +43,7 @@ export default function PublicMenu() {
     const [error, setError] = useState(null);
     const [activeCategory, setActiveCategory] = useState('');
     const [searchTerm, setSearchTerm] = useState('');
+    const [matchIds, setMatchIds] = useState(null);
     const [tableNumber, setTableNumber] = useState(null);
 
     useEffect(() => {
@@ -28,6 +51,8 @@ export default function PublicMenu() {
         const tableParam = searchParams.get('t');
         if (tableParam) {
             localStorage.setItem(`qr_menu_table_${slug}`, tableParam);
+            // The QR token links orders to the table (GET .../tables/:token/orders tracks them)
+            localStorage.setItem(`qr_menu_table_token_${slug}`, tableParam);
             setTableNumber(tableParam);
         } else {
             const storedTable = localStorage.getItem(`qr_menu_table_${slug}`);
@@ -38,11 +63,11 @@ export default function PublicMenu() {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const res = await api.get(`/public/restaurants/${slug}/menu`);
-                setRestaurant({ name: res.data.restaurant_name });
-                setMenu(res.data.categories);
-                if (res.data.categories.length > 0) {
-                    setActiveCategory(res.data.categories[0].name);
+                const data = await loadMenu(slug);
+                setRestaurant({ name: data.restaurant_name });
+                setMenu(data.categories);
+                if (data.categories.length > 0) {
+                    setActiveCategory(data.categories[0].name);
                 }
             } catch (err) {
                 console.error("PublicMenu Fetch Error:", err);
@@ -63,6 +88,28 @@ export default function PublicMenu() {
         fetchData();
     }, [slug]);
 
+    useEffect(() => {
+        // Server-side search folds Turkish letters (İ/ı, ş, ğ...) and matches word prefixes
+        const q = searchTerm.trim();
+        if (!q) {
+            setMatchIds(null);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const res = await api.get(`/public/restaurants/${slug}/search`, { params: { q, limit: 100 } });
+                if (!cancelled) setMatchIds(new Set(res.data.items.map(item => item.id)));
+            } catch (err) {
+                console.error("PublicMenu Search Error:", err);
+            }
+        }, 150);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchTerm, slug]);
+
     useEffect(() => {
         const handleScroll = () => {
             const sections = document.querySelectorAll('section[id]');
@@ -120,10 +167,7 @@ export default function PublicMenu() {
 
     const filteredMenu = menu.map(cat => ({
         ...cat,
-        items: cat.items.filter(item =>
-            item.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-            item.description?.toLowerCase().includes(searchTerm.toLowerCase())
-        )
+        items: matchIds ? cat.items.filter(item => matchIds.has(item.id)) : cat.items
     })).filter(cat => cat.items.length > 0);
 
     return (
@@ -214,7 +258,9 @@ export default function PublicMenu() {
                                         <div className="relative h-44 w-full bg-stone-100 overflow-hidden">
                                             {item.image_url ? (
                                                 <img
-                                                    src={item.image_url}
+                                                    src={item.image_variants?.card?.jpg || item.image_url}
+                                                    srcSet={item.image_srcset}
+                                                    sizes="(min-width: 768px) 480px, 100vw"
                                                     alt={item.name}
                                                     className="w-full h-full object-cover transform group-hover:scale-105 transition-transform duration-700"
                                                     loading="lazy"